@@ -0,0 +1,93 @@
+# bench/charts.py
+# Gráficos do /resumo por renderizador (matplotlib x pillow) e modo de saída: tempo mediano das duas
+# imagens, pico de memória alocada e bytes enviados por relatório. Usa dados sintéticos no formato
+# que build_summary entrega ao renderizador — não precisa de banco.
+#
+#   cd bot && python -m bench.charts --categories 10 --months 12
+import os
+
+# o banco não é usado, mas handlers.summary cria o engine ao ser importado
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+from unittest import mock
+
+from handlers import summary
+from utils.forecast import forecast_monthly, cumulative
+
+MODES = {
+    # nome: (compacto, formato)
+    "png": (False, "png"),
+    "png-compacto": (True, "png"),
+    "webp-compacto": (True, "webp"),
+}
+
+
+def chart_data(categories: int, months: int, seed: int):
+    rng = random.Random(seed)
+    names = [f"Categoria {i + 1}" for i in range(categories)]
+    values = [round(rng.uniform(50, 2000), 2) for _ in names]
+    fixed = sum(values[: categories // 3])
+    balance = [round(rng.uniform(-1500, 3000), 2) for _ in range(months)]
+    labels = [f"{m % 12 + 1:02d}/2025" for m in range(months)]
+    proj_labels = [f"{m:02d}/2026" for m in range(1, 13 - months % 12)] if months % 12 else []
+    proj = cumulative(forecast_monthly(balance, len(proj_labels)), balance[-1])
+    return (names, values, fixed, sum(values) - fixed), (
+        labels, balance, proj_labels, proj.mean.tolist(), proj.lower.tolist(), proj.upper.tolist()
+    )
+
+
+def render(renderer, breakdown_args, balance_args):
+    return renderer.breakdown(*breakdown_args), renderer.balance(*balance_args)
+
+
+def run(categories: int, months: int, repeat: int, seed: int):
+    breakdown_args, balance_args = chart_data(categories, months, seed)
+    results = {}
+    for renderer_name in summary.RENDERERS:
+        renderer = summary.get_renderer(renderer_name)
+        for mode, (compact, fmt) in MODES.items():
+            with mock.patch.object(summary.Env, "CHART_COMPACT", compact), \
+                    mock.patch.object(summary.Env, "CHART_FORMAT", fmt):
+                render(renderer, breakdown_args, balance_args)   # aquecimento: fontes, caches
+                walls = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    img1, img2 = render(renderer, breakdown_args, balance_args)
+                    walls.append((time.perf_counter() - start) * 1000)
+                tracemalloc.start()
+                render(renderer, breakdown_args, balance_args)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            results[(renderer_name, mode)] = {
+                "median_ms": statistics.median(walls),
+                "peak_kib": peak / 1024,
+                "bytes": len(img1) + len(img2),
+            }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Renderizadores e modos de saída dos gráficos do /resumo")
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--months", type=int, default=9, help="meses realizados; o resto do ano vira projeção")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    results = run(args.categories, args.months, args.repeat, args.seed)
+    print(f"{'renderizador':<12} {'modo':<14} {'median ms':>10} {'peak KiB':>10} {'bytes/relatório':>16}")
+    for (renderer_name, mode), r in results.items():
+        print(f"{renderer_name:<12} {mode:<14} {r['median_ms']:>10.1f} {r['peak_kib']:>10.1f} {r['bytes']:>16}")
+    for mode in MODES:
+        slow, fast = results[("matplotlib", mode)], results[("pillow", mode)]
+        print(f"{mode}: pillow {slow['median_ms'] / fast['median_ms']:.1f}x mais rápido, "
+              f"{slow['peak_kib'] / max(fast['peak_kib'], 1e-9):.1f}x menos memória")
+
+
+if __name__ == "__main__":
+    main()
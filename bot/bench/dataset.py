@@ -0,0 +1,159 @@
+# bench/dataset.py
+# Gerador determinístico de dados sintéticos no formato de db/models.py.
+import random
+import datetime
+from dataclasses import dataclass, field
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import insert
+
+from db.session import get_session
+from db.models import (
+    Profile, Account, Category, Transaction, Debt,
+    TransactionType, CategoryType, CurrencyEnum, DebtType, DebtStatus,
+)
+
+CATEGORY_NAMES = [
+    "Mercado", "Restaurante", "Transporte", "Farmácia", "Lazer", "Roupas",
+    "Aluguel", "Internet", "Energia", "Academia", "Streaming", "Educação",
+    "Pets", "Presentes", "Viagem", "Saúde",
+]
+DESCRIPTIONS = [
+    "padaria", "uber", "ifood", "supermercado", "posto", "cinema", "farmácia",
+    "assinatura", "conta de luz", "loja", "feira", "bar", "estacionamento",
+]
+BENCH_TELEGRAM_ID_BASE = 900_000
+
+
+@dataclass
+class DatasetSpec:
+    profiles: int = 1
+    accounts: int = 2          # contas bancárias extras além de Disponível/Principal
+    cards: int = 2
+    categories: int = 10
+    months: int = 12
+    tx_per_month: int = 60
+    parcelados: int = 4        # compras parceladas por cartão
+    transfers_per_month: int = 2
+    seed: int = 42
+
+
+@dataclass
+class SeededProfile:
+    profile_id: int
+    telegram_id: int
+    bank_account_ids: list = field(default_factory=list)
+    card_account_ids: list = field(default_factory=list)
+    category_ids: list = field(default_factory=list)
+
+
+async def generate(spec: DatasetSpec, today: datetime.date = None) -> list:
+    rng = random.Random(spec.seed)
+    today = today or datetime.date.today()
+    first_month = today.replace(day=1) - relativedelta(months=spec.months - 1)
+    seeded = []
+
+    for p in range(spec.profiles):
+        async with get_session() as session:
+            profile = Profile(name=f"Bench {p}", telegram_id=BENCH_TELEGRAM_ID_BASE + p, emergency_fund=5000.0)
+            session.add(profile)
+            await session.flush()
+
+            banks = [Account(profile_id=profile.id, name=name, balance=0.0, currency=CurrencyEnum.BRL, type="bank")
+                     for name in ["Disponível", "Principal"] + [f"Banco {i}" for i in range(spec.accounts)]]
+            cards = [Account(profile_id=profile.id, name=f"Cartão {i}", balance=0.0, currency=CurrencyEnum.BRL, type="credit_card")
+                     for i in range(spec.cards)]
+            categories = [
+                Category(profile_id=profile.id, name=CATEGORY_NAMES[i % len(CATEGORY_NAMES)] + ("" if i < len(CATEGORY_NAMES) else f" {i}"),
+                         type=CategoryType.FIXA if i % 4 == 0 else CategoryType.VARIAVEL)
+                for i in range(spec.categories)
+            ]
+            session.add_all(banks + cards + categories)
+            await session.flush()
+
+            balances = {a.id: 0.0 for a in banks + cards}
+            rows = []
+
+            def add_row(account_id, tx_type, value, date, category_id=None, description=None, is_transfer=False, is_settled=False):
+                before = balances[account_id]
+                balances[account_id] = before + value
+                rows.append({
+                    "account_id": account_id,
+                    "category_id": category_id,
+                    "profile_id": profile.id,
+                    "type": tx_type,
+                    "value": value,
+                    "date": date,
+                    "description": description,
+                    "is_transfer": is_transfer,
+                    "is_settled": is_settled,
+                    "balance_before": before,
+                })
+
+            for m in range(spec.months):
+                month_start = first_month + relativedelta(months=m)
+                month_end = min(month_start + relativedelta(months=1), today + datetime.timedelta(days=1))
+                days = max(1, (month_end - month_start).days)
+
+                # salário no início do mês na conta Disponível
+                add_row(banks[0].id, TransactionType.ENTRADA, round(rng.uniform(3000, 8000), 2), month_start,
+                        description="salário")
+
+                for _ in range(spec.tx_per_month):
+                    date = month_start + datetime.timedelta(days=rng.randrange(days))
+                    on_card = cards and rng.random() < 0.35
+                    account = rng.choice(cards) if on_card else rng.choice(banks)
+                    category = rng.choice(categories)
+                    value = -round(rng.uniform(5, 400), 2)
+                    # faturas de meses anteriores já foram pagas
+                    settled = bool(on_card and month_start < today.replace(day=1))
+                    add_row(account.id, TransactionType.SAIDA, value, date, category.id,
+                            rng.choice(DESCRIPTIONS), is_settled=settled)
+
+                for _ in range(spec.transfers_per_month):
+                    date = month_start + datetime.timedelta(days=rng.randrange(days))
+                    src, dst = rng.sample(banks, 2)
+                    amount = round(rng.uniform(50, 1000), 2)
+                    add_row(src.id, TransactionType.SAIDA, -amount, date,
+                            description=f"Pagamento/cartão -> {dst.name}", is_transfer=True)
+                    add_row(dst.id, TransactionType.ENTRADA, amount, date,
+                            description=f"Recebimento de pagamento de {src.name}", is_transfer=True)
+
+            if rows:
+                await session.execute(insert(Transaction), rows)
+
+            # compras parceladas: precisam do id da transação para o vínculo com o Debt
+            for card in cards:
+                for n in range(spec.parcelados):
+                    installments = rng.randint(2, 12)
+                    total = round(rng.uniform(300, 3000), 2)
+                    tx = Transaction(
+                        account_id=card.id, profile_id=profile.id, category_id=rng.choice(categories).id,
+                        type=TransactionType.SAIDA, value=-total, date=today - datetime.timedelta(days=rng.randrange(60)),
+                        description=f"compra 📦 Parcelado em {installments}x", balance_before=balances[card.id],
+                    )
+                    balances[card.id] -= total
+                    session.add(tx)
+                    await session.flush()
+                    session.add(Debt(
+                        profile_id=profile.id, creditor=f"{card.name} - Parcelado #{tx.id}",
+                        monthly_payment=round(total / installments, 2), months=installments,
+                        status=DebtStatus.OPEN, type=DebtType.PARCELADO,
+                    ))
+
+            session.add(Debt(profile_id=profile.id, creditor="Financiamento", monthly_payment=850.0,
+                             months=24, status=DebtStatus.OPEN, type=DebtType.REAL))
+
+            for acc in banks + cards:
+                acc.balance = round(balances[acc.id], 2)
+
+            await session.commit()
+            seeded.append(SeededProfile(
+                profile_id=profile.id,
+                telegram_id=profile.telegram_id,
+                bank_account_ids=[a.id for a in banks],
+                card_account_ids=[c.id for c in cards],
+                category_ids=[c.id for c in categories],
+            ))
+
+    return seeded
@@ -0,0 +1,206 @@
+# bench/fake_api.py
+# Servidor falso da Bot API (HTTP/1.1 mínimo sobre asyncio) para testes de carga locais.
+# Responde getUpdates (long polling), sendMessage, sendPhoto, sendDocument, sendMediaGroup,
+# editMessageText e devolve `true` para os demais métodos. Guarda a última mensagem com teclado
+# inline de cada chat, para o "usuário" apertar um botão (push_callback -> update callback_query).
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+from email.parser import BytesParser
+from email.policy import HTTP
+from urllib.parse import parse_qsl
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+
+
+class FakeBotAPI:
+    def __init__(self, host="127.0.0.1", port=8081):
+        self.host = host
+        self.port = port
+        self._server = None
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._pending = []                 # updates ainda não confirmados pelo offset
+        self._new_update = asyncio.Event()
+        self._waiters = {}                 # update_id -> Future resolvida quando o bot termina o update
+        self._chat_waiters = {}            # chat_id -> Future resolvida na próxima chamada do bot ao chat
+        self.polling = asyncio.Event()     # o bot já chamou getUpdates
+        self.keyboards = {}                # chat_id -> última mensagem enviada/editada com teclado inline
+        self.last_text = {}                # chat_id -> texto da última mensagem enviada/editada
+        self.calls_by_method = Counter()
+        self.calls_by_chat = Counter()
+        self.bytes_by_chat = Counter()
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/bot"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    # ---------- lado do "usuário" ----------
+    def push_update(self, user_id: int, text: str):
+        update_id = next(self._update_ids)
+        message = {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"User {user_id}"},
+            "text": text,
+        }
+        if text.startswith("/"):
+            command = text.split()[0]
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(command)}]
+        return self._push(update_id, {"message": message})
+
+    def push_callback(self, user_id: int, label: str):
+        """Aperta o primeiro botão cujo rótulo começa com `label` na última mensagem com teclado inline do chat."""
+        message = self.keyboards.get(user_id)
+        buttons = [b for row in (message or {}).get("reply_markup", {}).get("inline_keyboard", []) for b in row]
+        button = next((b for b in buttons if b.get("text", "").lower().startswith(label.lower())), None)
+        if button is None:
+            raise LookupError(f"botão {label!r} não oferecido ao chat {user_id}: {[b.get('text') for b in buttons]}")
+        update_id = next(self._update_ids)
+        query = {
+            "id": str(update_id),
+            "from": {"id": user_id, "is_bot": False, "first_name": f"User {user_id}"},
+            "chat_instance": str(user_id),
+            "data": button["callback_data"],
+            "message": message,
+        }
+        return self._push(update_id, {"callback_query": query})
+
+    def _push(self, update_id: int, payload: dict):
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[update_id] = future
+        self._pending.append({"update_id": update_id, **payload})
+        self._new_update.set()
+        return update_id, future
+
+    def mark_done(self, update_id: int):
+        future = self._waiters.pop(update_id, None)
+        if future and not future.done():
+            future.set_result(time.perf_counter())
+
+    def wait_for_chat(self, chat_id: int):
+        """Future com o perf_counter da próxima chamada do bot a `chat_id` (ex: a resposta a um update)."""
+        future = asyncio.get_running_loop().create_future()
+        self._chat_waiters[chat_id] = future
+        return future
+
+    # ---------- lado do bot ----------
+    async def _get_updates(self, params):
+        offset = int(params.get("offset") or 0)
+        timeout = float(params.get("timeout") or 0)
+        self._pending = [u for u in self._pending if u["update_id"] >= offset]
+        if not self._pending and timeout > 0:
+            self._new_update.clear()
+            try:
+                await asyncio.wait_for(self._new_update.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        limit = int(params.get("limit") or 100)
+        return self._pending[:limit]
+
+    def _message(self, chat_id, text=None, reply_markup=None, message_id=None):
+        msg = {
+            "message_id": int(message_id) if message_id else next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+        }
+        if text is not None:
+            msg["text"] = text
+            self.last_text[chat_id] = text
+        if isinstance(reply_markup, str):
+            reply_markup = json.loads(reply_markup)
+        if reply_markup and "inline_keyboard" in reply_markup:
+            msg["reply_markup"] = reply_markup
+            self.keyboards[chat_id] = msg
+        return msg
+
+    async def _dispatch(self, method, params, body_size):
+        self.calls_by_method[method] += 1
+        chat_id = params.get("chat_id")
+        if chat_id is not None:
+            chat_id = int(chat_id)
+            self.calls_by_chat[chat_id] += 1
+            self.bytes_by_chat[chat_id] += body_size
+            future = self._chat_waiters.pop(chat_id, None)
+            if future and not future.done():
+                future.set_result(time.perf_counter())
+
+        if method == "getMe":
+            return BOT_USER
+        if method == "getUpdates":
+            self.polling.set()
+            return await self._get_updates(params)
+        if method == "sendMessage":
+            return self._message(chat_id, params.get("text"), params.get("reply_markup"))
+        if method == "editMessageText":
+            return self._message(chat_id, params.get("text"), params.get("reply_markup"), params.get("message_id"))
+        if method in ("sendPhoto", "sendDocument"):
+            return self._message(chat_id)
+        if method == "sendMediaGroup":
+            media = json.loads(params.get("media") or "[]")
+            return [self._message(chat_id) for _ in media]
+        return True
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                _, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                method = target.rstrip("/").rsplit("/", 1)[-1].split("?", 1)[0]
+                params = parse_body(headers.get("content-type", ""), body)
+                result = await self._dispatch(method, params, length)
+
+                payload = json.dumps({"ok": True, "result": result}).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(payload)}\r\n\r\n".encode()
+                    + payload
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # CancelledError: long polling pendente quando o servidor é parado
+            pass
+        finally:
+            writer.close()
+
+
+def parse_body(content_type: str, body: bytes) -> dict:
+    if not body:
+        return {}
+    if content_type.startswith("multipart/form-data"):
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + body
+        )
+        params = {}
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if name and part.get_filename() is None:
+                params[name] = part.get_content().strip() if part.get_content_maintype() == "text" else part.get_payload(decode=True).decode()
+        return params
+    if content_type.startswith("application/json"):
+        return json.loads(body)
+    return dict(parse_qsl(body.decode()))
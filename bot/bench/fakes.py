@@ -0,0 +1,109 @@
+# bench/fakes.py
+# Update/Context falsos: suficientes para rodar os handlers sem falar com o Telegram.
+# Cada chamada que iria para a Bot API é registrada em `calls`.
+import itertools
+
+_message_ids = itertools.count(1)
+
+
+class FakeUser:
+    def __init__(self, user_id: int, full_name: str = "Bench User"):
+        self.id = user_id
+        self.full_name = full_name
+        self.first_name = full_name
+        self.is_bot = False
+
+
+class FakeChat:
+    def __init__(self, chat_id: int):
+        self.id = chat_id
+        self.type = "private"
+
+
+class FakeMessage:
+    def __init__(self, text, user: FakeUser, calls: list):
+        self.message_id = next(_message_ids)
+        self.text = text
+        self.from_user = user
+        self.chat = FakeChat(user.id)
+        self.chat_id = user.id
+        self._calls = calls
+
+    def _record(self, method, text=None, **kwargs):
+        self._calls.append((method, text, kwargs))
+        return FakeMessage(text, self.from_user, self._calls)
+
+    async def reply_text(self, text, **kwargs):
+        return self._record("sendMessage", text, **kwargs)
+
+    async def reply_photo(self, photo=None, **kwargs):
+        return self._record("sendPhoto", kwargs.get("caption"), **kwargs)
+
+    async def reply_document(self, document=None, **kwargs):
+        return self._record("sendDocument", kwargs.get("caption"), **kwargs)
+
+    async def reply_media_group(self, media=None, **kwargs):
+        caption = media[0].caption if media else None   # o álbum é registrado com a legenda da primeira foto
+        self._calls.append(("sendMediaGroup", caption, kwargs))
+        return [FakeMessage(None, self.from_user, self._calls) for _ in media or []]
+
+    async def edit_text(self, text, **kwargs):
+        self.text = text
+        self._calls.append(("editMessageText", text, kwargs))
+        return self
+
+    async def delete(self):
+        self._calls.append(("deleteMessage", None, {}))
+        return True
+
+
+class FakeUpdate:
+    def __init__(self, user_id: int, text: str, calls: list = None):
+        self.calls = calls if calls is not None else []
+        self.effective_user = FakeUser(user_id)
+        self.message = FakeMessage(text, self.effective_user, self.calls)
+        self.effective_message = self.message
+        self.effective_chat = self.message.chat
+        self.callback_query = None
+
+
+class FakeCallbackQuery:
+    def __init__(self, data: str, user: FakeUser, calls: list):
+        self.data = data
+        self.from_user = user
+        self.message = FakeMessage(None, user, calls)
+        self._calls = calls
+
+    async def answer(self, text=None, **kwargs):
+        self._calls.append(("answerCallbackQuery", text, kwargs))
+        return True
+
+    async def edit_message_text(self, text, **kwargs):
+        return await self.message.edit_text(text, **kwargs)
+
+
+class FakeCallbackUpdate(FakeUpdate):
+    """Clique num botão inline: sem `message`, com `callback_query`."""
+
+    def __init__(self, user_id: int, data: str, calls: list = None):
+        super().__init__(user_id, None, calls)
+        self.callback_query = FakeCallbackQuery(data, self.effective_user, self.calls)
+        self.message = None
+        self.effective_message = self.callback_query.message
+
+
+class FakeContext:
+    def __init__(self, args=None, user_data=None):
+        self.args = list(args or [])
+        self.user_data = dict(user_data or {})
+        self.chat_data = {}
+        self.bot_data = {}
+
+
+def make_call(user_id: int, text: str, user_data=None):
+    args = text.split()[1:] if text.startswith("/") else []
+    return FakeUpdate(user_id, text), FakeContext(args=args, user_data=user_data)
+
+
+def make_callback(user_id: int, data: str, user_data=None):
+    return FakeCallbackUpdate(user_id, data), FakeContext(user_data=user_data)
@@ -0,0 +1,53 @@
+# bench/forecast.py
+# Custo da previsão mensal (utils/forecast.py) a partir de séries já agregadas: por perfil, chamando
+# forecast_monthly + cumulative uma vez por série (como o /resumo), e em lote (perfis x meses numa
+# matriz só). Não precisa de banco. Meta: < 1 ms por perfil.
+#
+#   cd bot && python -m bench.forecast --profiles 1000 --months 6,12,36
+import argparse
+import time
+
+import numpy as np
+
+from utils.forecast import forecast_monthly, cumulative
+
+
+def series(profiles: int, months: int, seed: int):
+    rng = np.random.default_rng(seed)
+    t = np.arange(months)
+    season = 400 * np.sin(2 * np.pi * t / 12)
+    return 1000 + rng.normal(0, 50, (profiles, 1)) * t + season + rng.normal(0, 300, (profiles, months))
+
+
+def run(profiles: int, months: int, horizon: int, repeat: int, seed: int):
+    history = series(profiles, months, seed)
+    single, batch = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for row in history:
+            cumulative(forecast_monthly(row, horizon), row[-1])
+        single.append((time.perf_counter() - start) / profiles)
+
+        start = time.perf_counter()
+        cumulative(forecast_monthly(history, horizon), history[:, -1])
+        batch.append((time.perf_counter() - start) / profiles)
+    return min(single) * 1e6, min(batch) * 1e6, forecast_monthly(history[0], horizon).method
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Custo da previsão mensal por perfil")
+    parser.add_argument("--profiles", type=int, default=1000)
+    parser.add_argument("--months", default="6,12,36", help="meses de histórico, separados por vírgula")
+    parser.add_argument("--horizon", type=int, default=11)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    print(f"{'meses':>6} {'método':<26} {'µs/perfil':>10} {'µs/perfil (lote)':>17}")
+    for months in (int(m) for m in args.months.split(",") if m):
+        single_us, batch_us, method = run(args.profiles, months, args.horizon, args.repeat, args.seed)
+        print(f"{months:>6} {method:<26} {single_us:>10.1f} {batch_us:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
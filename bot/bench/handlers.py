@@ -0,0 +1,158 @@
+# bench/handlers.py
+# Benchmark por handler: tempo, número de queries e pico de memória em vários tamanhos de dados.
+#
+#   cd bot && BENCH_DATABASE_URL=postgresql+asyncpg://... python -m bench.handlers --months 1,6,24
+import argparse
+import asyncio
+import datetime
+import json
+
+from bench.common import engine, measure, median, reset_schema
+from bench.dataset import DatasetSpec, generate
+from bench.fakes import make_call
+
+from handlers.summary import summary_month
+from handlers.projection import runway_projection
+from handlers.wallet import daily_budget
+from handlers.mydata import my_data
+from handlers.last_transitions import last_transitions
+from handlers.transactions import add_transaction, save_transaction
+
+
+def scenario_summary_month(p):
+    return summary_month, make_call(p.telegram_id, "/resumo")
+
+
+def scenario_summary_range(p):
+    # intervalo/comparação: uma query (mês, categoria, tipo, soma) + pivot em NumPy
+    year = datetime.date.today().year
+    return summary_month, make_call(p.telegram_id, f"/resumo {year - 1} vs {year}")
+
+
+def scenario_runway(p):
+    return runway_projection, make_call(p.telegram_id, "/projecao")
+
+
+def scenario_daily_budget(p):
+    return daily_budget, make_call(p.telegram_id, "/carteira")
+
+
+def scenario_my_data(p):
+    return my_data, make_call(p.telegram_id, "/meusdados")
+
+
+def scenario_last_transitions(p):
+    return last_transitions, make_call(p.telegram_id, "/listatransacoes")
+
+
+def scenario_card_invoice(p):
+    # ramo "pagamento de fatura": soma as faturas abertas de todos os cartões
+    return add_transaction, make_call(p.telegram_id, "cartão", user_data={
+        "profile_id": p.profile_id, "type": "saida", "step": "debt_type",
+    })
+
+
+def scenario_save_transaction(p):
+    return save_transaction, make_call(p.telegram_id, "padaria", user_data={
+        "profile_id": p.profile_id,
+        "type": "saida",
+        "value": 12.5,
+        "category_id": p.category_ids[0],
+        "account_id": p.bank_account_ids[0],
+        "description": "padaria",
+    })
+
+
+SCENARIOS = {
+    "summary_month": scenario_summary_month,
+    "summary_range": scenario_summary_range,
+    "runway": scenario_runway,
+    "daily_budget": scenario_daily_budget,
+    "my_data": scenario_my_data,
+    "last_transitions": scenario_last_transitions,
+    "card_invoice": scenario_card_invoice,
+    "save_transaction": scenario_save_transaction,
+}
+
+
+async def run_scenario(name, profile, repeat):
+    walls, queries, peaks, api_calls = [], [], [], []
+    for _ in range(repeat):
+        handler, (update, context) = SCENARIOS[name](profile)
+        with measure() as m:
+            await handler(update, context)
+        walls.append(m.wall_ms)
+        queries.append(m.queries)
+        peaks.append(m.peak_kib)
+        api_calls.append(len(update.calls))
+    return {
+        "median_ms": round(median(walls), 3),
+        "queries": max(queries),        # pior caso: caches frios na primeira repetição
+        "warm_queries": min(queries),   # caches aquecidos pelas repetições anteriores
+        "peak_kib": round(max(peaks), 1),
+        "api_calls": max(api_calls),
+    }
+
+
+async def run(months_list, spec: DatasetSpec, repeat: int, only=None):
+    results = {}
+    for months in months_list:
+        spec.months = months
+        await reset_schema()
+        seeded = await generate(spec)
+        label = f"{months}m"
+        results[label] = {}
+        for name in SCENARIOS:
+            if only and name not in only:
+                continue
+            results[label][name] = await run_scenario(name, seeded[0], repeat)
+    await engine.dispose()
+    return results
+
+
+def print_table(results):
+    print(f"{'size':>6} {'handler':<18} {'median ms':>10} {'queries':>8} {'warm':>5} {'peak KiB':>10} {'api':>4}")
+    for size, handlers in results.items():
+        for name, r in handlers.items():
+            print(f"{size:>6} {name:<18} {r['median_ms']:>10.2f} {r['queries']:>8} {r['warm_queries']:>5} {r['peak_kib']:>10.1f} {r['api_calls']:>4}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos handlers do bot")
+    parser.add_argument("--months", default="1,6,24", help="tamanhos do histórico (meses), separados por vírgula")
+    parser.add_argument("--profiles", type=int, default=3)
+    parser.add_argument("--tx-per-month", type=int, default=60)
+    parser.add_argument("--accounts", type=int, default=2)
+    parser.add_argument("--cards", type=int, default=2)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--parcelados", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", default="", help="handlers a rodar, separados por vírgula")
+    parser.add_argument("--json", dest="json_path", help="grava o resultado em JSON")
+    return parser.parse_args(argv)
+
+
+def spec_from_args(args) -> DatasetSpec:
+    return DatasetSpec(
+        profiles=args.profiles,
+        accounts=args.accounts,
+        cards=args.cards,
+        categories=args.categories,
+        tx_per_month=args.tx_per_month,
+        parcelados=args.parcelados,
+    )
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    months_list = [int(m) for m in args.months.split(",") if m]
+    only = {o for o in args.only.split(",") if o}
+    results = asyncio.run(run(months_list, spec_from_args(args), args.repeat, only))
+    print_table(results)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
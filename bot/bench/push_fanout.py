@@ -0,0 +1,113 @@
+# bench/push_fanout.py
+# Aviso diário da /carteira em escala: semeia N perfis com o aviso ligado, mede a query em lote
+# (handlers.wallet.daily_push_messages) e o envio de todas as mensagens pelo utils.broadcast contra
+# o servidor falso da Bot API, no ritmo configurado.
+#
+#   cd bot && BENCH_DATABASE_URL=postgresql+asyncpg://... python -m bench.push_fanout --profiles 10000
+#   (--rate 0 mede só o custo do envio, sem o limite de mensagens/s)
+import argparse
+import asyncio
+import datetime
+import logging
+import random
+import time
+
+from bench.common import engine, reset_schema, measure
+from bench.fake_api import FakeBotAPI
+
+from sqlalchemy import insert, select
+from telegram import Bot
+from telegram.request import HTTPXRequest
+
+from config import Env
+from db.session import get_session
+from db.models import Profile, Account, Transaction, TransactionType, CurrencyEnum
+from handlers.wallet import daily_push_messages
+from utils.broadcast import broadcast, BROADCAST_CONCURRENCY
+
+BENCH_TOKEN = "123456:BENCH"
+TELEGRAM_ID_BASE = 800_000
+SEED_BATCH = 1000
+
+
+async def seed(profiles: int, tx_per_profile: int, today: datetime.date, seed: int):
+    rng = random.Random(seed)
+    for start in range(0, profiles, SEED_BATCH):
+        count = min(SEED_BATCH, profiles - start)
+        async with get_session() as session:
+            async with session.begin():
+                await session.execute(insert(Profile), [
+                    {"name": f"Push {start + i}", "telegram_id": TELEGRAM_ID_BASE + start + i,
+                     "emergency_fund": 0.0, "daily_push": True}
+                    for i in range(count)
+                ])
+                profile_ids = (await session.execute(
+                    select(Profile.id).where(Profile.telegram_id >= TELEGRAM_ID_BASE + start)
+                    .where(Profile.telegram_id < TELEGRAM_ID_BASE + start + count).order_by(Profile.id)
+                )).scalars().all()
+                account_ids = (await session.execute(
+                    insert(Account).returning(Account.id, sort_by_parameter_order=True),
+                    [{"profile_id": pid, "name": "Disponível", "balance": 0.0, "currency": CurrencyEnum.BRL, "type": "bank"}
+                     for pid in profile_ids],
+                )).scalars().all()
+
+                rows = []
+                for pid, aid in zip(profile_ids, account_ids):
+                    salary = round(rng.uniform(3000, 8000), 2)
+                    entry_date = today - datetime.timedelta(days=rng.randrange(28))
+                    rows.append({"account_id": aid, "profile_id": pid, "type": TransactionType.ENTRADA, "value": salary,
+                                 "date": entry_date, "description": "salário", "balance_before": 0.0})
+                    for _ in range(tx_per_profile):
+                        rows.append({"account_id": aid, "profile_id": pid, "type": TransactionType.SAIDA,
+                                     "value": -round(rng.uniform(5, 200), 2),
+                                     "date": entry_date + datetime.timedelta(days=rng.randrange((today - entry_date).days + 1)),
+                                     "description": "gasto", "balance_before": None})
+                await session.execute(insert(Transaction), rows)
+
+
+async def run(profiles: int, tx_per_profile: int, rate: float, port: int, seed_value: int):
+    await reset_schema()
+    today = datetime.date.today()
+    started = time.perf_counter()
+    await seed(profiles, tx_per_profile, today, seed_value)
+    seed_s = time.perf_counter() - started
+
+    with measure() as m:
+        messages = await daily_push_messages(today)
+
+    api = FakeBotAPI(port=port)
+    await api.start()
+    bot = Bot(BENCH_TOKEN, base_url=api.base_url, request=HTTPXRequest(connection_pool_size=BROADCAST_CONCURRENCY))
+    await bot.initialize()
+    try:
+        report = await broadcast(bot, ((chat_id, text, {"parse_mode": "Markdown"}) for chat_id, text in messages), rate=rate)
+    finally:
+        await bot.shutdown()
+        await api.stop()
+        await engine.dispose()
+
+    print(f"perfis semeados: {profiles} ({tx_per_profile} saídas cada) em {seed_s:.1f}s")
+    print(f"query em lote: {len(messages)} avisos em {m.wall_ms:.0f} ms, {m.queries} query(s), pico {m.peak_kib:.0f} KiB")
+    print(
+        f"envio: {report.sent} enviados, {report.failed} falhas, {report.retried} reenvios em {report.elapsed:.1f}s "
+        f"-> {report.sent / max(report.elapsed, 1e-9):.1f} msg/s (limite: {rate or 'nenhum'} msg/s)"
+    )
+    print(f"sendMessage recebidos pela API falsa: {api.calls_by_method['sendMessage']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aviso diário da carteira: query em lote + envio em massa")
+    parser.add_argument("--profiles", type=int, default=10000)
+    parser.add_argument("--tx-per-profile", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=Env.BROADCAST_RATE_PER_SECOND, help="mensagens/s (0 = sem limite)")
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    # o log INFO de cada requisição do httpx domina o tempo medido
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(run(args.profiles, args.tx_per_profile, args.rate, args.port, args.seed))
+
+
+if __name__ == "__main__":
+    main()
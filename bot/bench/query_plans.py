@@ -0,0 +1,108 @@
+# bench/query_plans.py
+# Verifica os planos (EXPLAIN FORMAT JSON) das queries quentes dos handlers num Postgres local populado.
+# Cada plano deve usar índice e nunca Seq Scan em `transactions` quando a tabela passa do limite de linhas.
+#
+#   cd bot && BENCH_DATABASE_URL=postgresql+asyncpg://... python -m bench.query_plans --threshold 10000
+import argparse
+import asyncio
+import datetime
+import json
+import sys
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects import postgresql
+
+from bench.common import engine, reset_schema
+from bench.dataset import DatasetSpec, generate
+from db.models import Transaction
+
+from handlers.mydata import unpaid_card_total_stmt
+from handlers.wallet import last_entry_date_stmt
+from handlers.summary import category_totals_stmt, monthly_net_stmt, monthly_category_totals_stmt
+from handlers.projection import daily_net_stmt
+from handlers.last_transitions import last_transactions_stmt
+from handlers.search import search_stmt
+
+INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+def hot_statements(p):
+    today = datetime.date.today()
+    month_start = today.replace(day=1)
+    month_end = month_start + relativedelta(months=1)
+    return {
+        "unpaid_card_total": unpaid_card_total_stmt(p.card_account_ids[0]),
+        "daily_budget.last_entry": last_entry_date_stmt(p.profile_id, p.bank_account_ids[0]),
+        "summary_month.category_totals": category_totals_stmt(p.profile_id, month_start, month_end),
+        "summary_month.monthly_net": monthly_net_stmt(p.profile_id, month_start - relativedelta(months=36), month_end),
+        "summary_range.monthly_totals": monthly_category_totals_stmt(
+            p.profile_id, [(month_start - relativedelta(months=12), month_end)]
+        ),
+        "runway.daily_net": daily_net_stmt(p.profile_id, today - datetime.timedelta(days=730), today),
+        "last_transitions": last_transactions_stmt(p.profile_id),
+        "search": search_stmt(p.profile_id, "uber", "postgresql", fuzzy=True),
+    }
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def check_plan(plan):
+    nodes = list(plan_nodes(plan[0]["Plan"]))
+    seq_scans = [n for n in nodes if n["Node Type"] == "Seq Scan" and n.get("Relation Name") == Transaction.__tablename__]
+    uses_index = any(n["Node Type"] in INDEX_NODES for n in nodes)
+    return seq_scans, uses_index, [n["Node Type"] for n in nodes]
+
+
+async def explain(conn, stmt):
+    compiled = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    plan = result.scalar()
+    return json.loads(plan) if isinstance(plan, str) else plan
+
+
+async def run(spec: DatasetSpec, threshold: int):
+    if engine.dialect.name != "postgresql":
+        sys.exit("bench.query_plans precisa de um Postgres (BENCH_DATABASE_URL=postgresql+asyncpg://...).")
+
+    await reset_schema()
+    seeded = await generate(spec)
+
+    failures = []
+    async with engine.connect() as conn:
+        await conn.execute(text(f"ANALYZE {Transaction.__tablename__}"))
+        rows = (await conn.execute(select(func.count()).select_from(Transaction))).scalar()
+        print(f"{Transaction.__tablename__}: {rows} linhas (limite {threshold})")
+
+        for name, stmt in hot_statements(seeded[0]).items():
+            seq_scans, uses_index, node_types = check_plan(await explain(conn, stmt))
+            ok = uses_index and not seq_scans
+            print(f"{'✅' if ok else '❌'} {name}: {' > '.join(node_types)}")
+            if rows >= threshold and not ok:
+                failures.append(name)
+
+    await engine.dispose()
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Asserções de plano para as queries quentes")
+    parser.add_argument("--threshold", type=int, default=10000, help="linhas em transactions a partir das quais Seq Scan é falha")
+    parser.add_argument("--profiles", type=int, default=20)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--tx-per-month", type=int, default=40)
+    args = parser.parse_args(argv)
+
+    spec = DatasetSpec(profiles=args.profiles, months=args.months, tx_per_month=args.tx_per_month)
+    failures = asyncio.run(run(spec, args.threshold))
+    if failures:
+        print(f"Planos sem índice: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# bench/regress.py
+# Gate de regressão de performance: roda o benchmark dos handlers e compara com bench/baseline.json.
+# Falha (exit 1) se alguma métrica piorar além da tolerância.
+#
+#   cd bot && BENCH_DATABASE_URL=... python -m bench.regress
+#   cd bot && BENCH_DATABASE_URL=... python -m bench.regress --update   # regrava o baseline
+#
+# Número de queries e de chamadas à Bot API são determinísticos (mesmo dataset, mesma seed):
+# por padrão qualquer aumento é regressão. O tempo mediano usa tolerância relativa.
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from bench.handlers import run, DatasetSpec
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+DEFAULT_PARAMS = {
+    "months": [1, 12],
+    "profiles": 1,
+    "accounts": 2,
+    "cards": 2,
+    "categories": 10,
+    "tx_per_month": 60,
+    "parcelados": 4,
+    "repeat": 5,
+}
+
+
+def compare(baseline: dict, current: dict, time_tolerance: float, query_tolerance: int, api_tolerance: int,
+            time_floor_ms: float = 0.0):
+    regressions = []
+    improvements = []
+    for size, handlers in baseline.items():
+        for name, base in handlers.items():
+            cur = current.get(size, {}).get(name)
+            if cur is None:
+                regressions.append(f"{size} {name}: ausente no resultado atual")
+                continue
+
+            checks = [
+                ("queries", base["queries"] + query_tolerance),
+                ("api_calls", base["api_calls"] + api_tolerance),
+                ("median_ms", max(base["median_ms"] * (1 + time_tolerance), base["median_ms"] + time_floor_ms)),
+            ]
+            if "warm_queries" in base:
+                checks.append(("warm_queries", base["warm_queries"] + query_tolerance))
+            for metric, limit in checks:
+                if cur[metric] > limit:
+                    regressions.append(f"{size} {name}: {metric} {base[metric]} -> {cur[metric]} (limite {limit:g})")
+                elif cur[metric] < base[metric] and metric != "median_ms":
+                    improvements.append(f"{size} {name}: {metric} {base[metric]} -> {cur[metric]}")
+    return regressions, improvements
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gate de regressão dos benchmarks de handlers")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update", action="store_true", help="grava o resultado atual como novo baseline")
+    parser.add_argument("--time-tolerance", type=float, default=float(os.getenv("BENCH_TIME_TOLERANCE", "0.5")),
+                        help="aumento relativo permitido no tempo mediano (0.5 = +50%%)")
+    parser.add_argument("--time-floor-ms", type=float, default=float(os.getenv("BENCH_TIME_FLOOR_MS", "10")),
+                        help="aumento absoluto (ms) abaixo do qual o tempo nunca é regressão")
+    parser.add_argument("--query-tolerance", type=int, default=int(os.getenv("BENCH_QUERY_TOLERANCE", "0")),
+                        help="queries extras permitidas por handler")
+    parser.add_argument("--api-tolerance", type=int, default=int(os.getenv("BENCH_API_TOLERANCE", "0")),
+                        help="chamadas extras à Bot API permitidas por handler")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    elif not args.update:
+        sys.exit(f"Baseline {args.baseline} não encontrado. Rode com --update para criá-lo.")
+
+    params = dict(DEFAULT_PARAMS, **(baseline or {}).get("params", {}))
+    spec = DatasetSpec(**{k: params[k] for k in ("profiles", "accounts", "cards", "categories", "tx_per_month", "parcelados")})
+    current = asyncio.run(run(params["months"], spec, params["repeat"]))
+
+    if args.update:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump({"params": params, "results": current}, fh, indent=2, ensure_ascii=False)
+            fh.write("\n")
+        print(f"Baseline gravado em {args.baseline}")
+        return
+
+    regressions, improvements = compare(
+        baseline["results"], current, args.time_tolerance, args.query_tolerance, args.api_tolerance,
+        args.time_floor_ms,
+    )
+    for line in improvements:
+        print(f"✅ {line}")
+    for line in regressions:
+        print(f"❌ {line}")
+    if regressions:
+        print(f"{len(regressions)} regressão(ões) encontrada(s).")
+        sys.exit(1)
+    print("Sem regressões.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# bench/replay.py
+# Teste de carga do Application completo (main.build_application) contra o servidor falso da Bot API.
+# Reproduz conversas roteirizadas de muitos usuários sintéticos e mede vazão, latência de cauda
+# por comando e chamadas à Bot API por conversa. Passos button("...") apertam o botão inline
+# oferecido (callback_query com o callback_data "prefixo:id" do teclado enviado), como o usuário faz;
+# conversas que não terminam com a resposta esperada são contadas como falhas.
+#
+#   cd bot && BENCH_DATABASE_URL=postgresql+asyncpg://... python -m bench.replay --users 200 --rounds 5
+import argparse
+import asyncio
+import logging
+import random
+import time
+from collections import defaultdict
+
+from bench.common import engine, reset_schema
+from bench.fake_api import FakeBotAPI
+
+from telegram import Update
+from telegram.ext import TypeHandler
+from main import build_application
+
+BENCH_TOKEN = "123456:BENCH"
+USER_ID_BASE = 700_000
+
+
+
+def button(label: str):
+    """Passo que aperta o botão inline cujo rótulo começa com `label`."""
+    return ("button", label)
+
+
+CONVERSATIONS = {
+    # {n}: número da conversa do usuário, para repetições não caírem no aviso de lançamento repetido
+    "/add": ["/add", "entrada", "3500", "salário {n}", button("Principal")],
+    "/comprarapida": ["/comprarapida", "25,90", "Mercado", button("Não"), button("Principal"), "padaria {n}"],
+    "/resumo": ["/resumo"],
+    "/carteira": ["/carteira"],
+}
+# começo da última mensagem do bot numa conversa completa
+EXPECTED_REPLY = {
+    "/add": "✅ Transação registrada",
+    "/comprarapida": "✅ Transação registrada",
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+class Stats:
+    def __init__(self):
+        self.step_latency = defaultdict(list)       # comando -> latências (ms) de cada passo
+        self.conversation_latency = defaultdict(list)
+        self.api_calls = defaultdict(list)          # comando -> chamadas à Bot API por conversa
+        self.failures = defaultdict(int)            # comando -> conversas sem a resposta esperada
+        self.updates = 0
+
+
+async def run_step(api: FakeBotAPI, user_id: int, step):
+    sent = time.perf_counter()
+    if isinstance(step, tuple):
+        _, done = api.push_callback(user_id, step[1])
+    else:
+        _, done = api.push_update(user_id, step)
+    finished = await done
+    return (finished - sent) * 1000
+
+
+async def run_user(api: FakeBotAPI, stats: Stats, user_id: int, rounds: int, rng: random.Random):
+    await run_step(api, user_id, "/start")
+    stats.updates += 1
+    for n in range(rounds):
+        command = rng.choice(list(CONVERSATIONS))
+        calls_before = api.calls_by_chat[user_id]
+        conv_start = time.perf_counter()
+        try:
+            for step in CONVERSATIONS[command]:
+                step = step if isinstance(step, tuple) else step.format(n=n)
+                stats.step_latency[command].append(await run_step(api, user_id, step))
+                stats.updates += 1
+        except LookupError:
+            # o botão esperado não foi oferecido: a conversa saiu do roteiro
+            stats.failures[command] += 1
+            await run_step(api, user_id, "/exit")
+            continue
+        stats.conversation_latency[command].append((time.perf_counter() - conv_start) * 1000)
+        stats.api_calls[command].append(api.calls_by_chat[user_id] - calls_before)
+        expected = EXPECTED_REPLY.get(command)
+        if expected and not (api.last_text.get(user_id) or "").startswith(expected):
+            stats.failures[command] += 1
+
+
+async def run(users: int, rounds: int, port: int, concurrent_updates: int, seed: int):
+    await reset_schema()
+    api = FakeBotAPI(port=port)
+    await api.start()
+
+    app = build_application(
+        token=BENCH_TOKEN,
+        base_url=api.base_url,
+        concurrent_updates=concurrent_updates if concurrent_updates > 1 else False,
+    )
+
+    async def mark_done(update: Update, context):
+        api.mark_done(update.update_id)
+
+    # grupo alto: roda depois que o handler do grupo 0 terminou de processar o update
+    app.add_handler(TypeHandler(Update, mark_done), group=99)
+
+    await app.initialize()
+    await app.start()
+    await app.updater.start_polling(poll_interval=0, timeout=10)
+
+    stats = Stats()
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(
+            run_user(api, stats, USER_ID_BASE + i, rounds, random.Random(rng.random()))
+            for i in range(users)
+        ))
+    finally:
+        elapsed = time.perf_counter() - started
+        await app.updater.stop()
+        await app.stop()
+        await app.shutdown()
+        await api.stop()
+        await engine.dispose()
+
+    return stats, elapsed, api
+
+
+def report(stats: Stats, elapsed: float, api: FakeBotAPI):
+    print(f"updates: {stats.updates} em {elapsed:.2f}s -> {stats.updates / elapsed:.1f} updates/s")
+    print(f"chamadas à Bot API: {sum(api.calls_by_method.values())} {dict(api.calls_by_method)}")
+    print()
+    print(f"{'comando':<14} {'conv':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'api/conv':>9} {'falhas':>7}")
+    for command, latencies in stats.step_latency.items():
+        calls = stats.api_calls[command]
+        print(
+            f"{command:<14} {len(calls):>5} {percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} "
+            f"{percentile(latencies, 99):>8.1f} {max(latencies):>8.1f} {sum(calls) / max(1, len(calls)):>9.1f} "
+            f"{stats.failures[command]:>7}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay de conversas contra uma Bot API falsa")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5, help="conversas por usuário")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--concurrent-updates", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    # o log INFO de cada requisição do httpx domina o tempo medido
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    stats, elapsed, api = asyncio.run(run(args.users, args.rounds, args.port, args.concurrent_updates, args.seed))
+    report(stats, elapsed, api)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# bench/startup.py
+# Partida a frio: sobe o bot (main.main) num processo novo contra a Bot API falsa e mede
+#   - pronto: do spawn do processo até o primeiro getUpdates (imports + initialize + set_my_commands);
+#   - 1º update: do spawn até a resposta ao primeiro update, que já está na fila quando o bot sobe
+#     (com --delay N, o update chega N s depois do primeiro getUpdates e mede-se só a resposta a ele —
+#     é onde o aquecimento em segundo plano, utils/warmup.py, aparece).
+# O aviso "⌛ ..." é desligado no processo do bot para que a primeira chamada ao chat seja a resposta.
+#
+#   cd bot && BENCH_DATABASE_URL=... python -m bench.startup --commands /carteira,/resumo --repeat 5
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+BENCH_TOKEN = "123456:BENCH"
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def child(port: int):
+    # processo do bot: nada do bench é importado antes de main, para medir os imports de verdade
+    from main import build_application, main as bot_main
+
+    app = build_application(token=BENCH_TOKEN, base_url=f"http://127.0.0.1:{port}/bot")
+    asyncio.run(bot_main(app))
+
+
+async def measure_once(telegram_id: int, command: str, warmup: bool, delay: float, port: int, timeout: float):
+    from bench.fake_api import FakeBotAPI
+
+    api = FakeBotAPI(port=port)
+    await api.start()
+    env = dict(os.environ, WARMUP_ON_START="1" if warmup else "0", LOADING_DELAY_SECONDS="3600")
+    reply = api.wait_for_chat(telegram_id)
+    if not delay:
+        api.push_update(telegram_id, command)
+
+    started = time.perf_counter()
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "bench.startup", "--child", "--port", str(port),
+        cwd=BOT_DIR, env=env, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+    )
+    try:
+        await asyncio.wait_for(api.polling.wait(), timeout)
+        ready = time.perf_counter() - started
+        pushed = started
+        if delay:
+            await asyncio.sleep(delay)
+            pushed = time.perf_counter()
+            api.push_update(telegram_id, command)
+        answered = await asyncio.wait_for(reply, timeout)
+    finally:
+        proc.terminate()
+        await proc.wait()
+        await api.stop()
+    return ready * 1000, (answered - pushed) * 1000
+
+
+async def run(commands, repeat: int, months: int, delay: float, port: int, timeout: float):
+    # o banco do benchmark vira o DATABASE_URL deste processo e, pelo ambiente, do processo do bot
+    from bench.common import engine, reset_schema
+    from bench.dataset import DatasetSpec, generate
+
+    await reset_schema()
+    seeded = await generate(DatasetSpec(months=months))
+    await engine.dispose()
+    telegram_id = seeded[0].telegram_id
+
+    results = {}
+    for command in commands:
+        for warmup in (False, True):
+            samples = [await measure_once(telegram_id, command, warmup, delay, port, timeout) for _ in range(repeat)]
+            results[(command, warmup)] = (
+                statistics.median(s[0] for s in samples),
+                statistics.median(s[1] for s in samples),
+            )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de subida do bot e do primeiro update")
+    parser.add_argument("--commands", default="/carteira,/resumo")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="segundos entre o primeiro getUpdates e o envio do update (0 = já na fila)")
+    parser.add_argument("--port", type=int, default=8083)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.port)
+        return
+
+    commands = [c for c in args.commands.split(",") if c]
+    results = asyncio.run(run(commands, args.repeat, args.months, args.delay, args.port, args.timeout))
+    label = "1º update ms" if not args.delay else f"resposta ms (+{args.delay:g}s)"
+    print(f"{'comando':<12} {'aquecimento':<12} {'pronto ms':>10} {label:>20}")
+    for (command, warmup), (ready_ms, answer_ms) in results.items():
+        print(f"{command:<12} {'sim' if warmup else 'não':<12} {ready_ms:>10.0f} {answer_ms:>20.0f}")
+
+
+if __name__ == "__main__":
+    main()
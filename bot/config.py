@@ -7,3 +7,28 @@ class Env:
    TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
    DATABASE_URL = os.getenv("DATABASE_URL")
    ID_USER = os.getenv("ID_USER")
+   # perfis mantidos no cache de categorias/contas (LRU)
+   REFCACHE_MAX_PROFILES = int(os.getenv("REFCACHE_MAX_PROFILES", "1024"))
+   # relatórios calculados mantidos em cache (LRU), ver db/reportcache.py
+   REPORTCACHE_MAX_ENTRIES = int(os.getenv("REPORTCACHE_MAX_ENTRIES", "2048"))
+   # meia-vida (dias) do peso de uso das categorias nas sugestões
+   CATEGORY_USAGE_HALF_LIFE_DAYS = float(os.getenv("CATEGORY_USAGE_HALF_LIFE_DAYS", "30"))
+   # aviso diário da /carteira (hora local do servidor, HH:MM) e envios por segundo nas mensagens em massa
+   DAILY_PUSH_TIME = os.getenv("DAILY_PUSH_TIME", "08:00")
+   BROADCAST_RATE_PER_SECOND = float(os.getenv("BROADCAST_RATE_PER_SECOND", "25"))
+   # limites de saída da Bot API (utils/ratelimit.py): total por bot, por conversa privada e reenvios após RetryAfter
+   RATE_LIMIT_GLOBAL_PER_SECOND = float(os.getenv("RATE_LIMIT_GLOBAL_PER_SECOND", "30"))
+   RATE_LIMIT_CHAT_PER_SECOND = float(os.getenv("RATE_LIMIT_CHAT_PER_SECOND", "1"))
+   RATE_LIMIT_CHAT_BURST = float(os.getenv("RATE_LIMIT_CHAT_BURST", "5"))
+   RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3"))
+   # avisos "⌛ ..." só aparecem se a resposta demorar mais que isso (segundos), ver utils/replies.py
+   LOADING_DELAY_SECONDS = float(os.getenv("LOADING_DELAY_SECONDS", "0.5"))
+   # gráficos do /resumo (handlers/summary.py): CHART_RENDERER=matplotlib|pillow escolhe quem desenha;
+   # CHART_COMPACT=1 usa DPI menor e paleta reduzida; CHART_FORMAT=webp envia WebP em vez de PNG
+   CHART_RENDERER = os.getenv("CHART_RENDERER", "matplotlib")
+   CHART_COMPACT = os.getenv("CHART_COMPACT", "0").lower() in ("1", "true", "sim")
+   CHART_FORMAT = os.getenv("CHART_FORMAT", "png")
+   # aquecimento em segundo plano depois que o polling começa (utils/warmup.py): banco, gráficos e
+   # dados de referência dos perfis mais ativos
+   WARMUP_ON_START = os.getenv("WARMUP_ON_START", "1").lower() in ("1", "true", "sim")
+   WARMUP_PROFILES = int(os.getenv("WARMUP_PROFILES", "100"))
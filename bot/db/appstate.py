@@ -0,0 +1,50 @@
+# db/appstate.py
+# Estado do próprio bot no banco (tabela app_state), para a subida pular trabalho que não mudou:
+#   - SCHEMA_KEY: hash do DDL do metadata que init_db aplicou por último;
+#   - COMMANDS_KEY: hash da lista de comandos enviada com set_my_commands (e do bot que a recebeu).
+# Fica no banco e não num arquivo local: em deploys com containers o disco não sobrevive ao restart,
+# e todas as réplicas enxergam o mesmo valor.
+import hashlib
+import json
+import logging
+
+from sqlalchemy import select, func
+from sqlalchemy.exc import SQLAlchemyError
+
+from db.session import get_session, dialect_insert
+from db.models import AppState
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_KEY = "schema"
+COMMANDS_KEY = "bot_commands"
+
+
+def digest(value) -> str:
+    """sha256 de um valor serializável em JSON (ordem das chaves não importa)."""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+async def get_state(key: str):
+    """Valor guardado ou None — inclusive se a tabela ainda não existe (banco sem init_db)."""
+    try:
+        async with get_session() as session:
+            return (await session.execute(select(AppState.value).where(AppState.key == key))).scalar()
+    except SQLAlchemyError:
+        logger.debug("app_state indisponível", exc_info=True)
+        return None
+
+
+async def set_state(key: str, value: str) -> bool:
+    try:
+        async with get_session() as session:
+            async with session.begin():
+                stmt = dialect_insert(session, AppState).values(key=key, value=value)
+                await session.execute(stmt.on_conflict_do_update(
+                    index_elements=[AppState.key],
+                    set_={"value": stmt.excluded.value, "updated_at": func.now()},
+                ))
+        return True
+    except SQLAlchemyError:
+        logger.warning("Não foi possível gravar %s em app_state", key, exc_info=True)
+        return False
@@ -5,7 +5,7 @@ from sqlalchemy.future import select
 
 async def auth(update: Update):
     
-    user_id = update.message.from_user.id
+    user_id = update.effective_user.id
 
     async with get_session() as session:
         result = await session.execute(
@@ -14,7 +14,7 @@ async def auth(update: Update):
         profile = result.scalar_one_or_none()
 
     if not profile:
-        await update.message.reply_text(
+        await update.effective_message.reply_text(
             "❌ Você ainda não possui uma conta.\n"
             "Use /start para criar seu perfil e começar a usar o  "
         )
@@ -0,0 +1,150 @@
+# db/autocat.py
+# Auto-categorização pela descrição: índice por perfil token -> categoria -> ocorrências (CategoryToken).
+# Cada lançamento com categoria soma +1 aos seus tokens num único upsert, na mesma transação;
+# sugerir é uma query pela chave primária (profile_id, token) com os poucos tokens da descrição,
+# sem olhar o histórico. O índice guarda só tokens normalizados e contagens, e pode ser refeito
+# com uma única passada em streaming sobre as transações:  python -m db.autocat
+import re
+import asyncio
+from collections import Counter, defaultdict
+
+from sqlalchemy import select, delete, insert
+
+from db.session import get_session, dialect_insert
+from db.models import CategoryToken, Transaction
+from utils.parsers import normalize_name
+
+MAX_TOKENS = 8           # tokens aproveitados por descrição
+MIN_HITS = 2             # ocorrências mínimas da categoria sugerida
+MIN_AGREEMENT = 0.6      # fração média dos tokens que apontam para a categoria sugerida
+REBUILD_BATCH_SIZE = 2000
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "de", "da", "do", "das", "dos", "no", "na", "nos", "nas", "em", "com", "para", "pra", "por",
+    "uma", "um", "the", "and", "compra", "pagamento", "pgto", "pix", "ted", "doc", "debito", "credito",
+    # sufixos que o próprio bot acrescenta à descrição salva (parcelamento, dívidas)
+    "parcelado", "total", "divida", "meses", "abatidos", "antes", "depois",
+}
+
+
+def tokenize(description: str) -> list:
+    """Tokens distintos, normalizados (minúsculas, sem acento), sem números e palavras vazias."""
+    tokens = []
+    for word in WORD_RE.findall(normalize_name(description)):
+        if len(word) < 3 or word.isdigit() or word in STOPWORDS or word in tokens:
+            continue
+        tokens.append(word[:32])
+        if len(tokens) >= MAX_TOKENS:
+            break
+    return tokens
+
+
+class TokenIndex:
+    """Contagens token -> {categoria: ocorrências} em memória (todas do perfil ou só as da descrição)."""
+
+    def __init__(self, rows=()):
+        self.counts = defaultdict(dict)
+        for token, category_id, hits in rows:
+            self.counts[token][category_id] = hits
+
+    def suggest(self, description: str):
+        """Id da categoria mais provável, ou None se os tokens não concordarem o bastante."""
+        seen = [t for t in tokenize(description) if t in self.counts]
+        if not seen:
+            return None
+        share = Counter()
+        support = Counter()
+        for token in seen:
+            per_category = self.counts[token]
+            total = sum(per_category.values())
+            for category_id, hits in per_category.items():
+                share[category_id] += hits / total
+                support[category_id] += hits
+        category_id, score = share.most_common(1)[0]
+        if support[category_id] < MIN_HITS or score / len(seen) < MIN_AGREEMENT:
+            return None
+        return category_id
+
+
+def _upsert(session, rows):
+    stmt = dialect_insert(session, CategoryToken).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[CategoryToken.profile_id, CategoryToken.token, CategoryToken.category_id],
+        set_={"hits": CategoryToken.hits + stmt.excluded.hits},
+    )
+
+
+async def learn_category(session, profile_id: int, category_id: int, description: str):
+    """Chamar na mesma sessão/transação que grava o lançamento; no máximo uma query."""
+    tokens = tokenize(description)
+    if not tokens or category_id is None:
+        return
+    await session.execute(_upsert(session, [
+        {"profile_id": profile_id, "token": t, "category_id": category_id, "hits": 1} for t in tokens
+    ]))
+
+
+async def suggest_category(session, profile_id: int, description: str):
+    """Categoria sugerida para a descrição (id ou None), lendo só as linhas dos tokens dela."""
+    tokens = tokenize(description)
+    if not tokens:
+        return None
+    result = await session.execute(
+        select(CategoryToken.token, CategoryToken.category_id, CategoryToken.hits)
+        .where(CategoryToken.profile_id == profile_id)
+        .where(CategoryToken.token.in_(tokens))
+    )
+    return TokenIndex(result.all()).suggest(description)
+
+
+async def load_index(session, profile_id: int) -> TokenIndex:
+    """Índice inteiro do perfil, para categorizar muitas descrições de uma vez (ex.: /importar)."""
+    result = await session.execute(
+        select(CategoryToken.token, CategoryToken.category_id, CategoryToken.hits)
+        .where(CategoryToken.profile_id == profile_id)
+    )
+    return TokenIndex(result.all())
+
+
+async def rebuild_index(profile_id: int = None) -> int:
+    """Refaz o índice (de um perfil ou de todos) numa passada em streaming pelas transações; retorna nº de linhas."""
+    stmt = (
+        select(Transaction.profile_id, Transaction.category_id, Transaction.description)
+        .where(Transaction.category_id.is_not(None))
+        .where(Transaction.description.is_not(None))
+        .execution_options(yield_per=REBUILD_BATCH_SIZE)
+    )
+    if profile_id is not None:
+        stmt = stmt.where(Transaction.profile_id == profile_id)
+
+    counts = Counter()
+    async with get_session() as session:
+        result = await session.stream(stmt)
+        async for partition in result.partitions():
+            for tx_profile_id, category_id, description in partition:
+                for token in tokenize(description):
+                    counts[(tx_profile_id, token, category_id)] += 1
+
+    rows = [
+        {"profile_id": p, "token": t, "category_id": c, "hits": hits}
+        for (p, t, c), hits in counts.items()
+    ]
+    async with get_session() as session:
+        async with session.begin():
+            wipe = delete(CategoryToken)
+            if profile_id is not None:
+                wipe = wipe.where(CategoryToken.profile_id == profile_id)
+            await session.execute(wipe)
+            for i in range(0, len(rows), REBUILD_BATCH_SIZE):
+                await session.execute(insert(CategoryToken), rows[i:i + REBUILD_BATCH_SIZE])
+    return len(rows)
+
+
+async def main():
+    rows = await rebuild_index()
+    print(f"🔤 índice de auto-categorização refeito: {rows} linhas")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
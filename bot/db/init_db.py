@@ -1,9 +1,12 @@
 from  db.session import init_db
+import argparse
 import asyncio
 
 # Função principal
-async def main():
-    await init_db()
+async def main(force: bool = False):
+    await init_db(force=force)
     
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Cria/atualiza as tabelas do banco")
+    parser.add_argument("--force", action="store_true", help="aplica o schema mesmo que o hash guardado seja o atual")
+    asyncio.run(main(parser.parse_args().force))
\ No newline at end of file
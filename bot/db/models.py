@@ -1,8 +1,8 @@
 import enum
 import sqlalchemy as sa
-from sqlalchemy import Column, Integer, String, Float, Date, Text, Enum, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, Enum, ForeignKey, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
-from  db.session import Base
+from  db.session import Base, pg_trgm_available
 
 
 # ===== ENUMS =====
@@ -39,6 +39,12 @@ class Profile(Base):
     name = Column(String(120), nullable=True)
     emergency_fund = Column(Float, nullable=False, default=0.0)
     telegram_id = Column(Integer, unique=True, nullable=False)
+    # incrementado a cada criação/renomeação/remoção de categoria ou conta (invalida db.refcache)
+    ref_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # incrementado a cada escrita em transações, saldos ou dívidas (invalida db.reportcache)
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # aviso diário da /carteira (opt-in: /carteira diario on)
+    daily_push = Column(Boolean, nullable=False, default=False, server_default=sa.false())
 
     # Relações
     accounts = relationship("Account", back_populates="profile", cascade="all, delete-orphan")
@@ -76,6 +82,13 @@ class Category(Base):
     profile_id = Column(Integer, ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False)
     name = Column(String(100), nullable=False)
     type = Column(Enum(CategoryType), nullable=False, default=CategoryType.VARIAVEL)
+    # soma dos pesos de uso com decaimento (ver db/usage.py); maior = mais provável
+    usage_score = Column(Float, nullable=False, default=0.0, server_default="0")
+
+    __table_args__ = (
+        # sugestões de categoria já ordenadas por uso
+        sa.Index("ix_categories_profile_type_usage", "profile_id", "type", "usage_score"),
+    )
 
     profile = relationship("Profile", back_populates="categories")
     transactions = relationship("Transaction", back_populates="category", cascade="all, delete-orphan")
@@ -84,6 +97,29 @@ class Category(Base):
         return f"<Category(id={self.id}, name='{self.name}', profile_id={self.profile_id})>"
 
 
+class RecurringExpense(Base):
+    # despesa fixa mensal lançada automaticamente no dia `day_of_month` (ver handlers/recurring.py)
+    __tablename__ = "recurring_expenses"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    profile_id = Column(Integer, ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
+    account_id = Column(Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False)
+    value = Column(Float, nullable=False)
+    day_of_month = Column(Integer, nullable=False)
+    description = Column(String(255), nullable=True)
+    # próximo vencimento ainda não lançado; o job pega todos com next_due <= hoje
+    next_due = Column(Date, nullable=False)
+    active = Column(Boolean, nullable=False, default=True)
+
+    __table_args__ = (
+        sa.Index("ix_recurring_expenses_active_next_due", "active", "next_due"),
+    )
+
+    def __repr__(self):
+        return f"<RecurringExpense(id={self.id}, value={self.value}, day_of_month={self.day_of_month}, next_due={self.next_due})>"
+
+
 class Transaction(Base):
     __tablename__ = "transactions"
 
@@ -103,6 +139,25 @@ class Transaction(Base):
     balance_before = Column(Float, nullable=True) 
 
     is_settled = Column(Boolean, default=False, nullable=False)
+    # lançamento gerado por um modelo recorrente (ver handlers/recurring.py)
+    recurring_id = Column(Integer, ForeignKey("recurring_expenses.id", ondelete="SET NULL"), nullable=True)
+
+    __table_args__ = (
+        # resumo mensal (somas por período) e listagem das últimas transações
+        sa.Index("ix_transactions_profile_date", "profile_id", "date", "id"),
+        # carteira: última entrada / gastos da conta por tipo e data
+        sa.Index("ix_transactions_account_type_date", "account_id", "type", "date"),
+        # faturas abertas de cartão
+        sa.Index("ix_transactions_account_unsettled", "account_id",
+                 postgresql_where=sa.text("is_settled = false")),
+        # /buscar (só Postgres): palavras da descrição (full-text) e trechos/erros de digitação (trigramas)
+        sa.Index("ix_transactions_description_fts", sa.text("to_tsvector('portuguese', coalesce(description, ''))"),
+                 postgresql_using="gin").ddl_if(dialect="postgresql"),
+        sa.Index("ix_transactions_description_trgm", "description",
+                 postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}).ddl_if(callable_=pg_trgm_available),
+        # no máximo um lançamento por (modelo recorrente, vencimento): rodar o job de novo não duplica
+        sa.Index("uq_transactions_recurring_date", "recurring_id", "date", unique=True),
+    )
 
     # Relações
     account = relationship("Account", back_populates="transactions", foreign_keys=[account_id])
@@ -127,6 +182,13 @@ class Debt(Base):
     description = Column(Text, nullable=True)
     status = Column(Enum(DebtStatus, name="debtstatus"), nullable=False, default=DebtStatus.OPEN)
     type = Column(Enum(DebtType, name="debttype"), nullable=False, default=DebtType.REAL)
+
+    __table_args__ = (
+        # creditor ILIKE '%#<id>' / '<cartão> - Parcelado #%' no pagamento de fatura e no parcelamento
+        sa.Index("ix_debts_creditor_trgm", "creditor",
+                 postgresql_using="gin", postgresql_ops={"creditor": "gin_trgm_ops"}).ddl_if(callable_=pg_trgm_available),
+    )
+
     profile = relationship("Profile", back_populates="debts")
 
     @property
@@ -138,3 +200,46 @@ class Debt(Base):
 
     def __repr__(self):
         return f"<Debt(id={self.id}, creditor={self.creditor!r}, monthly_payment={self.monthly_payment}, months={self.months}, status={self.status})>"
+
+
+class CategoryToken(Base):
+    # índice de auto-categorização: quantas vezes um token da descrição apareceu com a categoria (ver db/autocat.py)
+    __tablename__ = "category_tokens"
+
+    profile_id = Column(Integer, ForeignKey("profiles.id", ondelete="CASCADE"), primary_key=True)
+    token = Column(String(32), primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    hits = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CategoryToken(profile_id={self.profile_id}, token={self.token!r}, category_id={self.category_id}, hits={self.hits})>"
+
+
+class StatementImport(Base):
+    __tablename__ = "statement_imports"
+    __table_args__ = (
+        UniqueConstraint("profile_id", "content_hash", name="uq_statement_imports_profile_hash"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    profile_id = Column(Integer, ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False)
+    account_id = Column(Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    filename = Column(String(255), nullable=True)
+    rows = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, server_default=sa.func.now())
+
+    def __repr__(self):
+        return f"<StatementImport(id={self.id}, account_id={self.account_id}, rows={self.rows})>"
+
+
+class AppState(Base):
+    # estado do próprio bot (chave -> valor), ver db/appstate.py: hash do schema aplicado e dos comandos registrados
+    __tablename__ = "app_state"
+
+    key = Column(String(64), primary_key=True)
+    value = Column(String(255), nullable=False)
+    updated_at = Column(DateTime, nullable=False, server_default=sa.func.now())
+
+    def __repr__(self):
+        return f"<AppState(key={self.key!r}, value={self.value!r})>"
@@ -0,0 +1,120 @@
+# db/refcache.py
+# Cache por perfil dos dados de referência: categorias, contas e cartões.
+# Guarda snapshots imutáveis (id, nome, tipo, moeda) — nunca saldo — e é validado por Profile.ref_version,
+# que todo writer de categoria/conta incrementa na mesma transação (bump_ref_version).
+# Como auth() já carrega o Profile, conferir o cache não custa nenhuma query.
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import select, update
+
+from config import Env
+from db.session import get_session
+from db.models import Profile, Category, Account
+
+ACCOUNT_TYPE_BANK = "bank"
+ACCOUNT_TYPE_CARD = "credit_card"
+
+
+@dataclass(frozen=True, slots=True)
+class RefItem:
+    id: int
+    name: str
+    type: object          # CategoryType para categorias; "bank" / "credit_card" para contas
+    currency: object = None
+
+
+@dataclass(frozen=True, slots=True)
+class RefData:
+    version: int
+    categories: tuple     # ordenados por nome
+    accounts: tuple       # contas bancárias, ordenadas por nome
+    cards: tuple          # cartões de crédito, ordenados por nome
+
+    def category(self, category_id: int):
+        return next((c for c in self.categories if c.id == category_id), None)
+
+    def account(self, account_id: int):
+        return next((a for a in self.accounts + self.cards if a.id == account_id), None)
+
+    def find_category(self, name: str, category_type=None):
+        """Busca por nome sem diferenciar maiúsculas (como Category.name.ilike(name))."""
+        key = (name or "").strip().casefold()
+        return next(
+            (c for c in self.categories
+             if c.name.casefold() == key and (category_type is None or c.type == category_type)),
+            None,
+        )
+
+    def find_account(self, name: str, account_type: str = None):
+        key = (name or "").strip().casefold()
+        pool = self.accounts + self.cards if account_type is None else (
+            self.cards if account_type == ACCOUNT_TYPE_CARD else self.accounts
+        )
+        return next((a for a in pool if a.name.casefold() == key), None)
+
+
+_cache = OrderedDict()  # profile_id -> RefData, do menos para o mais recentemente usado
+
+
+async def _load(profile_id: int, version: int) -> RefData:
+    async with get_session() as session:
+        result = await session.execute(
+            select(Category.id, Category.name, Category.type)
+            .where(Category.profile_id == profile_id)
+            .order_by(Category.name)
+        )
+        categories = tuple(RefItem(*row) for row in result.all())
+        result = await session.execute(
+            select(Account.id, Account.name, Account.type, Account.currency)
+            .where(Account.profile_id == profile_id)
+            .order_by(Account.name)
+        )
+        accounts = [RefItem(*row) for row in result.all()]
+
+    return RefData(
+        version=version,
+        categories=categories,
+        accounts=tuple(a for a in accounts if a.type == ACCOUNT_TYPE_BANK),
+        cards=tuple(a for a in accounts if a.type == ACCOUNT_TYPE_CARD),
+    )
+
+
+async def get_ref_data(profile_id: int, version: int = None) -> RefData:
+    """
+    Dados de referência do perfil. Passe `version` (profile.ref_version, vindo de auth) para
+    validar sem query; sem ele a versão é lida do banco (1 query pelo PK).
+    """
+    if version is None:
+        async with get_session() as session:
+            version = (await session.execute(
+                select(Profile.ref_version).where(Profile.id == profile_id)
+            )).scalar() or 0
+
+    cached = _cache.get(profile_id)
+    if cached is not None and cached.version == version:
+        _cache.move_to_end(profile_id)
+        return cached
+
+    data = await _load(profile_id, version)
+    _cache[profile_id] = data
+    _cache.move_to_end(profile_id)
+    while len(_cache) > Env.REFCACHE_MAX_PROFILES:
+        _cache.popitem(last=False)
+    return data
+
+
+async def bump_ref_version(session, profile_id: int):
+    """Chamar na mesma sessão/transação que cria, renomeia ou remove categoria ou conta."""
+    await session.execute(
+        update(Profile).where(Profile.id == profile_id).values(ref_version=Profile.ref_version + 1)
+    )
+    _cache.pop(profile_id, None)
+
+
+def clear():
+    _cache.clear()
+
+
+def cache_info():
+    return {"profiles": len(_cache), "max_profiles": Env.REFCACHE_MAX_PROFILES}
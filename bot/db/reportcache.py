@@ -0,0 +1,48 @@
+# db/reportcache.py
+# Cache read-through dos relatórios (/resumo, /carteira, resumo do /meusdados).
+# Cada perfil tem Profile.data_version, incrementado na mesma transação por todo writer de
+# transações, saldos e dívidas (bump_data_version). Um resultado guardado só vale enquanto
+# (data_version, ref_version) do perfil — lidos por auth() antes de calcular — não mudarem.
+# Ler a versão antes de calcular é o que torna o cache seguro: um writer concorrente sempre
+# deixa a entrada com versão antiga, nunca uma entrada nova com dados velhos.
+from collections import OrderedDict
+
+from sqlalchemy import update
+
+from config import Env
+from db.models import Profile
+
+_cache = OrderedDict()  # (kind, profile_id, key) -> (versão, valor), do menos para o mais recente
+
+
+def _version(profile):
+    return (profile.data_version, profile.ref_version)
+
+
+def get_report(profile, kind: str, key=()):
+    """Valor calculado para (kind, key) na versão atual do perfil, ou None."""
+    cache_key = (kind, profile.id, key)
+    hit = _cache.get(cache_key)
+    if hit is None or hit[0] != _version(profile):
+        return None
+    _cache.move_to_end(cache_key)
+    return hit[1]
+
+
+def put_report(profile, kind: str, key, value):
+    cache_key = (kind, profile.id, key)
+    _cache[cache_key] = (_version(profile), value)
+    _cache.move_to_end(cache_key)
+    while len(_cache) > Env.REPORTCACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+
+async def bump_data_version(session, profile_id: int):
+    """Chamar na mesma sessão/transação de qualquer escrita em transações, saldos ou dívidas."""
+    await session.execute(
+        update(Profile).where(Profile.id == profile_id).values(data_version=Profile.data_version + 1)
+    )
+
+
+def clear():
+    _cache.clear()
@@ -1,7 +1,10 @@
 import re
 from contextlib import asynccontextmanager
+from sqlalchemy import inspect as sa_inspect, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.schema import CreateTable, CreateIndex
 from  config import Env
 
 DATABASE_URL = Env.DATABASE_URL  
@@ -12,13 +15,86 @@ engine = create_async_engine(DATABASE_URL, echo=True, pool_pre_ping=True)
 AsyncSessionMaker = async_sessionmaker(bind=engine, expire_on_commit=False)
 Base = declarative_base()
 
+def _create_missing_indexes(sync_conn):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
+def _add_missing_columns(sync_conn):
+    # create_all também não adiciona colunas novas; só colunas com server_default ou anuláveis
+    inspector = sa_inspect(sync_conn)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=sync_conn.dialect)}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg}"
+            if not column.nullable:
+                ddl += " NOT NULL"
+            sync_conn.execute(text(ddl))
+
+
+def _create_extensions(sync_conn):
+    # pg_trgm: índices de trigramas para busca por trecho (ILIKE '%...%') e aproximada; sem permissão, segue sem eles
+    if sync_conn.dialect.name != "postgresql":
+        return
+    try:
+        with sync_conn.begin_nested():
+            sync_conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except Exception as e:
+        print(f"⚠️ pg_trgm indisponível, índices de trigramas não serão criados: {e}")
+
+
+def pg_trgm_available(ddl, target, bind, **kw):
+    # condição (Index.ddl_if) dos índices de trigramas: só Postgres com a extensão instalada
+    if bind is None or bind.dialect.name != "postgresql":
+        return False
+    return bind.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+
+
+def dialect_insert(session, target):
+    # INSERT com ON CONFLICT (on_conflict_do_nothing/do_update) do dialeto em uso: Postgres ou SQLite
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    return dialect.insert(target)
+
+
 @asynccontextmanager
 async def get_session():
     async with AsyncSessionMaker() as session:
         yield session
 
-async def init_db():
+def schema_fingerprint(dialect) -> str:
+    # DDL de todas as tabelas e índices no dialeto do banco: muda com qualquer coluna, tipo, default ou índice
+    from db.appstate import digest
+    ddl = []
+    for table in Base.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        ddl.extend(str(CreateIndex(index).compile(dialect=dialect)) for index in sorted(table.indexes, key=lambda i: i.name))
+    return digest(ddl)
+
+
+async def init_db(force: bool = False):
+    # create_all + reflexão custam dezenas de round trips; se o schema aplicado da última vez é o mesmo
+    # deste código (hash em app_state), basta uma leitura pela PK. force=True refaz tudo (ex: pg_trgm
+    # instalado depois, índice apagado à mão).
     import  db.models
+    from db.appstate import get_state, set_state, SCHEMA_KEY
+    fingerprint = schema_fingerprint(engine.dialect)
+    if not force and await get_state(SCHEMA_KEY) == fingerprint:
+        print("📦 init_db: schema inalterado, nada a fazer")
+        return
+
     async with engine.begin() as conn:      
+        await conn.run_sync(_create_extensions)
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        # create_all não cria índices novos em tabelas que já existem
+        await conn.run_sync(_create_missing_indexes)
+    await set_state(SCHEMA_KEY, fingerprint)
     print("📦 init_db finalizado")
@@ -0,0 +1,73 @@
+# db/usage.py
+# Ranking das categorias por uso, com decaimento exponencial.
+# Um uso no dia d soma 2 ** ((d - USAGE_EPOCH) / meia-vida) a Category.usage_score. Como os pesos de
+# todos os usos passados "decaem" no mesmo ritmo em relação ao presente, ordenar por usage_score é o
+# mesmo que ordenar pelo score decaído até hoje — o ranking fica pronto no índice
+# (profile_id, type, usage_score) e nunca precisa varrer o histórico. Com meia-vida de 30 dias o
+# expoente só chega perto do limite do float (2 ** 1024) daqui a ~80 anos.
+import datetime
+from collections import Counter
+
+from sqlalchemy import select, update, bindparam
+
+from config import Env
+from db.session import get_session
+from db.models import Category
+from db.reportcache import get_report, put_report
+
+USAGE_EPOCH = datetime.date(2024, 1, 1)
+
+
+def usage_weight(day: datetime.date) -> float:
+    return 2.0 ** ((day - USAGE_EPOCH).days / Env.CATEGORY_USAGE_HALF_LIFE_DAYS)
+
+
+async def record_category_use(session, category_id: int, day: datetime.date):
+    """Chamar na mesma sessão/transação que grava o lançamento (uma UPDATE pelo PK)."""
+    await session.execute(
+        update(Category)
+        .where(Category.id == category_id)
+        .values(usage_score=Category.usage_score + usage_weight(day))
+    )
+
+
+async def record_category_uses(session, uses):
+    """Versão em lote: `uses` é um iterável de (category_id, dia); uma UPDATE por categoria (executemany)."""
+    weights = Counter()
+    for category_id, day in uses:
+        if category_id is not None:
+            weights[category_id] += usage_weight(day)
+    if not weights:
+        return
+    await session.execute(
+        update(Category.__table__)
+        .where(Category.__table__.c.id == bindparam("cat_id"))
+        .values(usage_score=Category.__table__.c.usage_score + bindparam("weight")),
+        [{"cat_id": cat_id, "weight": weight} for cat_id, weight in weights.items()],
+    )
+
+
+async def top_categories(profile, category_type=None, limit: int = None):
+    """
+    [(id, nome)] das categorias do perfil da mais para a menos usada (empate: nome).
+    Cacheado pela versão de dados do perfil, que todo lançamento já incrementa.
+    """
+    key = (category_type, limit)
+    ranking = get_report(profile, "top_categories", key)
+    if ranking is not None:
+        return ranking
+
+    stmt = (
+        select(Category.id, Category.name)
+        .where(Category.profile_id == profile.id)
+        .order_by(Category.usage_score.desc(), Category.name)
+    )
+    if category_type is not None:
+        stmt = stmt.where(Category.type == category_type)
+    if limit:
+        stmt = stmt.limit(limit)
+    async with get_session() as session:
+        ranking = [tuple(row) for row in (await session.execute(stmt)).all()]
+
+    put_report(profile, "top_categories", key, ranking)
+    return ranking
@@ -1,13 +1,23 @@
-from telegram.ext import  CommandHandler, MessageHandler, filters, ContextTypes
-from  handlers.transactions import add_transaction, auth
+from telegram.ext import  CommandHandler, MessageHandler, CallbackQueryHandler, filters, ContextTypes
+from  handlers.transactions import add_transaction, add_transaction_callback, duplicate_callback, auth
 from  handlers.category import list_and_add_category
 from  handlers.summary import summary_month
-from  handlers.mydata import my_data
+from  handlers.projection import runway_projection
+from  handlers.mydata import my_data, transfer_callback
 from  handlers.start import start_handler
-from  handlers.wallet import daily_budget
-from  handlers.quick_purchase import add_quick_purchase
+from  handlers.wallet import daily_budget, daily_push_job, daily_push_time
+from  handlers.quick_purchase import add_quick_purchase, quick_purchase_callback
 from  handlers.last_transitions import last_transitions
 from  handlers.cancel_transaction import cancel_transaction
+from  handlers.export import export_transactions
+from  handlers.statement_import import import_statement, import_statement_file, import_account_callback
+from  handlers.natural import natural_entry, natural_entry_callback
+from  handlers.search import search_transactions, search_callback
+from  handlers.recurring import recurring_expenses, materialize_recurring_job, RECURRING_JOB_INTERVAL
+
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 
@@ -50,6 +60,14 @@ async def step_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await my_data(update, context)
         return
 
+    # Fluxo de Importação de extrato
+    if "step_import" in context.user_data:
+        await import_statement(update, context)
+        return
+
+    # Fora de qualquer fluxo: lançamento em linguagem natural ("gastei 32,50 no ifood no cartão nubank")
+    await natural_entry(update, context)
+
 
 def register_handlers(app): 
     
@@ -62,6 +80,8 @@ def register_handlers(app):
     app.add_handler(CommandHandler("add", add_transaction))
     app.add_handler(CommandHandler("listatransacoes", last_transitions))
     app.add_handler(CommandHandler("cancelartransacoes", cancel_transaction))
+    app.add_handler(CommandHandler("buscar", search_transactions))
+    app.add_handler(CommandHandler("recorrentes", recurring_expenses))
 
     # wallet
     app.add_handler(CommandHandler("carteira", daily_budget))
@@ -72,14 +92,39 @@ def register_handlers(app):
     # Resumo
     app.add_handler(CommandHandler("resumo", summary_month))
 
+    # Projeção de fôlego (Monte Carlo)
+    app.add_handler(CommandHandler("projecao", runway_projection))
+
     # Meu Dados
     app.add_handler(CommandHandler("meusdados", my_data))
 
+    # Exportação / Importação
+    app.add_handler(CommandHandler("exportar", export_transactions))
+    app.add_handler(CommandHandler("importar", import_statement))
+    app.add_handler(MessageHandler(filters.Document.ALL, import_statement_file))
+
+    # Teclados inline (callback_data = "prefixo:id")
+    app.add_handler(CallbackQueryHandler(quick_purchase_callback, pattern=r"^qp_"))
+    app.add_handler(CallbackQueryHandler(add_transaction_callback, pattern=r"^add_"))
+    app.add_handler(CallbackQueryHandler(transfer_callback, pattern=r"^tr_"))
+    app.add_handler(CallbackQueryHandler(import_account_callback, pattern=r"^imp_"))
+    app.add_handler(CallbackQueryHandler(natural_entry_callback, pattern=r"^nl:"))
+    app.add_handler(CallbackQueryHandler(search_callback, pattern=r"^bs:"))
+    app.add_handler(CallbackQueryHandler(duplicate_callback, pattern=r"^dup:"))
+
     # Handler global para texto
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, step_handler))
 
     app.add_handler(CommandHandler("exit", exit_handler))
 
+    # Despesas fixas: lança os vencimentos de todos os perfis de hora em hora (e logo após subir),
+    # e, de manhã, o aviso diário da /carteira para quem ligou (/carteira diario on)
+    if app.job_queue is not None:
+        app.job_queue.run_repeating(materialize_recurring_job, interval=RECURRING_JOB_INTERVAL, first=10, name="recurring")
+        app.job_queue.run_daily(daily_push_job, time=daily_push_time(), name="daily_push")
+    else:
+        logger.warning("JobQueue indisponível (instale python-telegram-bot[job-queue]); despesas fixas e aviso diário desativados.")
+
     
     
 
@@ -5,6 +5,9 @@ from sqlalchemy import select, and_, delete
 from db.session import get_session
 from db.models import Transaction, TransactionType, Category, Account
 from db.auth import auth
+from db.reportcache import bump_data_version
+from handlers.last_transitions import last_transactions_stmt
+from utils.replies import LoadingReply
 
 async def cancel_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
     profile = await auth(update)
@@ -14,19 +17,13 @@ async def cancel_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE)
     text = (update.message.text or "").strip().lower()
 
     if "step_cancel" not in context.user_data:
-        await update.message.reply_text("⌛ Buscando suas últimas 10 transações...")
+        reply = LoadingReply(update.message, "⌛ Buscando suas últimas 10 transações...").reply_text
         async with get_session() as session:
-            stmt = (
-                select(Transaction)
-                .where(Transaction.profile_id == profile.id)
-                .order_by(Transaction.date.desc(), Transaction.id.desc())
-                .limit(10)
-            )
-            result = await session.execute(stmt)
+            result = await session.execute(last_transactions_stmt(profile.id))
             transacoes = result.scalars().all()
 
             if not transacoes:
-                await update.message.reply_text("ℹ️ Nenhuma transação encontrada.")
+                await reply("ℹ️ Nenhuma transação encontrada.")
                 return
 
             lines = ["📋 Últimas transações (responda apenas com a POSIÇÃO mostrada, ex: 1):\n"]
@@ -63,14 +60,17 @@ async def cancel_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
                 lines.append(f"{i}. {date_str} • {emoji} {tipo_text} • {category_name}\n   {desc}\n   {display_value}\n")
 
+            lines.append(
+                "Qual POSIÇÃO deseja cancelar? Envie apenas o número da posição .\n"
+                "Para abortar, envie 'cancelar'."
+            )
             mensagem = "\n".join(lines)
             context.user_data["cancel_transaction"] = tx_ids
             context.user_data["step_cancel"] = "await_choice"
 
-            await update.message.reply_text(mensagem)
-            await update.message.reply_text(
-                "Qual POSIÇÃO deseja cancelar? Envie apenas o número da posição .\n"
-                "Para abortar, envie 'cancelar'.",
+            # lista e pergunta numa mensagem só
+            await reply(
+                mensagem,
                 reply_markup=ReplyKeyboardMarkup([["cancelar"]], one_time_keyboard=True, resize_keyboard=True)
             )
         return
@@ -164,30 +164,31 @@ async def cancel_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE)
             return
 
         tx_id = tx_ids[index]
-        await update.message.reply_text("⌛ Processando cancelamento da transação...", reply_markup=ReplyKeyboardRemove())
+        # o teclado sim/não sai junto com a resposta final (edit não aceita teclado de resposta)
+        reply = LoadingReply(update.message, "⌛ Processando cancelamento da transação...").reply_text
 
         async with get_session() as session:
             try:
                 async with session.begin():
                     tx = await session.get(Transaction, tx_id)
                     if tx is None:
-                        await update.message.reply_text("ℹ️ Transação não encontrada (já removida).")
+                        await reply("ℹ️ Transação não encontrada (já removida).", reply_markup=ReplyKeyboardRemove())
                         context.user_data.clear()
                         return
 
                     if tx.profile_id != profile.id:
-                        await update.message.reply_text("🚫 Você não tem permissão para cancelar essa transação.")
+                        await reply("🚫 Você não tem permissão para cancelar essa transação.", reply_markup=ReplyKeyboardRemove())
                         context.user_data.clear()
                         return
 
                     if getattr(tx, "is_settled", False):
-                        await update.message.reply_text("⚠️ Não é permitido cancelar uma transação já liquidada/settled.")
+                        await reply("⚠️ Não é permitido cancelar uma transação já liquidada/settled.", reply_markup=ReplyKeyboardRemove())
                         context.user_data.clear()
                         return
 
                     account = await session.get(Account, tx.account_id)
                     if account is None:
-                        await update.message.reply_text("❗ Conta associada à transação não encontrada.")
+                        await reply("❗ Conta associada à transação não encontrada.", reply_markup=ReplyKeyboardRemove())
                         context.user_data.clear()
                         return
 
@@ -233,8 +234,9 @@ async def cancel_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
                         if counterpart_tx:
                             if getattr(counterpart_tx, "is_settled", False):
-                                await update.message.reply_text(
-                                    "⚠️ A transação faz parte de uma transferência cuja contraparte está liquidada. Não é possível cancelar automaticamente."
+                                await reply(
+                                    "⚠️ A transação faz parte de uma transferência cuja contraparte está liquidada. Não é possível cancelar automaticamente.",
+                                    reply_markup=ReplyKeyboardRemove()
                                 )
                                 context.user_data.clear()
                                 return
@@ -270,15 +272,16 @@ async def cancel_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE)
                                     messages.append("⚠️ Conta destino da transferência não encontrada; não foi possível ajustar automaticamente.")
 
                     await session.execute(delete(Transaction).where(Transaction.id == tx.id))
+                    await bump_data_version(session, profile.id)
                     await session.flush()
 
                 refreshed_account = await session.get(Account, account.id)
                 messages.insert(0, f"Saldo da conta '{refreshed_account.name}' agora é R$ {refreshed_account.balance:.2f}")
 
-                await update.message.reply_text("\n".join(messages))
+                await reply("\n".join(messages), reply_markup=ReplyKeyboardRemove())
 
             except Exception as e:
-                await update.message.reply_text(f"❌ Falha ao cancelar a transação: {e}")
+                await reply(f"❌ Falha ao cancelar a transação: {e}", reply_markup=ReplyKeyboardRemove())
 
         context.user_data.pop("cancel_transaction", None)
         context.user_data.pop("step_cancel", None)
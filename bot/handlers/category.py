@@ -2,8 +2,9 @@ from telegram import Update, ReplyKeyboardMarkup, ReplyKeyboardRemove
 from telegram.ext import ContextTypes
 from db.session import get_session
 from db.models import Category, CategoryType
-from sqlalchemy import select
 from db.auth import auth
+from db.refcache import get_ref_data, bump_ref_version
+from utils.replies import LoadingReply
 
 
 async def list_and_add_category(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -16,29 +17,21 @@ async def list_and_add_category(update: Update, context: ContextTypes.DEFAULT_TY
     async with get_session() as session:
         # PASSO 1: listar categorias e perguntar se quer adicionar nova
         if "step_category" not in context.user_data:
-            await update.message.reply_text("⌛ Buscando categorias...")
-            result = await session.execute(
-                select(Category)
-                .where(Category.profile_id == profile.id)
-                .order_by(Category.name)
-            )
-            categories = result.scalars().all()
+            reply = LoadingReply(update.message, "⌛ Buscando categorias...").reply_text
+            categories = (await get_ref_data(profile.id, profile.ref_version)).categories
 
             if not categories:
-                await update.message.reply_text("Nenhuma categoria cadastrada ainda.")
+                text_categories = "Nenhuma categoria cadastrada ainda\\."
             else:
                 # Numeração + negrito + tipo, escapando ponto e parênteses
                 text_categories = "📂 *Categorias existentes:*\n\n" + "\n".join(
                     rf"{i+1}\. *{c.name}* \({c.type.value.capitalize()}\)" for i, c in enumerate(categories)
                 )
-                await update.message.reply_text(
-                    text_categories,
-                    parse_mode="MarkdownV2"
-                )
 
-
-            await update.message.reply_text(
-                "Deseja adicionar uma nova categoria? (sim/não)",
+            # lista e pergunta numa mensagem só
+            await reply(
+                text_categories + "\n\nDeseja adicionar uma nova categoria? \\(sim/não\\)",
+                parse_mode="MarkdownV2",
                 reply_markup=ReplyKeyboardMarkup([["sim", "não"]], one_time_keyboard=True, resize_keyboard=True)
             )
             context.user_data["step_category"] = "confirm_add_category"
@@ -59,12 +52,7 @@ async def list_and_add_category(update: Update, context: ContextTypes.DEFAULT_TY
         # PASSO 3: usuário digitou o nome da nova categoria
         if context.user_data["step_category"] == "type_new_category":
             new_name = update.message.text.strip()
-            result = await session.execute(
-                select(Category)
-                .where(Category.profile_id == profile.id)
-                .where(Category.name.ilike(new_name))
-            )
-            existing = result.scalar_one_or_none()
+            existing = (await get_ref_data(profile.id, profile.ref_version)).find_category(new_name)
 
             if existing:
                 await update.message.reply_text(f"A categoria '{new_name}' já existe.",
@@ -98,6 +86,7 @@ async def list_and_add_category(update: Update, context: ContextTypes.DEFAULT_TY
 
             new_category = Category(name=new_name, type=tipo, profile_id=profile.id)
             session.add(new_category)
+            await bump_ref_version(session, profile.id)
             await session.commit()
             await session.refresh(new_category)
 
@@ -0,0 +1,154 @@
+# handlers/export.py
+# /exportar [csv|parquet] [mm/aaaa | dd/mm/aaaa-dd/mm/aaaa] [conta]
+# Lê as transações com cursor no servidor (session.stream) e grava em arquivo incrementalmente,
+# então a memória usada não depende do tamanho do histórico.
+import csv
+import os
+import datetime
+import tempfile
+from telegram import Update
+from telegram.ext import ContextTypes
+from sqlalchemy import select, func
+from dateutil.relativedelta import relativedelta
+
+from db.session import get_session
+from db.models import Transaction, Account, Category
+from db.auth import auth
+from utils.replies import LoadingReply
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = ["data", "tipo", "valor", "conta", "categoria", "descricao", "transferencia", "liquidada"]
+EXPORT_FORMATS = ("csv", "parquet")
+
+
+def parse_export_args(args):
+    """Retorna (formato, data_inicial, data_final, nome_da_conta); levanta ValueError se inválido."""
+    fmt = "csv"
+    start_date = end_date = None
+    rest = list(args or [])
+
+    if rest and rest[0].lower() in EXPORT_FORMATS:
+        fmt = rest.pop(0).lower()
+
+    if rest and "/" in rest[0]:
+        period = rest.pop(0)
+        if "-" in period:
+            first, last = period.split("-", 1)
+            start_date = datetime.datetime.strptime(first, "%d/%m/%Y").date()
+            end_date = datetime.datetime.strptime(last, "%d/%m/%Y").date() + datetime.timedelta(days=1)
+        else:
+            month, year = map(int, period.split("/"))
+            start_date = datetime.date(year, month, 1)
+            end_date = start_date + relativedelta(months=1)
+
+    account_name = " ".join(rest).strip() or None
+    return fmt, start_date, end_date, account_name
+
+
+def export_stmt(profile_id: int, start_date=None, end_date=None, account_name=None):
+    stmt = (
+        select(
+            Transaction.date,
+            Transaction.type,
+            Transaction.value,
+            Account.name,
+            Category.name,
+            Transaction.description,
+            Transaction.is_transfer,
+            Transaction.is_settled,
+        )
+        .join(Account, Account.id == Transaction.account_id)
+        .outerjoin(Category, Category.id == Transaction.category_id)
+        .where(Transaction.profile_id == profile_id)
+        .order_by(Transaction.date, Transaction.id)
+    )
+    if start_date is not None:
+        stmt = stmt.where(Transaction.date >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(Transaction.date < end_date)
+    if account_name:
+        stmt = stmt.where(func.lower(Account.name) == account_name.lower())
+    return stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+def _row_values(row):
+    tx_date, tx_type, value, account, category, description, is_transfer, is_settled = row
+    return [tx_date.isoformat(), tx_type.value, value, account, category or "", description or "", is_transfer, is_settled]
+
+
+async def _write_csv(result, path):
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(EXPORT_COLUMNS)
+        async for partition in result.partitions():
+            writer.writerows(_row_values(r) for r in partition)
+            count += len(partition)
+    return count
+
+
+async def _write_parquet(result, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("data", pa.date32()),
+        ("tipo", pa.string()),
+        ("valor", pa.float64()),
+        ("conta", pa.string()),
+        ("categoria", pa.string()),
+        ("descricao", pa.string()),
+        ("transferencia", pa.bool_()),
+        ("liquidada", pa.bool_()),
+    ])
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        async for partition in result.partitions():
+            columns = list(zip(*(
+                (r[0], r[1].value, r[2], r[3], r[4], r[5], r[6], r[7]) for r in partition
+            )))
+            writer.write_table(pa.Table.from_arrays([pa.array(c, type=f.type) for c, f in zip(columns, schema)], schema=schema))
+            count += len(partition)
+    return count
+
+
+async def export_transactions(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    profile = await auth(update)
+    if profile is None:
+        return
+
+    try:
+        fmt, start_date, end_date, account_name = parse_export_args(context.args)
+    except ValueError:
+        await update.message.reply_text(
+            "Use: /exportar [csv|parquet] [mm/aaaa | dd/mm/aaaa-dd/mm/aaaa] [conta]"
+        )
+        return
+
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            await update.message.reply_text("⚠️ Exportação em Parquet indisponível (pyarrow não instalado). Use /exportar csv.")
+            return
+
+    loading = LoadingReply(update.message, "⌛ Gerando exportação...")
+
+    fd, path = tempfile.mkstemp(suffix=f".{fmt}")
+    os.close(fd)
+    try:
+        async with get_session() as session:
+            result = await session.stream(export_stmt(profile.id, start_date, end_date, account_name))
+            writer = _write_parquet if fmt == "parquet" else _write_csv
+            count = await writer(result, path)
+
+        if count == 0:
+            await loading.reply_text("ℹ️ Nenhuma transação encontrada para exportar.")
+            return
+
+        filename = f"transacoes_{datetime.date.today().isoformat()}.{fmt}"
+        with open(path, "rb") as fh:
+            await update.message.reply_document(document=fh, filename=filename, caption=f"📤 {count} transações exportadas.")
+        await loading.discard()
+    finally:
+        os.remove(path)
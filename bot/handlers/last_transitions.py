@@ -5,26 +5,30 @@ from sqlalchemy import select
 from db.session import get_session
 from db.models import Transaction, TransactionType, Category
 from db.auth import auth
+from utils.replies import LoadingReply
+
+def last_transactions_stmt(profile_id: int, limit: int = 10):
+    return (
+        select(Transaction)
+        .where(Transaction.profile_id == profile_id)
+        .order_by(Transaction.date.desc(), Transaction.id.desc())
+        .limit(limit)
+    )
+
 
 async def last_transitions(update: Update, context: ContextTypes.DEFAULT_TYPE):
     profile = await auth(update)
     if profile is None:
         return
 
-    await update.message.reply_text("⌛ Buscando suas últimas 10 transações...")
+    reply = LoadingReply(update.message, "⌛ Buscando suas últimas 10 transações...").reply_text
 
     async with get_session() as session:
-        stmt = (
-            select(Transaction)
-            .where(Transaction.profile_id == profile.id)
-            .order_by(Transaction.date.desc(), Transaction.id.desc())
-            .limit(10)
-        )
-        result = await session.execute(stmt)
+        result = await session.execute(last_transactions_stmt(profile.id))
         transacoes = result.scalars().all()
 
         if not transacoes:
-            await update.message.reply_text("ℹ️ Nenhuma transação encontrada.")
+            await reply("ℹ️ Nenhuma transação encontrada.")
             return
 
         lines = ["📋 Últimas 10 transações:\n"]
@@ -70,4 +74,4 @@ async def last_transitions(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         mensagem = "\n".join(lines)
         # enviar (Telegram tem limite ~4096 chars — 10 transações normalmente cabe)
-        await update.message.reply_text(mensagem)
+        await reply(mensagem)
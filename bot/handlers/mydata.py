@@ -10,11 +10,16 @@ from dateutil.relativedelta import relativedelta
 from db.session import get_session
 from db.models import Profile, Account, Debt, DebtStatus, Transaction, TransactionType
 from db.auth import auth
+from db.reportcache import bump_data_version, get_report, put_report
+from db.refcache import bump_ref_version
+from utils.parsers import parse_amount as parse_value
+from utils.keyboards import choice_keyboard, split_callback, resolve_choice
+from utils.replies import LoadingReply
 
 # ---------- helpers ----------
 def parse_amount(text: str) -> Decimal:
     try:
-        return Decimal(text.replace(",", "."))
+        return Decimal(str(parse_value(text)))
     except Exception:
         raise ValueError("valor inválido")
 
@@ -49,7 +54,7 @@ def unsettled_clause():
 
 
 # helper: sum of unpaid card expenses for an account (optionally by period)
-async def unpaid_card_total(session, account_id, start_date=None, end_date=None):
+def unpaid_card_total_stmt(account_id, start_date=None, end_date=None):
     clause = unsettled_clause()
     q = select(func.coalesce(func.sum(Transaction.value), 0)).where(
         Transaction.account_id == account_id,
@@ -61,8 +66,11 @@ async def unpaid_card_total(session, account_id, start_date=None, end_date=None)
         q = q.where(Transaction.date >= start_date)
     if end_date is not None:
         q = q.where(Transaction.date < end_date)
+    return q
+
 
-    res = await session.execute(q)
+async def unpaid_card_total(session, account_id, start_date=None, end_date=None):
+    res = await session.execute(unpaid_card_total_stmt(account_id, start_date, end_date))
     return to_decimal(res.scalar() or 0)
 
 
@@ -131,6 +139,19 @@ async def my_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     text = (update.message.text or "").strip()
+    options = [["Nome"], ["Contas", "Cartões"], ["Transferência"], ["Dívidas", "Nada"]]
+
+    # resumo já calculado nesta versão dos dados (e neste mês, por causa da média): nenhuma query
+    showing_summary = context.user_data.get("mydata_step", "show_summary") == "show_summary"
+    today = datetime.date.today()
+    summary_key = (today.year, today.month)
+    if showing_summary:
+        summary = get_report(profile, "my_data_summary", summary_key)
+        if summary is not None:
+            context.user_data["mydata_step"] = "edit_option"
+            await update.message.reply_text(summary, parse_mode="Markdown", reply_markup=ReplyKeyboardMarkup(options, one_time_keyboard=True, resize_keyboard=True))
+            return
+    versioned_profile = profile
 
     async with get_session() as session:
         profile = await session.get(
@@ -145,8 +166,8 @@ async def my_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
         cards_list = [a for a in all_accounts if getattr(a, "type", ACCOUNT_TYPE_ACCOUNT) == ACCOUNT_TYPE_CARD]
 
         # ---------- STEP 1: mostrar resumo ----------
-        if "mydata_step" not in context.user_data or context.user_data["mydata_step"] == "show_summary":
-            await update.message.reply_text("Carregando...", reply_markup=ReplyKeyboardRemove())
+        if showing_summary:
+            reply = LoadingReply(update.message, "Carregando...").reply_text
             avg_income, avg_expense = await compute_avg_monthly(session, profile.id, months=6)
 
             accounts_text = "\n".join(f"- {a.name}: {format_money(a.balance)}" for a in accounts_list) or "Nenhuma conta cadastrada."
@@ -181,9 +202,9 @@ async def my_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"{debts_text}\n\n"
                 f"O que deseja editar?"
             )
-            options = [["Nome"], ["Contas", "Cartões"], ["Transferência"], ["Dívidas", "Nada"]]
+            put_report(versioned_profile, "my_data_summary", summary_key, summary)
             context.user_data["mydata_step"] = "edit_option"
-            await update.message.reply_text(summary, parse_mode="Markdown", reply_markup=ReplyKeyboardMarkup(options, one_time_keyboard=True, resize_keyboard=True))
+            await reply(summary, parse_mode="Markdown", reply_markup=ReplyKeyboardMarkup(options, one_time_keyboard=True, resize_keyboard=True))
             return
 
         # ---------- STEP 2: escolher opção ----------
@@ -207,10 +228,10 @@ async def my_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 await update.message.reply_text("Escolha um cartão ou 'Adicionar Cartão':", reply_markup=ReplyKeyboardMarkup(options, one_time_keyboard=True, resize_keyboard=True))
             elif choice == "transferência":
                 context.user_data["mydata_step"] = "transfer_from"
-                options = [[a.name] for a in all_accounts] + [["Voltar"]]
+                items = [(a.id, a.name) for a in all_accounts]
                 await update.message.reply_text(
                     "Escolha a conta de ORIGEM:",
-                    reply_markup=ReplyKeyboardMarkup(options, one_time_keyboard=True, resize_keyboard=True),
+                    reply_markup=choice_keyboard(context, "tr_from", items, extra=[("back", "Voltar")], columns=2),
                 )
             elif choice == "dívidas":
                 context.user_data["mydata_step"] = "edit_debts_menu"
@@ -267,6 +288,7 @@ async def my_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 # if model doesn't have 'type' attribute, ignore (backwards compatibility)
                 pass
             session.add(new_acc)
+            await bump_ref_version(session, profile.id)
             await session.commit()
             context.user_data["mydata_step"] = "show_summary"
             await update.message.reply_text(f"{'Conta' if scope == ACCOUNT_TYPE_ACCOUNT else 'Cartão'} '{new_acc.name}' criada.", reply_markup=ReplyKeyboardRemove())
@@ -305,6 +327,7 @@ async def my_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     await my_data(update, context)
                     return
                 await session.delete(acc)
+                await bump_ref_version(session, profile.id)
                 await session.commit()
                 context.user_data["mydata_step"] = "show_summary"
                 await update.message.reply_text(f"Item '{acc.name}' removido.", reply_markup=ReplyKeyboardRemove())
@@ -342,6 +365,7 @@ async def my_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             acc.balance = float(Decimal(before) + amount)
             session.add(tx)
+            await bump_data_version(session, profile.id)
             await session.commit()
             context.user_data["mydata_step"] = "show_summary"
             await update.message.reply_text(f"Entrada registrada em {acc.name}.", reply_markup=ReplyKeyboardRemove())
@@ -375,6 +399,7 @@ async def my_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             acc.balance = float(Decimal(before) - amount)
             session.add(tx)
+            await bump_data_version(session, profile.id)
             await session.commit()
             context.user_data["mydata_step"] = "show_summary"
             await update.message.reply_text(f"Retirada registrada em {acc.name}.", reply_markup=ReplyKeyboardRemove())
@@ -394,6 +419,7 @@ async def my_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 await update.message.reply_text("Esse nome é reservado. Escolha outro.")
                 return
             acc.name = new_name
+            await bump_ref_version(session, profile.id)
             await session.commit()
             context.user_data["mydata_step"] = "show_summary"
             await update.message.reply_text(f"Renomeado para '{acc.name}'.", reply_markup=ReplyKeyboardRemove())
@@ -401,66 +427,15 @@ async def my_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
 
         # ---------- transferências (sem distinção entre contas/cartões) ----------
-        if context.user_data.get("mydata_step") == "transfer_from":
-            src_name = text.strip()
-            # tentar resolver pelo texto enviado (usuário pode ter escolhido do teclado)
-            src = next((a for a in all_accounts if a.name.lower() == src_name.lower()), None)
-            if src:
-                context.user_data["transfer_from_id"] = src.id
-                context.user_data["mydata_step"] = "transfer_to"
-                # agora mostra os destinos excluindo a origem
-                dst_options = [[a.name] for a in all_accounts if a.id != src.id] + [["Voltar"]]
-                await update.message.reply_text(
-                    f"Origem: {src.name}. Escolha a conta de DESTINO:",
-                    reply_markup=ReplyKeyboardMarkup(dst_options, one_time_keyboard=True, resize_keyboard=True),
-                )
-                return
-
-            if src_name.lower() == "voltar":
+        # origem e destino chegam por transfer_callback (teclado inline)
+        if context.user_data.get("mydata_step") in ("transfer_from", "transfer_to"):
+            if text.lower() == "voltar":
                 context.user_data["mydata_step"] = "show_summary"
                 await my_data(update, context)
                 return
-
-            # se não encontrou, reexibe o teclado para ajudar o usuário
-            options = [[a.name] for a in all_accounts] + [["Voltar"]]
-            await update.message.reply_text(
-                "Conta de origem não encontrada. Escolha na lista:",
-                reply_markup=ReplyKeyboardMarkup(options, one_time_keyboard=True, resize_keyboard=True),
-            )
+            await update.message.reply_text("Escolha a conta nos botões acima.")
             return
 
-        if context.user_data.get("mydata_step") == "transfer_to":
-            dst_name = text.strip()
-            src_id = context.user_data.get("transfer_from_id")
-            src = await session.get(Account, src_id) if src_id else None
-
-            dst = next((a for a in all_accounts if a.name.lower() == dst_name.lower()), None)
-            if dst:
-                if src and dst.id == src.id:
-                    await update.message.reply_text("Origem e destino não podem ser a mesma conta.")
-                    # reexibe destinos sem a origem
-                    dst_options = [[a.name] for a in all_accounts if a.id != (src.id if src else None)] + [["Voltar"]]
-                    await update.message.reply_text("Escolha outro destino:", reply_markup=ReplyKeyboardMarkup(dst_options, one_time_keyboard=True, resize_keyboard=True))
-                    return
-                context.user_data["transfer_to_id"] = dst.id
-                context.user_data["mydata_step"] = "transfer_amount"
-                await update.message.reply_text("Digite o valor da transferência:", reply_markup=ReplyKeyboardRemove())
-                return
-
-            if dst_name.lower() == "voltar":
-                context.user_data["mydata_step"] = "show_summary"
-                await my_data(update, context)
-                return
-
-            # se não encontrou, reexibe os destinos, excluindo a origem
-            dst_options = [[a.name] for a in all_accounts if a.id != (src.id if src else None)] + [["Voltar"]]
-            await update.message.reply_text(
-                "Conta de destino não encontrada. Escolha na lista:",
-                reply_markup=ReplyKeyboardMarkup(dst_options, one_time_keyboard=True, resize_keyboard=True),
-            )
-            return
-
-
         if context.user_data.get("mydata_step") == "transfer_amount":
             try:
                 amount = parse_amount(text)
@@ -555,6 +530,7 @@ async def my_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
             # atualizar saldos já calculados
             src.balance = float(Decimal(before_src) - amount)
             dst.balance = float(Decimal(before_dst) + amount)
+            await bump_data_version(session, profile.id)
             await session.commit()
 
             context.user_data["mydata_step"] = "show_summary"
@@ -605,6 +581,7 @@ async def my_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 await update.message.reply_text(f"Meses atuais: {debt.months} Digite o novo número de meses:")
             elif choice == "remover dívida":
                 await session.delete(debt)
+                await bump_data_version(session, profile.id)
                 await session.commit()
                 context.user_data["mydata_step"] = "show_summary"
                 await update.message.reply_text(f"Dívida '{debt.creditor}' removida.", reply_markup=ReplyKeyboardRemove())
@@ -622,6 +599,7 @@ async def my_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
             # não atribuir total_amount: modelo possui total_amount como property somente leitura
             debt = Debt(profile_id=profile.id, creditor=creditor_name, monthly_payment=0.0, months=0, status=DebtStatus.OPEN)
             session.add(debt)
+            await bump_data_version(session, profile.id)
             await session.commit()
             await session.refresh(debt)
             context.user_data["editing_debt_id"] = debt.id
@@ -642,6 +620,7 @@ async def my_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 await update.message.reply_text("Valor inválido. Digite novamente.")
                 return
             debt.monthly_payment = float(monthly)
+            await bump_data_version(session, profile.id)
             await session.commit()
             context.user_data["mydata_step"] = "edit_debts_months"
             await update.message.reply_text("Quantos meses será usado esse valor para calcular o total?")
@@ -662,6 +641,7 @@ async def my_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
             # atualiza meses (não tocar em total_amount)
             debt.months = int(months)
+            await bump_data_version(session, profile.id)
             await session.commit()
 
             # calcula total apenas para exibição
@@ -673,3 +653,42 @@ async def my_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             await my_data(update, context)
             return
+
+
+async def transfer_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Origem/destino da transferência pelo teclado inline: resolve pelo id e edita a própria mensagem."""
+    query = update.callback_query
+    await query.answer()
+    prefix, value = split_callback(query.data)
+    expected = {"tr_from": "transfer_from", "tr_to": "transfer_to"}
+    if context.user_data.get("mydata_step") != expected.get(prefix):
+        await query.edit_message_text("Essa opção expirou. Use /meusdados para começar de novo.")
+        return
+
+    if value == "back":
+        context.user_data.clear()
+        await query.edit_message_text("Transferência cancelada. Use /meusdados para voltar ao resumo.")
+        return
+
+    choice = resolve_choice(context, prefix, value)
+    if choice is None:
+        await query.edit_message_text("Opção inválida. Use /meusdados para começar de novo.")
+        context.user_data.clear()
+        return
+    account_id, name = choice
+
+    if prefix == "tr_from":
+        context.user_data["transfer_from_id"] = account_id
+        context.user_data["mydata_step"] = "transfer_to"
+        # destinos: as mesmas contas do teclado de origem, menos a escolhida
+        items = [(int(i), n) for i, n in context.user_data["choices_tr_from"].items() if int(i) != account_id]
+        await query.edit_message_text(
+            f"Origem: {name}. Escolha a conta de DESTINO:",
+            reply_markup=choice_keyboard(context, "tr_to", items, extra=[("back", "Voltar")], columns=2),
+        )
+        return
+
+    source = context.user_data["choices_tr_from"].get(str(context.user_data.get("transfer_from_id")), "")
+    context.user_data["transfer_to_id"] = account_id
+    context.user_data["mydata_step"] = "transfer_amount"
+    await query.edit_message_text(f"{source} → {name}. Digite o valor da transferência:")
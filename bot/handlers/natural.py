@@ -0,0 +1,243 @@
+# handlers/natural.py
+# Lançamento em linguagem natural, fora de qualquer fluxo: "gastei 32,50 no ifood no cartão nubank".
+# Categorias, contas, cartões e sinônimos do perfil viram um KeywordMatcher (Aho-Corasick), guardado
+# por perfil e reconstruído só quando Profile.ref_version muda. A mensagem vira um lançamento pronto
+# para confirmar num botão; nada é gravado sem a confirmação.
+import re
+import datetime
+from collections import OrderedDict, defaultdict
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes
+
+from config import Env
+from db.auth import auth
+from db.session import get_session
+from db.refcache import get_ref_data
+from db.autocat import suggest_category
+from handlers.transactions import save_transaction
+from handlers.statement_import import CATEGORY_RULES
+from utils.matcher import KeywordMatcher
+from utils.parsers import parse_amount, parse_date, normalize_name, INSTALLMENTS_RE, RELATIVE_DATES
+from utils.keyboards import split_callback
+
+EXPENSE_WORDS = ("gastei", "paguei", "comprei", "gasto", "despesa")
+INCOME_WORDS = ("recebi", "ganhei", "entrou", "recebimento", "receita")
+CARD_WORDS = ("cartao", "cartao de credito", "credito")
+FILLER_WORDS = {"no", "na", "nos", "nas", "em", "de", "do", "da", "com", "pra", "para", "o", "a", "um", "uma",
+                "reais", "real", "r$", "pelo", "pela", "via", "hoje"}
+HAS_DIGIT_RE = re.compile(r"\d")
+
+CONFIRM_KEYBOARD = InlineKeyboardMarkup([[
+    InlineKeyboardButton("✅ Confirmar", callback_data="nl:ok"),
+    InlineKeyboardButton("❌ Cancelar", callback_data="nl:cancel"),
+]])
+
+_matchers = OrderedDict()  # profile_id -> KeywordMatcher da versão ref.version, do menos para o mais recente
+
+
+def build_matcher(ref) -> KeywordMatcher:
+    phrases = defaultdict(list)
+    for c in ref.categories:
+        phrases[c.name].append(("category", c))
+    for a in ref.accounts:
+        phrases[a.name].append(("account", a))
+    for a in ref.cards:
+        phrases[a.name].append(("card", a))
+    # sinônimos: as mesmas palavras-chave que o /importar usa, quando a categoria existe no perfil
+    categories_by_name = {normalize_name(c.name): c for c in ref.categories}
+    for keyword, category_name in CATEGORY_RULES.items():
+        category = categories_by_name.get(normalize_name(category_name))
+        if category is not None:
+            phrases[keyword].append(("synonym", category))
+    for word in EXPENSE_WORDS:
+        phrases[word].append(("intent", "saida"))
+    for word in INCOME_WORDS:
+        phrases[word].append(("intent", "entrada"))
+    for word in CARD_WORDS:
+        phrases[word].append(("card_hint", True))
+    return KeywordMatcher(phrases)
+
+
+def get_matcher(profile_id: int, ref) -> KeywordMatcher:
+    cached = _matchers.get(profile_id)
+    if cached is not None and cached[0] == ref.version:
+        _matchers.move_to_end(profile_id)
+        return cached[1]
+    matcher = build_matcher(ref)
+    _matchers[profile_id] = (ref.version, matcher)
+    _matchers.move_to_end(profile_id)
+    while len(_matchers) > Env.REFCACHE_MAX_PROFILES:
+        _matchers.popitem(last=False)
+    return matcher
+
+
+class NaturalEntry:
+    def __init__(self):
+        self.t_type = None
+        self.amount = None
+        self.date = None
+        self.installments = None
+        self.category = None
+        self.account = None
+        self.card = None
+        self.card_hint = False
+        self.matched = False
+        self.description = None
+
+
+def parse_natural(text: str, matcher: KeywordMatcher, today: datetime.date = None) -> NaturalEntry:
+    entry = NaturalEntry()
+    words = text.split()
+    # normaliza palavra a palavra para saber a qual palavra original cada casamento pertence
+    normalized = [normalize_name(w) for w in words]
+    offsets = []
+    pos = 0
+    for w in normalized:
+        offsets.append(pos)
+        pos += len(w) + 1
+
+    consumed = set()
+    described = set()   # palavras consumidas que ainda valem como descrição (sinônimos: "ifood")
+    for start, end, _, payloads in matcher.find(" ".join(normalized)):
+        indexes = {i for i, off in enumerate(offsets) if off < end and off + len(normalized[i]) > start}
+        kinds = dict(payloads)
+        if "intent" in kinds:
+            entry.t_type = entry.t_type or kinds["intent"]
+        elif "card_hint" in kinds:
+            entry.card_hint = True
+        else:
+            entry.matched = True
+            if "card" in kinds and entry.card is None:
+                entry.card = kinds["card"]
+            if "account" in kinds and entry.account is None:
+                entry.account = kinds["account"]
+            if "category" in kinds and entry.category is None:
+                entry.category = kinds["category"]
+            elif "synonym" in kinds and entry.category is None:
+                entry.category = kinds["synonym"]
+                described |= indexes
+        consumed |= indexes
+
+    for i, word in enumerate(normalized):
+        if i in consumed:
+            continue
+        token = word.strip(".,;:!?")
+        if entry.amount is None and HAS_DIGIT_RE.search(token) and "/" not in token and not INSTALLMENTS_RE.match(token):
+            try:
+                entry.amount = parse_amount(token)
+                consumed.add(i)
+                continue
+            except ValueError:
+                pass
+        m = INSTALLMENTS_RE.match(token)
+        if m and entry.installments is None:
+            entry.installments = int(m.group(1))
+            consumed.add(i)
+            continue
+        if entry.date is None and ("/" in token or token in RELATIVE_DATES):
+            try:
+                entry.date = parse_date(token, today)
+                consumed.add(i)
+                continue
+            except ValueError:
+                pass
+
+    description = [
+        words[i].strip(".,;:!?") for i in range(len(words))
+        if (i not in consumed or i in described) and normalized[i].strip(".,;:!?") not in FILLER_WORDS
+    ]
+    entry.description = " ".join(w for w in description if w) or None
+    return entry
+
+
+def _entry_summary(pending: dict) -> str:
+    lines = [
+        "📝 Confirma o lançamento?",
+        f"Tipo: {'entrada' if pending['type'] == 'entrada' else 'saída'}",
+        f"Valor: R$ {pending['value']:.2f}",
+    ]
+    if pending.get("category"):
+        lines.append(f"Categoria: {pending['category']}")
+    lines.append(f"Conta: {pending['account_name']}")
+    if pending.get("card_installments", 1) > 1:
+        lines.append(f"Parcelas: {pending['card_installments']}x")
+    lines.append(f"Data: {pending['date'].strftime('%d/%m/%Y')}")
+    if pending.get("description"):
+        lines.append(f"Descrição: {pending['description']}")
+    return "\n".join(lines)
+
+
+async def natural_entry(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Chamado pelo step_handler quando nenhum fluxo está ativo; ignora mensagens sem valor."""
+    text = (update.message.text or "").strip()
+    if not HAS_DIGIT_RE.search(text):
+        return
+
+    profile = await auth(update)
+    if profile is None:
+        return
+
+    ref = await get_ref_data(profile.id, profile.ref_version)
+    today = datetime.date.today()
+    entry = parse_natural(text, get_matcher(profile.id, ref), today)
+    if entry.amount is None or entry.amount <= 0 or not (entry.t_type or entry.matched):
+        return
+
+    t_type = entry.t_type or "saida"
+    if entry.card is not None and (entry.card_hint or entry.account is None):
+        account = entry.card
+    elif entry.account is not None:
+        account = entry.account
+    elif entry.card_hint and len(ref.cards) == 1:
+        account = ref.cards[0]
+    else:
+        names = ", ".join(a.name for a in ref.accounts + ref.cards) or "nenhuma"
+        await update.message.reply_text(f"Entendi R$ {entry.amount:.2f}, mas não a conta ou cartão. Disponíveis: {names}")
+        return
+
+    category = entry.category if t_type == "saida" else None
+    if t_type == "saida" and category is None and entry.description:
+        async with get_session() as session:
+            suggested_id = await suggest_category(session, profile.id, entry.description)
+        category = ref.category(suggested_id) if suggested_id else None
+    if t_type == "saida" and category is None:
+        await update.message.reply_text(
+            f"Entendi R$ {entry.amount:.2f} em '{account.name}', mas não a categoria. "
+            f"Inclua o nome da categoria na mensagem ou use /comprarapida."
+        )
+        return
+
+    pending = {
+        "profile_id": profile.id,
+        "type": t_type,
+        "value": entry.amount,
+        "account_id": account.id,
+        "account_name": account.name,
+        "description": entry.description,
+        "card_installments": entry.installments or 1,
+        "date": entry.date or today,
+    }
+    if category is not None:
+        pending["category"] = category.name
+        pending["category_id"] = category.id
+    context.user_data["nl_entry"] = pending
+    await update.message.reply_text(_entry_summary(pending), reply_markup=CONFIRM_KEYBOARD)
+
+
+async def natural_entry_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+    _, value = split_callback(query.data)
+    pending = context.user_data.pop("nl_entry", None)
+    if pending is None:
+        await query.edit_message_text("Essa confirmação expirou. Envie o lançamento de novo.")
+        return
+    if value != "ok":
+        await query.edit_message_text("Lançamento descartado.")
+        return
+
+    await query.edit_message_text(_entry_summary(pending).replace("📝 Confirma o lançamento?", "✅ Confirmado"))
+    pending.pop("account_name", None)
+    context.user_data.update(pending)
+    await save_transaction(update, context)
+    context.user_data.clear()
@@ -0,0 +1,148 @@
+# handlers/projection.py
+# /projecao: por quantos meses o dinheiro dura (saldo das contas + reserva de emergência), por Monte
+# Carlo sobre o próprio histórico:
+#   - o histórico vem do banco já agregado por dia (uma linha por dia com lançamentos, não por
+#     lançamento); dias sem movimento entram como fluxo zero;
+#   - cada simulação sorteia dias do histórico com reposição (bootstrap) e acumula o saldo; todas as
+#     simulações andam juntas num único array NumPy, um mês por vez, até todas esgotarem o dinheiro
+#     ou chegarem a RUNWAY_MAX_MONTHS;
+#   - o resultado são percentis do fôlego em meses e a chance de as contas ficarem negativas antes do
+#     fim do mês corrente (sem contar a reserva).
+# Transferências entre contas próprias não entram no fluxo.
+import calendar
+import datetime
+
+from telegram import Update
+from telegram.ext import ContextTypes
+from sqlalchemy import select, func
+
+from db.session import get_session
+from db.models import Transaction, Account
+from db.auth import auth
+from db.reportcache import get_report, put_report
+from utils.replies import LoadingReply
+
+RUNWAY_SIMULATIONS = 5000
+RUNWAY_HISTORY_DAYS = 730     # histórico usado no sorteio (os dois últimos anos)
+RUNWAY_MIN_HISTORY_DAYS = 30
+RUNWAY_MAX_MONTHS = 60        # horizonte da simulação; além disso, "mais de 60 meses"
+RUNWAY_PERCENTILES = ((10, "pessimista"), (50, "mediana"), (90, "otimista"))
+DAYS_PER_MONTH = 365.25 / 12
+
+
+def daily_net_stmt(profile_id: int, start_date, end_date):
+    # fluxo líquido por dia: o sorteio trabalha sobre essa série compacta, não sobre os lançamentos
+    return (
+        select(Transaction.date, func.sum(Transaction.value))
+        .where(Transaction.profile_id == profile_id)
+        .where(Transaction.date >= start_date, Transaction.date < end_date)
+        .where(Transaction.is_transfer.is_(False))
+        .group_by(Transaction.date)
+    )
+
+
+def accounts_balance_stmt(profile_id: int):
+    # contas e cartões: saldo negativo de cartão é fatura a pagar
+    return select(func.sum(Account.balance)).where(Account.profile_id == profile_id)
+
+
+async def runway_projection(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    profile = await auth(update)
+    if profile is None:
+        return
+
+    loading = LoadingReply(update.message, "⌛ Simulando seu fôlego financeiro...")
+    today = datetime.date.today()
+    cache_key = (today, profile.emergency_fund)
+    text = get_report(profile, "runway", cache_key)
+    if text is None:
+        text = await build_projection(profile, today)
+        put_report(profile, "runway", cache_key, text)
+    await loading.reply_text(text)
+
+
+async def build_projection(profile, today: datetime.date) -> str:
+    start_date = today - datetime.timedelta(days=RUNWAY_HISTORY_DAYS)
+    end_date = today + datetime.timedelta(days=1)
+    async with get_session() as session:
+        balance = (await session.execute(accounts_balance_stmt(profile.id))).scalar() or 0.0
+        rows = (await session.execute(daily_net_stmt(profile.id, start_date, end_date))).all()
+
+    if not rows or (today - min(day for day, _ in rows)).days + 1 < RUNWAY_MIN_HISTORY_DAYS:
+        return f"ℹ️ Histórico insuficiente: a projeção precisa de pelo menos {RUNWAY_MIN_HISTORY_DAYS} dias de lançamentos."
+
+    flows = daily_series(rows, today)
+    reserve = profile.emergency_fund or 0.0
+    days_left = calendar.monthrange(today.year, today.month)[1] - today.day
+    runway, negative_this_month = simulate_runway(flows, balance, reserve, days_left, seed=profile.id)
+
+    lines = [
+        "🔮 Projeção de fôlego financeiro\n",
+        f"🏦 Contas e cartões: R$ {balance:.2f}",
+        f"🛟 Reserva de emergência: R$ {reserve:.2f}",
+        f"📈 Fluxo médio diário: R$ {flows.mean():.2f} (base: {len(flows)} dias)\n",
+        f"⏳ Quanto tempo o dinheiro dura ({RUNWAY_SIMULATIONS} simulações):",
+    ]
+    if balance + reserve < 0:
+        lines.append("- ⛔ contas e reserva já estão negativas")
+    else:
+        for (percentile, label), months in zip(RUNWAY_PERCENTILES, runway):
+            lines.append(f"- {label} (P{percentile}): {format_months(months)}")
+    lines.append(f"\n⚠️ Chance de as contas ficarem negativas este mês: {negative_this_month * 100:.1f}%")
+    return "\n".join(lines)
+
+
+def daily_series(rows, today: datetime.date):
+    """Linhas (data, soma) de daily_net_stmt -> fluxo de cada dia do primeiro lançamento até hoje, zeros nos dias parados."""
+    import numpy as np
+
+    first = min(day for day, _ in rows)
+    flows = np.zeros((today - first).days + 1)
+    for day, total in rows:
+        flows[(day - first).days] = total or 0
+    return flows
+
+
+def simulate_runway(flows, balance: float, reserve: float, days_left: int,
+                    simulations: int = RUNWAY_SIMULATIONS, max_months: int = RUNWAY_MAX_MONTHS, seed=None):
+    """
+    Bootstrap dos fluxos diários: devolve (fôlego em meses nos RUNWAY_PERCENTILES — inf quando o
+    dinheiro passa do horizonte —, fração das simulações em que `balance` fica negativo nos próximos
+    `days_left` dias). O fôlego conta `balance + reserve`; o mês corrente só `balance`.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    chunk = round(DAYS_PER_MONTH)
+    horizon = max_months * chunk
+    everyone = np.arange(simulations)
+    funds = np.full(simulations, balance + reserve)      # contas + reserva ao fim do último mês simulado
+    depleted_day = np.full(simulations, 0.0 if balance + reserve < 0 else np.inf)
+    lowest_this_month = np.full(simulations, balance)    # menor saldo das contas até o fim do mês
+
+    day = 0
+    while day < horizon:
+        # no mês corrente todas as simulações andam; depois, só as que ainda têm dinheiro
+        tracked = everyone if day < days_left else everyone[np.isinf(depleted_day)]
+        if not len(tracked):
+            break
+        running = funds[tracked, None] + np.cumsum(flows[rng.integers(0, len(flows), size=(len(tracked), chunk))], axis=1)
+        if day < days_left:
+            window = min(chunk, days_left - day)
+            lowest_this_month = np.minimum(lowest_this_month, running[:, :window].min(axis=1) - reserve)
+        negative = running < 0
+        newly = negative.any(axis=1) & np.isinf(depleted_day[tracked])
+        depleted_day[tracked[newly]] = day + negative[newly].argmax(axis=1) + 1
+        funds[tracked] = running[:, -1]
+        day += chunk
+
+    runway = np.percentile(depleted_day / DAYS_PER_MONTH, [p for p, _ in RUNWAY_PERCENTILES], method="inverted_cdf")
+    return runway.tolist(), float((lowest_this_month < 0).mean())
+
+
+def format_months(months: float) -> str:
+    if months == float("inf"):
+        return f"mais de {RUNWAY_MAX_MONTHS} meses"
+    if months < 1:
+        return f"{months * DAYS_PER_MONTH:.0f} dias"
+    return f"{months:.1f} meses"
@@ -1,7 +1,6 @@
 # quick_purchase.py
-from telegram import Update, ReplyKeyboardMarkup, ReplyKeyboardRemove
+from telegram import Update, ReplyKeyboardRemove, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from sqlalchemy import select
 
 from db.session import get_session
 from db.models import (
@@ -9,7 +8,66 @@ from db.models import (
     Account, CurrencyEnum
 )
 from db.auth import auth
-from handlers.transactions import save_transaction
+from db.refcache import get_ref_data, bump_ref_version
+from db.usage import top_categories
+from handlers.transactions import save_transaction, save_from_args
+from utils.parsers import parse_amount, split_args
+from utils.keyboards import choice_keyboard, split_callback, resolve_choice
+from utils.replies import LoadingReply
+
+QUICK_PURCHASE_TOP_CATEGORIES = 8  # categorias mais usadas oferecidas no teclado
+QUICK_PURCHASE_USAGE = (
+    'Use: /comprarapida <valor> <categoria> <conta|cartão> [3x] [dd/mm] ["descrição"]\n'
+    "Categoria que não existe é criada com todas as palavras que sobrarem (ex: casa nova)."
+)
+
+USED_CARD_KEYBOARD = InlineKeyboardMarkup([[
+    InlineKeyboardButton("sim", callback_data="qp_used:1"),
+    InlineKeyboardButton("não", callback_data="qp_used:0"),
+]])
+
+
+async def _ask_card_or_account(context: ContextTypes.DEFAULT_TYPE, profile_id: int, used_card: bool, send,
+                               ref_version: int = None):
+    """Lista cartões ou contas em teclado inline; `send` é reply_text ou edit_message_text."""
+    ref = await get_ref_data(profile_id, ref_version)
+    items = [(a.id, a.name) for a in (ref.cards if used_card else ref.accounts)]
+
+    if used_card:
+        if not items:
+            context.user_data["step_quick_purchase"] = "qp_create_card_direct"
+            await send("Nenhum cartão cadastrado. Digite o NOME do cartão (será criado):")
+            return
+        context.user_data["step_quick_purchase"] = "qp_card"
+        await send(
+            "Escolha o cartão ou digite um novo:",
+            reply_markup=choice_keyboard(context, "qp_card", items, extra=[("new", "Criar novo cartão")])
+        )
+        return
+
+    if not items:
+        context.user_data["step_quick_purchase"] = "qp_create_bank_direct"
+        await send("Nenhuma conta bancária cadastrada. Digite o NOME da conta (será criada):")
+        return
+    context.user_data["step_quick_purchase"] = "qp_account"
+    await send(
+        "Escolha a conta ou digite um novo nome:",
+        reply_markup=choice_keyboard(context, "qp_acc", items, extra=[("new", "Criar nova conta")])
+    )
+
+
+async def _get_or_create_account(profile, name: str, account_type: str):
+    """Conta/cartão com esse nome (sem diferenciar maiúsculas) ou uma nova; retorna o id."""
+    existing = (await get_ref_data(profile.id, profile.ref_version)).find_account(name, account_type)
+    if existing:
+        return existing.id
+    async with get_session() as session:
+        account = Account(profile_id=profile.id, name=name, type=account_type, balance=0.0, currency=CurrencyEnum.BRL)
+        session.add(account)
+        await session.flush()
+        await bump_ref_version(session, profile.id)
+        await session.commit()
+        return account.id
 
 
 async def add_quick_purchase(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -21,6 +79,13 @@ async def add_quick_purchase(update: Update, context: ContextTypes.DEFAULT_TYPE)
     raw = (update.message.text or "").strip()
     text = raw.lower().strip()
 
+    if "step_quick_purchase" not in context.user_data and context.args:
+        # forma de uma mensagem: /comprarapida 25,90 mercado nubank "padaria"
+        parts = raw.split(maxsplit=1)
+        await save_from_args(update, context, profile, "saida", split_args(parts[1] if len(parts) > 1 else ""),
+                             QUICK_PURCHASE_USAGE, category_type=CategoryType.VARIAVEL)
+        return
+
     if "step_quick_purchase" not in context.user_data:
         context.user_data["step_quick_purchase"] = "qp_value"
         await update.message.reply_text(
@@ -31,7 +96,7 @@ async def add_quick_purchase(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
     if context.user_data["step_quick_purchase"] == "qp_value":
         try:
-            value = float(text.replace(",", "."))
+            value = parse_amount(text)
             if value <= 0:
                 raise ValueError()
         except ValueError:
@@ -39,63 +104,29 @@ async def add_quick_purchase(update: Update, context: ContextTypes.DEFAULT_TYPE)
             return
 
         context.user_data["value"] = value
-        await update.message.reply_text("⌛ Processando...")
-
-        async with get_session() as session:
-            result = await session.execute(
-                select(Category)
-                .where(Category.profile_id == profile.id)
-                .where(Category.type == CategoryType.VARIAVEL)
-                .order_by(Category.name)
-                .limit(8)
-            )
-            cats = result.scalars().all()
+        reply = LoadingReply(update.message).reply_text
+
+        cats = await top_categories(profile, CategoryType.VARIAVEL, limit=QUICK_PURCHASE_TOP_CATEGORIES)
 
         if not cats:
             context.user_data["step_quick_purchase"] = "qp_category_new"
-            await update.message.reply_text(
+            await reply(
                 "Qual a categoria da saída? Digite o NOME da nova categoria:",
                 reply_markup=ReplyKeyboardRemove()
             )
             return
 
-        keyboard = [[c.name] for c in cats] + [["Criar nova categoria"]]
-        await update.message.reply_text(
+        await reply(
             "Escolha uma categoria existente ou digite uma nova:",
-            reply_markup=ReplyKeyboardMarkup(keyboard, one_time_keyboard=True, resize_keyboard=True)
+            reply_markup=choice_keyboard(context, "qp_cat", cats, extra=[("new", "Criar nova categoria")], columns=2)
         )
         context.user_data["step_quick_purchase"] = "qp_category"
         return
 
     if context.user_data["step_quick_purchase"] == "qp_category":
-        chosen = raw.strip()
-        if chosen.lower() == "criar nova categoria":
-            context.user_data["step_quick_purchase"] = "qp_category_new"
-            await update.message.reply_text("Digite o NOME da nova categoria:", reply_markup=ReplyKeyboardRemove())
-            return
-
-        await update.message.reply_text("⌛ Processando...")
-        async with get_session() as session:
-            result = await session.execute(
-                select(Category)
-                .where(Category.profile_id == profile.id)
-                .where(Category.type == CategoryType.VARIAVEL)
-                .where(Category.name.ilike(chosen))
-            )
-            category = result.scalar_one_or_none()
-
-        if category:
-            context.user_data["category"] = category.name
-            context.user_data["category_id"] = category.id
-            context.user_data["step_quick_purchase"] = "qp_used_card"
-            await update.message.reply_text(
-                "A compra foi feita no cartão de crédito? (sim/não)",
-                reply_markup=ReplyKeyboardMarkup([["sim", "não"]], one_time_keyboard=True, resize_keyboard=True)
-            )
-            return
-
+        # categorias existentes chegam pelo teclado inline; texto digitado é o nome de uma nova
         context.user_data["step_quick_purchase"] = "qp_category_new"
-        context.user_data["pending_category_input"] = chosen
+        context.user_data["pending_category_input"] = raw.strip()
 
     if context.user_data["step_quick_purchase"] == "qp_category_new":
         provided = context.user_data.pop("pending_category_input", None)
@@ -104,30 +135,25 @@ async def add_quick_purchase(update: Update, context: ContextTypes.DEFAULT_TYPE)
             await update.message.reply_text("Nome inválido. Digite o nome da nova categoria:")
             return
 
-        await update.message.reply_text("⌛ Processando...")
-        async with get_session() as session:
-            result = await session.execute(
-                select(Category)
-                .where(Category.profile_id == profile.id)
-                .where(Category.type == CategoryType.VARIAVEL)
-                .where(Category.name.ilike(new_name))
-            )
-            existing_var = result.scalar_one_or_none()
-            if existing_var:
-                category = existing_var
-            else:
+        reply = LoadingReply(update.message).reply_text
+        ref = await get_ref_data(profile.id, profile.ref_version)
+        category = ref.find_category(new_name, CategoryType.VARIAVEL)
+        status = "selecionada"
+        if category is None:
+            status = "criada"
+            async with get_session() as session:
                 category = Category(profile_id=profile.id, name=new_name, type=CategoryType.VARIAVEL)
                 session.add(category)
                 await session.flush()
+                await bump_ref_version(session, profile.id)
                 await session.commit()
-                await session.refresh(category)
 
         context.user_data["category"] = category.name
         context.user_data["category_id"] = category.id
         context.user_data["step_quick_purchase"] = "qp_used_card"
-        await update.message.reply_text(
-            f"Categoria '{category.name}' criada.\nA compra foi feita no cartão de crédito? (sim/não)",
-            reply_markup=ReplyKeyboardMarkup([["sim", "não"]], one_time_keyboard=True, resize_keyboard=True)
+        await reply(
+            f"Categoria '{category.name}' {status}.\nA compra foi feita no cartão de crédito?",
+            reply_markup=USED_CARD_KEYBOARD
         )
         return
 
@@ -136,45 +162,8 @@ async def add_quick_purchase(update: Update, context: ContextTypes.DEFAULT_TYPE)
             await update.message.reply_text("Responda apenas com 'sim' ou 'não'.")
             return
 
-        if text in ("sim",):
-            context.user_data["step_quick_purchase"] = "qp_card"
-            await update.message.reply_text("⌛ Processando...")
-            async with get_session() as session:
-                result = await session.execute(
-                    select(Account).where(Account.profile_id == profile.id).where(Account.type == "credit_card").order_by(Account.name)
-                )
-                cards = result.scalars().all()
-
-            if not cards:
-                context.user_data["step_quick_purchase"] = "qp_create_card_direct"
-                await update.message.reply_text("Nenhum cartão cadastrado. Digite o NOME do cartão (será criado):", reply_markup=ReplyKeyboardRemove())
-                return
-
-            keyboard = [[c.name] for c in cards] + [["Criar novo cartão"]]
-            await update.message.reply_text(
-                "Escolha o cartão ou digite um novo:",
-                reply_markup=ReplyKeyboardMarkup(keyboard, one_time_keyboard=True, resize_keyboard=True)
-            )
-            return
-
-        context.user_data["step_quick_purchase"] = "qp_account"
-        await update.message.reply_text("⌛ Processando...")
-        async with get_session() as session:
-            result = await session.execute(
-                select(Account).where(Account.profile_id == profile.id).where(Account.type == "bank").order_by(Account.name)
-            )
-            accounts = result.scalars().all()
-
-        if not accounts:
-            context.user_data["step_quick_purchase"] = "qp_create_bank_direct"
-            await update.message.reply_text("Nenhuma conta bancária cadastrada. Digite o NOME da conta (será criada):", reply_markup=ReplyKeyboardRemove())
-            return
-
-        keyboard = [[a.name] for a in accounts] + [["Criar nova conta"]]
-        await update.message.reply_text(
-            "Escolha a conta ou digite um novo nome:",
-            reply_markup=ReplyKeyboardMarkup(keyboard, one_time_keyboard=True, resize_keyboard=True)
-        )
+        reply = LoadingReply(update.message).reply_text
+        await _ask_card_or_account(context, profile.id, text == "sim", reply, profile.ref_version)
         return
 
     if context.user_data["step_quick_purchase"] == "qp_create_card_direct":
@@ -182,42 +171,19 @@ async def add_quick_purchase(update: Update, context: ContextTypes.DEFAULT_TYPE)
         if not name:
             await update.message.reply_text("Nome inválido. Digite o nome do cartão:")
             return
-        await update.message.reply_text("⌛ Processando...")
-        async with get_session() as session:
-            card = Account(profile_id=profile.id, name=name, type="credit_card", balance=0.0, currency=CurrencyEnum.BRL)
-            session.add(card)
-            await session.flush()
-            await session.commit()
-            await session.refresh(card)
-
-        context.user_data["card_account_id"] = card.id
+        reply = LoadingReply(update.message).reply_text
+        context.user_data["card_account_id"] = await _get_or_create_account(profile, name, "credit_card")
         context.user_data["step_quick_purchase"] = "qp_installments"
-        await update.message.reply_text("Foi parcelado? Digite o número de parcelas:", reply_markup=ReplyKeyboardRemove())
+        await reply("Foi parcelado? Digite o número de parcelas:", reply_markup=ReplyKeyboardRemove())
         return
 
     if context.user_data["step_quick_purchase"] == "qp_card":
-        if raw.strip().lower() == "criar novo cartão":
-            context.user_data["step_quick_purchase"] = "qp_create_card_direct"
-            await update.message.reply_text("Digite o NOME do novo cartão:", reply_markup=ReplyKeyboardRemove())
-            return
-
+        # cartões existentes chegam pelo teclado inline; texto digitado é um cartão novo (ou homônimo)
         chosen = raw.strip()
-        await update.message.reply_text("⌛ Processando...")
-        async with get_session() as session:
-            result = await session.execute(
-                select(Account).where(Account.profile_id == profile.id).where(Account.type == "credit_card").where(Account.name.ilike(chosen))
-            )
-            card = result.scalar_one_or_none()
-            if not card:
-                card = Account(profile_id=profile.id, name=chosen, type="credit_card", balance=0.0, currency=CurrencyEnum.BRL)
-                session.add(card)
-                await session.flush()
-                await session.commit()
-                await session.refresh(card)
-
-        context.user_data["card_account_id"] = card.id
+        reply = LoadingReply(update.message).reply_text
+        context.user_data["card_account_id"] = await _get_or_create_account(profile, chosen, "credit_card")
         context.user_data["step_quick_purchase"] = "qp_installments"
-        await update.message.reply_text("Foi parcelado? Digite o número de parcela:", reply_markup=ReplyKeyboardRemove())
+        await reply("Foi parcelado? Digite o número de parcela:", reply_markup=ReplyKeyboardRemove())
         return
 
     if context.user_data["step_quick_purchase"] == "qp_create_bank_direct":
@@ -225,42 +191,19 @@ async def add_quick_purchase(update: Update, context: ContextTypes.DEFAULT_TYPE)
         if not name:
             await update.message.reply_text("Nome inválido. Digite o nome da conta:")
             return
-        await update.message.reply_text("⌛ Processando...")
-        async with get_session() as session:
-            acc = Account(profile_id=profile.id, name=name, type="bank", balance=0.0, currency=CurrencyEnum.BRL)
-            session.add(acc)
-            await session.flush()
-            await session.commit()
-            await session.refresh(acc)
-
-        context.user_data["account_id"] = acc.id
+        reply = LoadingReply(update.message).reply_text
+        context.user_data["account_id"] = await _get_or_create_account(profile, name, "bank")
         context.user_data["step_quick_purchase"] = "qp_description"
-        await update.message.reply_text("Adicione uma descrição opcional para a compra:", reply_markup=ReplyKeyboardRemove())
+        await reply("Adicione uma descrição opcional para a compra:", reply_markup=ReplyKeyboardRemove())
         return
 
     if context.user_data["step_quick_purchase"] == "qp_account":
-        if raw.strip().lower() == "criar nova conta":
-            context.user_data["step_quick_purchase"] = "qp_create_bank_direct"
-            await update.message.reply_text("Digite o NOME da nova conta:", reply_markup=ReplyKeyboardRemove())
-            return
-
+        # contas existentes chegam pelo teclado inline; texto digitado é uma conta nova (ou homônima)
         chosen = raw.strip()
-        await update.message.reply_text("⌛ Processando...")
-        async with get_session() as session:
-            result = await session.execute(
-                select(Account).where(Account.profile_id == profile.id).where(Account.type == "bank").where(Account.name.ilike(chosen))
-            )
-            acc = result.scalar_one_or_none()
-            if not acc:
-                acc = Account(profile_id=profile.id, name=chosen, type="bank", balance=0.0, currency=CurrencyEnum.BRL)
-                session.add(acc)
-                await session.flush()
-                await session.commit()
-                await session.refresh(acc)
-
-        context.user_data["account_id"] = acc.id
+        reply = LoadingReply(update.message).reply_text
+        context.user_data["account_id"] = await _get_or_create_account(profile, chosen, "bank")
         context.user_data["step_quick_purchase"] = "qp_description"
-        await update.message.reply_text("Adicione uma descrição opcional para a compra:", reply_markup=ReplyKeyboardRemove())
+        await reply("Adicione uma descrição opcional para a compra:", reply_markup=ReplyKeyboardRemove())
         return
 
     if context.user_data["step_quick_purchase"] == "qp_installments":
@@ -288,11 +231,61 @@ async def add_quick_purchase(update: Update, context: ContextTypes.DEFAULT_TYPE)
             context.user_data["account_id"] = context.user_data.get("card_account_id")
         context.user_data["card_installments"] = int(context.user_data.get("card_installments", 1))
 
-        await update.message.reply_text("⌛ Processando...")
+        # save_transaction mostra o próprio aviso e a confirmação
         await save_transaction(update, context)
-
-        await update.message.reply_text("✅ Saída registrada com sucesso!", reply_markup=ReplyKeyboardRemove())
         context.user_data.clear()
         return
 
     await update.message.reply_text("Não entendi. Para iniciar uma saída rápida, digite /compra_rapida.")
+
+
+async def quick_purchase_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Escolhas do teclado inline da compra rápida: resolve pelo id e edita a própria mensagem."""
+    query = update.callback_query
+    await query.answer()
+    prefix, value = split_callback(query.data)
+    step = context.user_data.get("step_quick_purchase")
+    expected = {"qp_cat": "qp_category", "qp_used": "qp_used_card", "qp_card": "qp_card", "qp_acc": "qp_account"}
+    if step != expected.get(prefix):
+        await query.edit_message_text("Essa opção expirou. Use /comprarapida para começar de novo.")
+        return
+
+    if prefix == "qp_used":
+        await _ask_card_or_account(context, context.user_data["profile_id"], value == "1", query.edit_message_text)
+        return
+
+    if value == "new":
+        if prefix == "qp_cat":
+            context.user_data["step_quick_purchase"] = "qp_category_new"
+            await query.edit_message_text("Digite o NOME da nova categoria:")
+        elif prefix == "qp_card":
+            context.user_data["step_quick_purchase"] = "qp_create_card_direct"
+            await query.edit_message_text("Digite o NOME do novo cartão:")
+        else:
+            context.user_data["step_quick_purchase"] = "qp_create_bank_direct"
+            await query.edit_message_text("Digite o NOME da nova conta:")
+        return
+
+    choice = resolve_choice(context, prefix, value)
+    if choice is None:
+        await query.edit_message_text("Opção inválida. Use /comprarapida para começar de novo.")
+        context.user_data.clear()
+        return
+    item_id, name = choice
+
+    if prefix == "qp_cat":
+        context.user_data["category"] = name
+        context.user_data["category_id"] = item_id
+        context.user_data["step_quick_purchase"] = "qp_used_card"
+        await query.edit_message_text(
+            f"Categoria: {name}\nA compra foi feita no cartão de crédito?",
+            reply_markup=USED_CARD_KEYBOARD
+        )
+    elif prefix == "qp_card":
+        context.user_data["card_account_id"] = item_id
+        context.user_data["step_quick_purchase"] = "qp_installments"
+        await query.edit_message_text(f"Cartão: {name}\nFoi parcelado? Digite o número de parcelas:")
+    else:
+        context.user_data["account_id"] = item_id
+        context.user_data["step_quick_purchase"] = "qp_description"
+        await query.edit_message_text(f"Conta: {name}\nAdicione uma descrição opcional para a compra:")
@@ -0,0 +1,237 @@
+# handlers/recurring.py
+# Despesas fixas recorrentes: /recorrentes cria e lista modelos (valor, categoria, conta, dia do mês);
+# um job do JobQueue lança todos os vencidos de todos os perfis de uma vez:
+#   - um INSERT em lote (ON CONFLICT DO NOTHING no índice único (recurring_id, date)), então rodar
+#     de novo — ou em dois processos — nunca duplica o lançamento de um período;
+#   - um UPDATE de saldo por conta com a soma do que foi de fato inserido;
+#   - recuperação: um modelo com next_due no passado (bot fora do ar) lança todos os meses perdidos.
+import calendar
+import datetime
+import logging
+from collections import defaultdict
+from telegram import Update
+from telegram.ext import ContextTypes
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import select, update, bindparam
+
+from db.session import get_session, dialect_insert
+from db.models import RecurringExpense, Transaction, TransactionType, Account, Profile
+from db.auth import auth
+from db.refcache import get_ref_data
+from db.reportcache import bump_data_version
+from utils.parsers import split_args, parse_entry, normalize_name
+
+logger = logging.getLogger(__name__)
+
+RECURRING_JOB_INTERVAL = 3600   # segundos entre execuções do job (a primeira roda logo após subir)
+RECURRING_BATCH_SIZE = 500      # modelos por transação
+RECURRING_USAGE = (
+    "Use: /recorrentes <valor> <categoria> <conta|cartão> dia <1-31> [\"descrição\"]\n"
+    "ex.: /recorrentes 1200 aluguel principal dia 5\n"
+    "Para remover: /recorrentes remover <id>"
+)
+
+
+def due_date(year: int, month: int, day_of_month: int) -> datetime.date:
+    """Vencimento no mês; dia 31 em fevereiro vira o último dia do mês."""
+    return datetime.date(year, month, min(day_of_month, calendar.monthrange(year, month)[1]))
+
+
+def first_due(day_of_month: int, today: datetime.date) -> datetime.date:
+    due = due_date(today.year, today.month, day_of_month)
+    if due < today:
+        following = today + relativedelta(months=1)
+        due = due_date(following.year, following.month, day_of_month)
+    return due
+
+
+def next_due_after(due: datetime.date, day_of_month: int) -> datetime.date:
+    following = due.replace(day=1) + relativedelta(months=1)
+    return due_date(following.year, following.month, day_of_month)
+
+
+async def _materialize_batch(session, templates, today: datetime.date):
+    """Lança os vencimentos de `templates`; retorna {telegram_id: [(descrição, valor, data)]} do que foi inserido."""
+    account_ids = {t.account_id for t, _ in templates}
+    result = await session.execute(select(Account.id, Account.balance).where(Account.id.in_(account_ids)))
+    running = {account_id: balance or 0.0 for account_id, balance in result.all()}
+
+    rows = []
+    labels = {}
+    for template, telegram_id in templates:
+        labels[template.id] = (telegram_id, template.description or "Despesa fixa")
+        due = template.next_due
+        while due <= today:
+            if template.account_id in running:
+                rows.append({
+                    "account_id": template.account_id,
+                    "category_id": template.category_id,
+                    "profile_id": template.profile_id,
+                    "recurring_id": template.id,
+                    "type": TransactionType.SAIDA,
+                    "value": -template.value,
+                    "date": due,
+                    "description": template.description,
+                    "is_transfer": False,
+                    "is_settled": False,
+                    "balance_before": running[template.account_id],
+                })
+                running[template.account_id] -= template.value
+            due = next_due_after(due, template.day_of_month)
+        template.next_due = due
+
+    if not rows:
+        return {}
+
+    inserted = (await session.execute(
+        dialect_insert(session, Transaction.__table__)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["recurring_id", "date"])
+        .returning(Transaction.account_id, Transaction.profile_id, Transaction.recurring_id,
+                   Transaction.value, Transaction.date)
+    )).all()
+
+    deltas = defaultdict(float)
+    created = defaultdict(list)
+    for account_id, profile_id, recurring_id, value, date in inserted:
+        deltas[account_id] += value
+        telegram_id, label = labels[recurring_id]
+        created[telegram_id].append((label, -value, date))
+
+    accounts = Account.__table__
+    if deltas:
+        await session.execute(
+            update(accounts)
+            .where(accounts.c.id == bindparam("acc_id"))
+            .values(balance=accounts.c.balance + bindparam("delta")),
+            [{"acc_id": account_id, "delta": delta} for account_id, delta in deltas.items()],
+        )
+    for profile_id in {profile_id for _, profile_id, _, _, _ in inserted}:
+        await bump_data_version(session, profile_id)
+    return created
+
+
+async def materialize_due(today: datetime.date = None):
+    """Lança todos os modelos vencidos até `today`, em lotes; retorna {telegram_id: [(descrição, valor, data)]}."""
+    today = today or datetime.date.today()
+    created = defaultdict(list)
+    last_id = 0
+    while True:
+        async with get_session() as session:
+            async with session.begin():
+                result = await session.execute(
+                    select(RecurringExpense, Profile.telegram_id)
+                    .join(Profile, Profile.id == RecurringExpense.profile_id)
+                    .where(RecurringExpense.active.is_(True))
+                    .where(RecurringExpense.next_due <= today)
+                    .where(RecurringExpense.id > last_id)
+                    .order_by(RecurringExpense.id)
+                    .limit(RECURRING_BATCH_SIZE)
+                    .with_for_update(of=RecurringExpense, skip_locked=True)
+                )
+                templates = result.all()
+                if not templates:
+                    break
+                last_id = templates[-1][0].id
+                for telegram_id, items in (await _materialize_batch(session, templates, today)).items():
+                    created[telegram_id].extend(items)
+    return created
+
+
+async def materialize_recurring_job(context: ContextTypes.DEFAULT_TYPE):
+    created = await materialize_due()
+    for telegram_id, items in created.items():
+        lines = [f"- {label}: R$ {value:.2f} ({date.strftime('%d/%m/%Y')})" for label, value, date in items]
+        try:
+            await context.bot.send_message(chat_id=telegram_id, text="🔁 Despesas fixas lançadas:\n" + "\n".join(lines))
+        except Exception:
+            logger.exception("Falha ao avisar %s sobre despesas fixas lançadas", telegram_id)
+    if created:
+        logger.info("Despesas fixas: %d lançamentos para %d perfis", sum(map(len, created.values())), len(created))
+
+
+def _pop_day(tokens: list):
+    """Tira "dia N" dos tokens (antes do parse_entry, para N não virar o valor); retorna N ou None."""
+    for i, (token, quoted) in enumerate(tokens[:-1]):
+        day, day_quoted = tokens[i + 1]
+        if not quoted and not day_quoted and normalize_name(token) == "dia" and day.isdigit() and 1 <= int(day) <= 31:
+            del tokens[i:i + 2]
+            return int(day)
+    return None
+
+
+async def recurring_expenses(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    profile = await auth(update)
+    if profile is None:
+        return
+
+    args = context.args or []
+    ref = await get_ref_data(profile.id, profile.ref_version)
+
+    if not args:
+        async with get_session() as session:
+            result = await session.execute(
+                select(RecurringExpense)
+                .where(RecurringExpense.profile_id == profile.id)
+                .where(RecurringExpense.active.is_(True))
+                .order_by(RecurringExpense.day_of_month)
+            )
+            templates = result.scalars().all()
+        if not templates:
+            await update.message.reply_text(f"Nenhuma despesa fixa cadastrada.\n{RECURRING_USAGE}")
+            return
+        lines = ["🔁 Despesas fixas:\n"]
+        for t in templates:
+            category = ref.category(t.category_id)
+            account = ref.account(t.account_id)
+            lines.append(
+                f"#{t.id} • dia {t.day_of_month} • R$ {t.value:.2f} • {category.name if category else '-'} • "
+                f"{account.name if account else '-'}{' • ' + t.description if t.description else ''}\n"
+                f"   próximo: {t.next_due.strftime('%d/%m/%Y')}"
+            )
+        await update.message.reply_text("\n".join(lines))
+        return
+
+    if normalize_name(args[0]) == "remover":
+        template_id = int(args[1].lstrip("#")) if len(args) > 1 and args[1].lstrip("#").isdigit() else None
+        if template_id is None:
+            await update.message.reply_text(RECURRING_USAGE)
+            return
+        async with get_session() as session:
+            template = await session.get(RecurringExpense, template_id)
+            if template is None or template.profile_id != profile.id:
+                await update.message.reply_text("⚠️ Despesa fixa não encontrada.")
+                return
+            template.active = False
+            await session.commit()
+        await update.message.reply_text(f"🗑️ Despesa fixa #{template_id} removida. Lançamentos já feitos foram mantidos.")
+        return
+
+    raw = (update.message.text or "").split(maxsplit=1)
+    entities = {
+        "category": {normalize_name(c.name): c for c in ref.categories},
+        "card": {normalize_name(a.name): a for a in ref.cards},
+        "account": {normalize_name(a.name): a for a in ref.accounts},
+    }
+    tokens = split_args(raw[1] if len(raw) > 1 else "")
+    day = _pop_day(tokens)
+    parsed = parse_entry(tokens, entities)
+    category = parsed.matches.get("category")
+    account = parsed.matches.get("card") or parsed.matches.get("account")
+    if parsed.amount is None or parsed.amount <= 0 or category is None or account is None or day is None:
+        await update.message.reply_text(f"Não entendi a despesa fixa.\n{RECURRING_USAGE}")
+        return
+
+    today = datetime.date.today()
+    async with get_session() as session:
+        template = RecurringExpense(
+            profile_id=profile.id, category_id=category.id, account_id=account.id, value=parsed.amount,
+            day_of_month=day, description=parsed.description or category.name, next_due=first_due(day, today),
+        )
+        session.add(template)
+        await session.commit()
+
+    await update.message.reply_text(
+        f"🔁 Despesa fixa #{template.id} criada: {template.description} R$ {parsed.amount:.2f} todo dia {day} em {account.name}.\n"
+        f"Próximo lançamento: {template.next_due.strftime('%d/%m/%Y')}"
+    )
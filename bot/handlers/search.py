@@ -0,0 +1,129 @@
+# handlers/search.py
+# /buscar <trecho> — transações pela descrição, das mais recentes para as mais antigas.
+# No Postgres: palavras pelo índice full-text (to_tsvector 'portuguese'), trechos por ILIKE e
+# erros de digitação por similaridade de palavras (<%), ambos pelo índice de trigramas (pg_trgm).
+# Em outros bancos, só ILIKE. Paginação por keyset (data, id): cada página custa o mesmo.
+# O botão de próxima página leva o cursor e o termo no callback_data: cada mensagem pagina a própria
+# busca, mesmo depois de outra /buscar ou de um fluxo que limpa user_data.
+import datetime
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes
+from sqlalchemy import select, or_, tuple_, literal, literal_column, func, text
+
+from db.session import get_session
+from db.models import Transaction, TransactionType, Category
+from db.auth import auth
+from utils.keyboards import split_callback
+
+SEARCH_PAGE_SIZE = 10
+SEARCH_USAGE = "Use: /buscar <trecho da descrição> (ex.: /buscar uber)"
+# callback_data tem no máximo 64 bytes: "bs:" + data (até 7 dígitos) + id (até 10) + separadores + termo
+SEARCH_MAX_TERM_BYTES = 40
+
+_fuzzy_available = None  # pg_trgm instalado? (consultado uma vez por processo)
+
+
+async def _fuzzy_enabled(session) -> bool:
+    global _fuzzy_available
+    if session.bind.dialect.name != "postgresql":
+        return False
+    if _fuzzy_available is None:
+        result = await session.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+        _fuzzy_available = result.first() is not None
+    return _fuzzy_available
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_stmt(profile_id: int, term: str, dialect_name: str, fuzzy: bool = False, after=None,
+                limit: int = SEARCH_PAGE_SIZE):
+    """`after` = (data, id) da última linha da página anterior; devolve limit+1 linhas para saber se há mais."""
+    conditions = [Transaction.description.ilike(f"%{_escape_like(term)}%", escape="\\")]
+    if dialect_name == "postgresql":
+        # mesma expressão do índice ix_transactions_description_fts
+        tsvector = literal_column("to_tsvector('portuguese', coalesce(transactions.description, ''))")
+        conditions.append(tsvector.op("@@")(func.plainto_tsquery(literal_column("'portuguese'"), term)))
+        if fuzzy:
+            conditions.append(literal(term).op("<%")(Transaction.description))
+
+    stmt = (
+        select(Transaction.id, Transaction.date, Transaction.type, Transaction.value,
+               Transaction.description, Category.name)
+        .outerjoin(Category, Category.id == Transaction.category_id)
+        .where(Transaction.profile_id == profile_id)
+        .where(or_(*conditions))
+        .order_by(Transaction.date.desc(), Transaction.id.desc())
+        .limit(limit + 1)
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(Transaction.date, Transaction.id) < tuple_(literal(after[0]), literal(after[1])))
+    return stmt
+
+
+async def _search_page(profile_id: int, term: str, after=None):
+    async with get_session() as session:
+        fuzzy = await _fuzzy_enabled(session)
+        result = await session.execute(search_stmt(profile_id, term, session.bind.dialect.name, fuzzy, after))
+        rows = result.all()
+
+    if not rows:
+        return (f"ℹ️ Nenhuma transação com '{term}'." if after is None else "ℹ️ Não há mais resultados."), None
+
+    has_more = len(rows) > SEARCH_PAGE_SIZE
+    rows = rows[:SEARCH_PAGE_SIZE]
+    lines = [f"🔎 Transações com '{term}':\n"]
+    for tx_id, tx_date, tx_type, value, description, category_name in rows:
+        emoji, sign = ("🔻", "-") if tx_type == TransactionType.SAIDA else ("🟢", "+")
+        lines.append(
+            f"{tx_date.strftime('%d/%m/%Y')} • {emoji} {category_name or ''}\n"
+            f"   {(description or '').strip() or '-'}\n"
+            f"   {sign}R$ {abs(float(value or 0)):.2f}\n"
+        )
+
+    markup = None
+    if has_more:
+        last_id, last_date = rows[-1][0], rows[-1][1]
+        markup = InlineKeyboardMarkup([[
+            InlineKeyboardButton("Mais resultados ▶", callback_data=f"bs:{last_date.toordinal()}.{last_id}.{term}")
+        ]])
+    return "\n".join(lines), markup
+
+
+async def search_transactions(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    profile = await auth(update)
+    if profile is None:
+        return
+
+    term = " ".join(context.args or []).strip()
+    if len(term) < 2:
+        await update.message.reply_text(SEARCH_USAGE)
+        return
+    if len(term.encode()) > SEARCH_MAX_TERM_BYTES:
+        await update.message.reply_text(f"Trecho muito longo: use até {SEARCH_MAX_TERM_BYTES} caracteres.")
+        return
+
+    message, markup = await _search_page(profile.id, term)
+    await update.message.reply_text(message, reply_markup=markup)
+
+
+async def search_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Próxima página: o cursor (data, id) e o termo vêm no callback_data ("bs:data.id.termo")."""
+    query = update.callback_query
+    await query.answer()
+    _, value = split_callback(query.data)
+    try:
+        ordinal, last_id, term = value.split(".", 2)
+        after = (datetime.date.fromordinal(int(ordinal)), int(last_id))
+    except ValueError:
+        term, after = None, None
+    if not term or after is None:
+        await query.edit_message_text("Essa busca expirou. Use /buscar de novo.")
+        return
+
+    profile = await auth(update)
+    if profile is None:
+        return
+    message, markup = await _search_page(profile.id, term, after)
+    await query.edit_message_text(message, reply_markup=markup)
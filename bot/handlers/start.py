@@ -3,13 +3,14 @@ from telegram.ext import ContextTypes
 from db.session import get_session
 from db.models import Profile, Account, CurrencyEnum
 from sqlalchemy.future import select
+from utils.replies import LoadingReply
 
 
 async def start_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.message.from_user.id
     user_name = update.message.from_user.full_name
 
-    await update.message.reply_text("⌛ Verificando...")
+    reply = LoadingReply(update.message, "⌛ Verificando...").reply_text
     profile, created = await get_or_create_user(user_id, user_name)
 
     msg = (
@@ -18,7 +19,7 @@ async def start_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "Você já tem sua conta configurada. ✅"
     )
 
-    await update.message.reply_text(
+    await reply(
         f"Olá {profile.name}! 👋\n\n"
         f"{msg}\n\n"
         "🔒 Autenticação:\n"
@@ -0,0 +1,328 @@
+# handlers/statement_import.py
+# /importar [conta] -> envia um extrato (CSV ou OFX) -> inserção em lote.
+# Um hash do conteúdo do arquivo garante que reimportar o mesmo extrato não duplica nada.
+import csv
+import io
+import re
+import hashlib
+import datetime
+from decimal import Decimal
+from telegram import Update, ReplyKeyboardRemove
+from telegram.ext import ContextTypes
+from telegram.error import TelegramError
+from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
+
+from db.session import get_session
+from db.models import Transaction, TransactionType, Category, Account, StatementImport
+from db.auth import auth
+from db.reportcache import bump_data_version
+from db.refcache import get_ref_data
+from db.usage import record_category_uses
+from db.autocat import load_index, WORD_RE
+from utils.parsers import parse_amount, normalize_name
+from utils.keyboards import choice_keyboard, split_callback, resolve_choice
+from utils.replies import LoadingReply
+
+IMPORT_BATCH_SIZE = 1000
+MAX_IMPORT_BYTES = 20 * 1024 * 1024  # limite de download da Bot API
+
+DATE_COLUMNS = ("data", "date", "data lançamento", "data lancamento", "dt")
+VALUE_COLUMNS = ("valor", "value", "amount", "montante", "valor (r$)")
+DESCRIPTION_COLUMNS = ("descrição", "descricao", "description", "histórico", "historico", "memo", "lançamento", "lancamento")
+DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d/%m/%y", "%d-%m-%Y")
+
+# palavra-chave na descrição -> nome de categoria (usada só se a categoria existir no perfil)
+CATEGORY_RULES = {
+    "uber": "Transporte",
+    "99app": "Transporte",
+    "posto": "Transporte",
+    "ifood": "Restaurante",
+    "restaurante": "Restaurante",
+    "supermercado": "Mercado",
+    "mercado": "Mercado",
+    "farmacia": "Farmácia",
+    "farmácia": "Farmácia",
+    "drogaria": "Farmácia",
+    "netflix": "Streaming",
+    "spotify": "Streaming",
+    "aluguel": "Aluguel",
+}
+
+
+class StatementRow:
+    __slots__ = ("date", "value", "description")
+
+    def __init__(self, date, value, description):
+        self.date = date
+        self.value = value
+        self.description = description
+
+
+def _parse_date(raw: str) -> datetime.date:
+    raw = (raw or "").strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(raw, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"data inválida: {raw!r}")
+
+
+def _find_column(header, candidates):
+    normalized = [h.strip().lower() for h in header]
+    for name in candidates:
+        if name in normalized:
+            return normalized.index(name)
+    return None
+
+
+def parse_csv(text: str):
+    sample = text[:4096]
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=";,\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(io.StringIO(text), dialect)
+    header = next(reader, None) or []
+    date_idx = _find_column(header, DATE_COLUMNS)
+    value_idx = _find_column(header, VALUE_COLUMNS)
+    desc_idx = _find_column(header, DESCRIPTION_COLUMNS)
+    if date_idx is None or value_idx is None:
+        raise ValueError("colunas de data e valor não encontradas no cabeçalho")
+
+    for line in reader:
+        if not line or len(line) <= max(date_idx, value_idx):
+            continue
+        description = line[desc_idx].strip() if desc_idx is not None and desc_idx < len(line) else None
+        yield StatementRow(_parse_date(line[date_idx]), parse_amount(line[value_idx]), description or None)
+
+
+OFX_TRANSACTION = re.compile(r"<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|(?=</BANKTRANLIST>))", re.S | re.I)
+
+
+def _ofx_field(block: str, tag: str):
+    m = re.search(rf"<{tag}>([^<\r\n]*)", block, re.I)
+    return m.group(1).strip() if m else None
+
+
+def parse_ofx(text: str):
+    for block in OFX_TRANSACTION.findall(text):
+        posted = _ofx_field(block, "DTPOSTED")
+        amount = _ofx_field(block, "TRNAMT")
+        if not posted or not amount:
+            continue
+        date = datetime.datetime.strptime(posted[:8], "%Y%m%d").date()
+        description = _ofx_field(block, "MEMO") or _ofx_field(block, "NAME")
+        yield StatementRow(date, float(Decimal(amount.replace(",", "."))), description)
+
+
+def parse_statement(filename: str, content: bytes):
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        text = content.decode("latin-1")
+    if (filename or "").lower().endswith(".ofx") or "<OFX>" in text[:2048].upper():
+        return list(parse_ofx(text))
+    return list(parse_csv(text))
+
+
+def categorize(description: str, categories_by_name: dict, token_index=None):
+    """
+    Retorna o id da categoria pelo nome da categoria, pelo histórico do perfil (token_index) ou por
+    CATEGORY_RULES; None se nada casar. O nome da categoria só casa com palavras inteiras da
+    descrição: "Bar" não casa com "BARBEARIA", nem "Casa" com "CASAS BAHIA".
+    """
+    desc = (description or "").lower()
+    if not desc:
+        return None
+    words = f" {' '.join(WORD_RE.findall(normalize_name(desc)))} "
+    # o nome mais longo primeiro: "Casa e Construção" antes de "Casa"
+    for name, cat_id in sorted(categories_by_name.items(), key=lambda item: -len(item[0] or "")):
+        name_words = " ".join(WORD_RE.findall(normalize_name(name)))
+        if name_words and f" {name_words} " in words:
+            return cat_id
+    if token_index is not None:
+        cat_id = token_index.suggest(desc)
+        if cat_id:
+            return cat_id
+    for keyword, cat_name in CATEGORY_RULES.items():
+        if keyword in desc:
+            cat_id = categories_by_name.get(cat_name.lower())
+            if cat_id:
+                return cat_id
+    return None
+
+
+async def import_rows(session, profile_id: int, account: Account, rows, content_hash: str, filename: str):
+    """Insere as linhas em lotes e atualiza o saldo da conta uma única vez. Retorna (inseridas, total)."""
+    result = await session.execute(select(Category.id, Category.name).where(Category.profile_id == profile_id))
+    categories_by_name = {name.lower(): cat_id for cat_id, name in result.all()}
+    token_index = await load_index(session, profile_id)
+
+    session.add(StatementImport(profile_id=profile_id, account_id=account.id, content_hash=content_hash,
+                                filename=filename, rows=len(rows)))
+    await session.flush()  # viola a unique (profile, hash) antes de inserir qualquer linha
+
+    running = account.balance or 0.0
+    total = 0.0
+    batch = []
+    category_uses = []
+    for row in sorted(rows, key=lambda r: r.date):
+        category_id = categorize(row.description, categories_by_name, token_index) if row.value < 0 else None
+        if category_id is not None:
+            category_uses.append((category_id, row.date))
+        batch.append({
+            "account_id": account.id,
+            "profile_id": profile_id,
+            "category_id": category_id,
+            "type": TransactionType.ENTRADA if row.value > 0 else TransactionType.SAIDA,
+            "value": row.value,
+            "date": row.date,
+            "description": row.description,
+            "is_transfer": False,
+            "is_settled": False,
+            "balance_before": running,
+        })
+        running += row.value
+        total += row.value
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await session.execute(insert(Transaction), batch)
+            batch = []
+    if batch:
+        await session.execute(insert(Transaction), batch)
+
+    account.balance = (account.balance or 0.0) + total
+    await record_category_uses(session, category_uses)
+    await bump_data_version(session, profile_id)
+    return len(rows), total
+
+
+async def import_statement(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    profile = await auth(update)
+    if profile is None:
+        return
+
+    text = (update.message.text or "").strip()
+
+    if "step_import" not in context.user_data:
+        ref = await get_ref_data(profile.id, profile.ref_version)
+        accounts = ref.accounts
+        name = " ".join(context.args or []).strip()
+        chosen = ref.find_account(name, "bank") if name else None
+        if chosen:
+            context.user_data["import_account_id"] = chosen.id
+            context.user_data["step_import"] = "import_file"
+            await update.message.reply_text(
+                f"Envie o arquivo do extrato (CSV ou OFX) para importar na conta '{chosen.name}'.",
+                reply_markup=ReplyKeyboardRemove()
+            )
+            return
+
+        if not accounts:
+            await update.message.reply_text("Nenhuma conta bancária cadastrada. Crie uma em /meusdados.")
+            return
+
+        context.user_data["step_import"] = "import_account"
+        await update.message.reply_text(
+            "Em qual conta deseja importar o extrato?",
+            reply_markup=choice_keyboard(context, "imp_acc", [(a.id, a.name) for a in accounts], extra=[("cancel", "cancelar")])
+        )
+        return
+
+    if context.user_data["step_import"] == "import_account":
+        # a conta chega por import_account_callback (teclado inline)
+        if text.lower() == "cancelar":
+            context.user_data.clear()
+            await update.message.reply_text("Importação cancelada.", reply_markup=ReplyKeyboardRemove())
+            return
+        await update.message.reply_text("Escolha a conta nos botões acima.")
+        return
+
+    await update.message.reply_text("Aguardando o arquivo do extrato (CSV ou OFX). Para cancelar, use /exit.")
+
+
+async def import_account_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+    prefix, value = split_callback(query.data)
+    if context.user_data.get("step_import") != "import_account":
+        await query.edit_message_text("Essa opção expirou. Use /importar para começar de novo.")
+        return
+
+    choice = None if value == "cancel" else resolve_choice(context, prefix, value)
+    if choice is None:
+        context.user_data.clear()
+        await query.edit_message_text("Importação cancelada.")
+        return
+
+    account_id, name = choice
+    context.user_data["import_account_id"] = account_id
+    context.user_data["step_import"] = "import_file"
+    await query.edit_message_text(f"Envie o arquivo do extrato (CSV ou OFX) para importar na conta '{name}'.")
+
+
+async def import_statement_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if context.user_data.get("step_import") != "import_file":
+        await update.message.reply_text("Para importar um extrato, use /importar primeiro.")
+        return
+
+    profile = await auth(update)
+    if profile is None:
+        return
+
+    document = update.message.document
+    if document.file_size and document.file_size > MAX_IMPORT_BYTES:
+        await update.message.reply_text("⚠️ Arquivo muito grande (máximo 20 MB).")
+        return
+
+    reply = LoadingReply(update.message, "⌛ Importando extrato...").reply_text
+    try:
+        tg_file = await document.get_file()
+        content = bytes(await tg_file.download_as_bytearray())
+    except TelegramError as e:
+        await reply(f"❌ Não consegui baixar o arquivo: {e}. Envie de novo.")
+        return
+    content_hash = hashlib.sha256(content).hexdigest()
+
+    try:
+        rows = parse_statement(document.file_name, content)
+    except ValueError as e:
+        await reply(f"❌ Não consegui ler o extrato: {e}")
+        return
+
+    if not rows:
+        await reply("ℹ️ Nenhuma transação encontrada no arquivo.")
+        return
+
+    account_id = context.user_data.get("import_account_id")
+    async with get_session() as session:
+        try:
+            async with session.begin():
+                result = await session.execute(
+                    select(StatementImport.id)
+                    .where(StatementImport.profile_id == profile.id)
+                    .where(StatementImport.content_hash == content_hash)
+                )
+                if result.first():
+                    await reply("ℹ️ Esse extrato já foi importado. Nada foi alterado.")
+                    context.user_data.clear()
+                    return
+
+                account = await session.get(Account, account_id)
+                if account is None or account.profile_id != profile.id:
+                    await reply("⚠️ Conta não encontrada. Operação cancelada.")
+                    context.user_data.clear()
+                    return
+
+                count, total = await import_rows(session, profile.id, account, rows, content_hash, document.file_name)
+        except IntegrityError:
+            await reply("ℹ️ Esse extrato já foi importado. Nada foi alterado.")
+            context.user_data.clear()
+            return
+
+    context.user_data.clear()
+    await reply(
+        f"✅ {count} transações importadas em '{account.name}'.\n"
+        f"Saldo ajustado em R$ {total:.2f} — saldo atual R$ {account.balance:.2f}"
+    )
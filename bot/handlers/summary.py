@@ -1,50 +1,345 @@
 import io
 import datetime
-import matplotlib.pyplot as plt
-from telegram import Update
+from abc import ABC, abstractmethod
+from functools import cache
+from PIL import Image
+from telegram import Update, InputMediaPhoto
 from telegram.ext import ContextTypes
-from sqlalchemy import select, func
+from sqlalchemy import select, func, or_, and_
 from db.session import get_session
-from db.models import Transaction, TransactionType, Category, CategoryType
+from db.models import Transaction, TransactionType, CategoryType
 from db.auth import auth
+from db.refcache import get_ref_data
+from db.reportcache import get_report, put_report
+from utils.replies import LoadingReply
+from utils import pilcharts
+from config import Env
 from dateutil.relativedelta import relativedelta
 
+CAPTION_LIMIT = 1024        # legenda de foto/álbum na Bot API
+COMPACT_DPI = 60            # figura 12x6 pol. -> 720x360 px (padrão do matplotlib: 100 dpi, 1200x600)
+COMPACT_COLORS = 64         # paleta do PNG compacto; os gráficos usam poucas cores chapadas
+COMPACT_WEBP_QUALITY = 80
+FORECAST_HISTORY_MONTHS = 36   # histórico lido para a projeção do /resumo (sazonalidade precisa de > 12)
+RANGE_TOP_CATEGORIES = 5    # categorias listadas no texto dos relatórios de vários meses
+USAGE = "Use: /resumo [mm/aaaa | mm/aaaa-mm/aaaa | aaaa] ou /resumo <período> vs <período> (ex: /resumo 2024 vs 2025)"
+
+def category_totals_stmt(profile_id: int, start_date, end_date):
+    # total por categoria (apenas despesas)
+    return (
+        select(Transaction.category_id, func.sum(Transaction.value))
+        .where(Transaction.date >= start_date, Transaction.date < end_date)
+        .where(Transaction.profile_id == profile_id)
+        .where(Transaction.type == TransactionType.SAIDA)
+        .group_by(Transaction.category_id)
+    )
+
+
+def monthly_net_stmt(profile_id: int, start_date, end_date):
+    # saldo (soma de todos os tipos) por (ano, mês) do intervalo: uma linha por mês com lançamentos
+    year = func.extract("year", Transaction.date)
+    month = func.extract("month", Transaction.date)
+    return (
+        select(year, month, func.sum(Transaction.value))
+        .where(Transaction.profile_id == profile_id)
+        .where(Transaction.date >= start_date, Transaction.date < end_date)
+        .group_by(year, month)
+    )
+
+
+def monthly_category_totals_stmt(profile_id: int, periods):
+    # tabela compacta (ano, mês, categoria, tipo, soma) de todos os períodos numa query só:
+    # o número de linhas cresce com meses x categorias, não com o número de lançamentos
+    year = func.extract("year", Transaction.date)
+    month = func.extract("month", Transaction.date)
+    return (
+        select(year, month, Transaction.category_id, Transaction.type, func.sum(Transaction.value))
+        .where(Transaction.profile_id == profile_id)
+        .where(or_(*(and_(Transaction.date >= start, Transaction.date < end) for start, end in periods)))
+        .group_by(year, month, Transaction.category_id, Transaction.type)
+    )
+
+
 async def summary_month(update: Update, context: ContextTypes.DEFAULT_TYPE):
     profile = await auth(update)
     if profile is None:
         return 
 
-    # tratar argumento mm/aaaa
+    # tratar argumento mm/aaaa; intervalos, anos e comparações vão para summary_periods
     args = context.args
     today = datetime.date.today()
-    if args:
+    if len(args) == 1 and "/" in args[0] and "-" not in args[0]:
         try:
             month, year = map(int, args[0].split("/"))
+            datetime.date(year, month, 1)
         except Exception:
-            await update.message.reply_text("Use o formato: /resumo mm/aaaa")
+            await update.message.reply_text(USAGE)
+            return
+    elif args:
+        try:
+            periods = parse_periods(args, today)
+        except ValueError:
+            await update.message.reply_text(USAGE)
             return
+        await summary_periods(update, profile, periods, today)
+        return
     else:
         month, year = today.month, today.year
 
-    start_date = datetime.date(year, month, 1)
-    end_date = start_date + relativedelta(months=1)  # próximo mês
+    loading = LoadingReply(update.message, f"⌛ Gerando Relatório para {month:02d}/{year}...")
+    reply = loading.reply_text
+
+    # o relatório só muda quando o perfil escreve algo (ou quando o mês corrente vira)
+    cache_key = (year, month, today.year, today.month)
+    report = get_report(profile, "summary_month", cache_key)
+    if report is None:
+        report = await build_summary(profile, month, year, today)
+        put_report(profile, "summary_month", cache_key, report)
+
+    resumo_text, img1, img2 = report
+    if resumo_text is None:
+        await reply("ℹ️ Nenhuma despesa encontrada nesse período.")
+        return
+
+    await send_report(update, loading, resumo_text, img1, img2)
+
+
+async def send_report(update: Update, loading: LoadingReply, resumo_text: str, img1: bytes, img2: bytes):
+    # texto e as duas imagens num único álbum (sendMediaGroup), com o resumo como legenda;
+    # álbum não entra num edit, então o aviso de carregamento (se saiu) é apagado
+    await loading.discard()
+    caption = resumo_text
+    if len(caption) > CAPTION_LIMIT:
+        await update.message.reply_text(resumo_text)
+        caption = None
+    await update.message.reply_media_group(media=[
+        InputMediaPhoto(img1, caption=caption),
+        InputMediaPhoto(img2),
+    ])
+
+
+def parse_period(token: str) -> tuple:
+    """'mm/aaaa', 'aaaa' ou 'mm/aaaa-mm/aaaa' -> (primeiro dia, primeiro dia depois do fim)."""
+    if "-" in token:
+        first, last = token.split("-", 1)
+        start, _ = parse_period(first)
+        _, end = parse_period(last)
+    elif "/" in token:
+        month, year = map(int, token.split("/"))
+        start = datetime.date(year, month, 1)
+        end = start + relativedelta(months=1)
+    else:
+        year = int(token)
+        start, end = datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1)
+    if end <= start:
+        raise ValueError(token)
+    return start, end
+
+
+def parse_periods(args, today: datetime.date) -> tuple:
+    """
+    Um período (intervalo/ano) ou dois ('A vs B'); meses futuros ficam de fora. Levanta ValueError.
+    Numa comparação em que um período foi cortado em hoje, o outro fica com o mesmo número de meses:
+    '2024 vs 2025' em outubro de 2025 compara jan-out com jan-out, não o ano todo com dez meses.
+    """
+    parts = " ".join(args).lower().replace(" x ", " vs ").split(" vs ")
+    if len(parts) > 2:
+        raise ValueError(args)
+    next_month = today.replace(day=1) + relativedelta(months=1)
+    periods = []
+    kept_months = None
+    for part in parts:
+        tokens = part.split()
+        if len(tokens) != 1:
+            raise ValueError(args)
+        start, end = parse_period(tokens[0])
+        if start >= next_month:
+            raise ValueError(args)
+        if end > next_month:
+            end = next_month
+            months = len(period_months((start, end)))
+            kept_months = months if kept_months is None else min(kept_months, months)
+        periods.append((start, end))
+    if kept_months is not None:
+        periods = [(start, min(end, start + relativedelta(months=kept_months))) for start, end in periods]
+    return tuple(periods)
+
+
+def period_label(period) -> str:
+    start, end = period
+    last = end - relativedelta(months=1)
+    if start == last:
+        return start.strftime("%m/%Y")
+    if start.month == 1 and last.month == 12 and start.year == last.year:
+        return str(start.year)
+    return f"{start:%m/%Y}-{last:%m/%Y}"
+
+
+def period_months(period) -> list:
+    start, end = period
+    months = []
+    while start < end:
+        months.append(start)
+        start += relativedelta(months=1)
+    return months
+
+
+def pivot_monthly(rows, months):
+    """
+    Linhas (ano, mês, categoria, tipo, soma) -> matrizes NumPy alinhadas a `months`:
+    (ids das categorias, despesas [mês x categoria] positivas, receitas por mês, saldo por mês).
+    O saldo soma todos os tipos, como monthly_net_stmt no resumo de um mês.
+    """
+    import numpy as np
 
-    await update.message.reply_text(f"⌛ Gerando Relatório para {month:02d}/{year}...")
+    month_keys = np.array([m.year * 12 + m.month - 1 for m in months], dtype=np.int64)
+    n_months = len(months)
+    if not rows:
+        return [], np.zeros((n_months, 0)), np.zeros(n_months), np.zeros(n_months)
 
+    years, month_numbers, category_ids, types, totals = zip(*rows)
+    row_months = np.searchsorted(month_keys, np.asarray(years, dtype=np.int64) * 12 + np.asarray(month_numbers, dtype=np.int64) - 1)
+    totals = np.asarray(totals, dtype=float)
+    # sem categoria (None) vira -1 para o np.unique
+    categories, row_categories = np.unique(
+        np.array([-1 if c is None else c for c in category_ids], dtype=np.int64), return_inverse=True
+    )
+    is_expense = np.array([t == TransactionType.SAIDA for t in types])
+    is_income = np.array([t == TransactionType.ENTRADA for t in types])
+
+    n_categories = len(categories)
+    expenses = np.bincount(
+        row_months[is_expense] * n_categories + row_categories[is_expense],
+        weights=-totals[is_expense], minlength=n_months * n_categories,
+    ).reshape(n_months, n_categories)
+    income = np.bincount(row_months[is_income], weights=totals[is_income], minlength=n_months)
+    net = np.bincount(row_months, weights=totals, minlength=n_months)
+    return [None if c < 0 else int(c) for c in categories], expenses, income, net
+
+
+def _pct_change(before: float, after: float) -> str:
+    if not before:
+        return "—"
+    return f"{(after - before) / abs(before) * 100:+.1f}%"
+
+
+async def summary_periods(update: Update, profile, periods, today: datetime.date):
+    label = " vs ".join(period_label(p) for p in periods)
+    loading = LoadingReply(update.message, f"⌛ Gerando Relatório para {label}...")
+
+    cache_key = (periods, today.year, today.month)
+    report = get_report(profile, "summary_periods", cache_key)
+    if report is None:
+        report = await build_periods_summary(profile, periods)
+        put_report(profile, "summary_periods", cache_key, report)
+
+    resumo_text, img1, img2 = report
+    if resumo_text is None:
+        await loading.reply_text("ℹ️ Nenhuma despesa encontrada nesse período.")
+        return
+    await send_report(update, loading, resumo_text, img1, img2)
+
+
+async def build_periods_summary(profile, periods):
+    """
+    Resumo de um intervalo de meses ou comparação entre dois períodos: uma query agrupada por
+    (mês, categoria, tipo) e o resto em NumPy, então o custo cresce com o número de categorias.
+    """
+    import numpy as np
+
+    ref = await get_ref_data(profile.id, profile.ref_version)
     async with get_session() as session:
-        # total por categoria (apenas despesas)
-        result = await session.execute(
-            select(Transaction.category_id, func.sum(Transaction.value))
-            .where(Transaction.date >= start_date, Transaction.date < end_date)
-            .where(Transaction.profile_id == profile.id)
-            .where(Transaction.type == TransactionType.SAIDA)
-            .group_by(Transaction.category_id)
+        rows = (await session.execute(monthly_category_totals_stmt(profile.id, periods))).all()
+
+    months = sorted({m for p in periods for m in period_months(p)})
+    category_ids, expenses, income, net = pivot_monthly(rows, months)
+    if not expenses.any():
+        return None, None, None
+
+    categories = [ref.category(c) if c is not None else None for c in category_ids]
+    names = np.array([c.name if c else "Sem Categoria" for c in categories])
+    is_fixed = np.array([bool(c and c.type == CategoryType.FIXA) for c in categories], dtype=bool)
+    month_index = {m: i for i, m in enumerate(months)}
+    masks = [np.isin(np.arange(len(months)), [month_index[m] for m in period_months(p)]) for p in periods]
+
+    # totais por período: [período] -> vetor por categoria / escalares
+    by_category = [expenses[mask].sum(axis=0) for mask in masks]
+    expense_totals = [v.sum() for v in by_category]
+    income_totals = [income[mask].sum() for mask in masks]
+    net_totals = [net[mask].sum() for mask in masks]
+
+    # pizza e fixos/variáveis do último período (o único, num intervalo)
+    latest = by_category[-1]
+    shown = latest > 0
+    fixed_total = float(latest[is_fixed].sum())
+    variable_total = float(latest[~is_fixed].sum())
+
+    renderer = get_renderer()
+    img1 = renderer.breakdown(list(names[shown]), [float(v) for v in latest[shown]], fixed_total, variable_total)
+
+    if len(periods) == 1:
+        (period,) = periods
+        n_months = int(masks[0].sum())
+        monthly_expense = expenses.sum(axis=1)
+        img2 = renderer.trend(
+            "Receitas e Despesas por Mês", [m.strftime("%m/%Y") for m in months],
+            [("Receitas", [float(v) for v in income]), ("Despesas", [float(v) for v in monthly_expense]),
+             ("Saldo", [float(v) for v in net])],
+        )
+        shares = latest / latest.sum()
+        top = np.argsort(-latest)[:RANGE_TOP_CATEGORIES]
+        lines = [
+            f"📊 Resumo {period_label(period)} ({n_months} {'mês' if n_months == 1 else 'meses'})\n",
+            f"💰 Receita total: R$ {income_totals[0]:.2f} (média R$ {income_totals[0] / n_months:.2f}/mês)",
+            f"💸 Despesa total: R$ {expense_totals[0]:.2f} (média R$ {expense_totals[0] / n_months:.2f}/mês)",
+            f"⚖️ Saldo do período: R$ {net_totals[0]:.2f}\n",
+            f"🏷️ Fixos: R$ {fixed_total:.2f}",
+            f"🏷️ Variáveis: R$ {variable_total:.2f}\n",
+            "Maiores despesas:",
+        ]
+        lines += [f"• {names[i]}: R$ {latest[i]:.2f} ({shares[i] * 100:.1f}%)" for i in top if latest[i] > 0]
+    else:
+        first, second = periods
+        first_months, second_months = period_months(first), period_months(second)
+        # eixo x por posição no período; se os dois começam no mesmo mês do ano (ex: 2024 vs 2025), rótulo mm
+        longest = max(first_months, second_months, key=len)
+        same_calendar = first_months[0].month == second_months[0].month
+        labels = [m.strftime("%m") for m in longest] if same_calendar else [f"{i + 1}º" for i in range(len(longest))]
+        monthly_expense = expenses.sum(axis=1)
+        img2 = renderer.trend(
+            "Despesas por Mês", labels,
+            [(period_label(p), [float(monthly_expense[month_index[m]]) for m in period_months(p)]) for p in periods],
         )
+        delta = by_category[1] - by_category[0]
+        top = [i for i in np.argsort(-np.abs(delta))[:RANGE_TOP_CATEGORIES] if delta[i]]
+        lines = [
+            f"📊 Comparação {period_label(first)} vs {period_label(second)}\n",
+            f"💰 Receita: R$ {income_totals[0]:.2f} → R$ {income_totals[1]:.2f} ({_pct_change(income_totals[0], income_totals[1])})",
+            f"💸 Despesa: R$ {expense_totals[0]:.2f} → R$ {expense_totals[1]:.2f} ({_pct_change(expense_totals[0], expense_totals[1])})",
+            f"⚖️ Saldo: R$ {net_totals[0]:.2f} → R$ {net_totals[1]:.2f}\n",
+            "Maiores variações nas despesas:",
+        ]
+        lines += [
+            f"• {names[i]}: R$ {by_category[0][i]:.2f} → R$ {by_category[1][i]:.2f} "
+            f"({_pct_change(by_category[0][i], by_category[1][i])})"
+            for i in top
+        ]
+
+    return "\n".join(lines) + "\n", img1, img2
+
+
+async def build_summary(profile, month: int, year: int, today: datetime.date):
+    """Calcula o resumo do mês: (texto, png da pizza/barras, png do saldo/projeção); texto None se não houver despesas."""
+    start_date = datetime.date(year, month, 1)
+    end_date = start_date + relativedelta(months=1)  # próximo mês
+    ref = await get_ref_data(profile.id, profile.ref_version)
+
+    async with get_session() as session:
+        result = await session.execute(category_totals_stmt(profile.id, start_date, end_date))
         category_totals = result.all()
 
         if not category_totals:
-            await update.message.reply_text("ℹ️ Nenhuma despesa encontrada nesse período.")
-            return
+            return None, None, None
 
         category_names = []
         category_values = []
@@ -52,7 +347,7 @@ async def summary_month(update: Update, context: ContextTypes.DEFAULT_TYPE):
         variable_total = 0
 
         for cat_id, total in category_totals:
-            cat = await session.get(Category, cat_id)
+            cat = ref.category(cat_id)
             name = cat.name if cat else "Sem Categoria"
             category_names.append(name)
             value_abs = abs(total)
@@ -75,40 +370,122 @@ async def summary_month(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         saldo = total_entrada - abs(total_saida)
 
-        # --- preparar dados de séries mensais (até o mês atual do ano selecionado) ---
-        month_saldo_real = []
-        month_labels = []
-
-        # Se quisermos mostrar até o mês selecionado (não necessariamente hoje.month)
+        # --- séries mensais: saldo realizado até o mês plotado + histórico anterior para a previsão ---
         last_plot_month = month if year == today.year else 12 if year < today.year else min(month, today.month)
-        for i in range(1, last_plot_month + 1):
-            start_m = datetime.date(year, i, 1)
-            end_m = start_m + relativedelta(months=1)
-            result = await session.execute(
-                select(func.sum(Transaction.value))
-                .where(Transaction.profile_id == profile.id)
-                .where(Transaction.date >= start_m, Transaction.date < end_m)
-            )
-            total_month = result.scalar() or 0
-            month_saldo_real.append(total_month)
-            month_labels.append(f"{i:02d}/{year}")
-
-        # projeção futura (média mensal passada) -> gera rótulos apenas para meses futuros no mesmo ano
-        media_saldo = sum(month_saldo_real) / len(month_saldo_real) if month_saldo_real else 0
-        month_saldo_proj = []
-        month_labels_proj = []
-        # construir projeções para meses seguintes até dezembro do mesmo ano
-        for i in range(last_plot_month + 1, 13):
-            saldo_proj = month_saldo_real[-1] + media_saldo if month_saldo_real else media_saldo
-            month_saldo_proj.append(saldo_proj)
-            date_label = datetime.date(year, i, 1).strftime("%m/%Y")
-            month_labels_proj.append(date_label)
-            month_saldo_real.append(saldo_proj)  # para manter série cumulativa se precisar
-
-        # --------------------
-        # Criar imagem 1: pizza + barras (lado a lado)
-        # --------------------
-        fig1, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
+        plot_end = datetime.date(year, last_plot_month, 1) + relativedelta(months=1)
+        history_start = min(datetime.date(year, 1, 1), plot_end - relativedelta(months=FORECAST_HISTORY_MONTHS))
+        result = await session.execute(monthly_net_stmt(profile.id, history_start, plot_end))
+        monthly_net = result.all()
+
+    history = monthly_series(monthly_net, history_start, plot_end)
+    month_saldo_real = history[-last_plot_month:].tolist()
+    month_labels = [f"{i:02d}/{year}" for i in range(1, last_plot_month + 1)]
+
+    # projeção dos meses restantes do ano: saldo acumulado a partir do último mês fechado,
+    # somando o fluxo mensal previsto (tendência + média exponencial + sazonalidade, utils/forecast.py)
+    import numpy as np
+
+    month_labels_proj = [f"{i:02d}/{year}" for i in range(last_plot_month + 1, 13)]
+    projection = project_balance(history, len(month_labels_proj), current_month_open=plot_end > today.replace(day=1))
+    month_saldo_proj = projection.mean.tolist()
+    # sem graus de liberdade para o desvio (ex.: um único mês de histórico) não há faixa a mostrar
+    has_band = bool(month_labels_proj) and bool(np.isfinite(projection.sigma).all())
+
+    renderer = get_renderer()
+    # imagem 1: pizza + barras (lado a lado); imagem 2: saldo mensal + projeção (lado a lado)
+    img1 = renderer.breakdown(category_names, category_values, fixed_total, variable_total)
+    img2 = renderer.balance(month_labels, month_saldo_real, month_labels_proj, month_saldo_proj,
+                            projection.lower.tolist() if has_band else None,
+                            projection.upper.tolist() if has_band else None)
+
+    resumo_text = (
+        f"📊 Resumo {month:02d}/{year}\n\n"
+        f"💰 Receita total: R$ {total_entrada:.2f}\n"
+        f"💸 Despesa total: R$ {abs(total_saida):.2f}\n"
+        f"⚖️ Saldo do período: R$ {saldo:.2f}\n\n"
+        f"🏷️ Fixos: R$ {fixed_total:.2f}\n"
+        f"🏷️ Variáveis: R$ {variable_total:.2f}\n"
+    )
+    if month_labels_proj:
+        resumo_text += (
+            f"\n🔮 Projeção para {month_labels_proj[-1]}: R$ {month_saldo_proj[-1]:.2f}"
+            + (f" (entre R$ {projection.lower[-1]:.2f} e R$ {projection.upper[-1]:.2f})" if has_band else "")
+            + "\n"
+        )
+
+    return resumo_text, img1, img2
+
+
+def project_balance(history, horizon: int, current_month_open: bool = False):
+    """
+    Saldo acumulado dos `horizon` meses seguintes ao último de `history` (fluxo líquido por mês).
+    Com `current_month_open`, o último mês de `history` ainda está em curso: um total parcial (salário já
+    caiu, poucas despesas) seria o ponto de maior peso da média exponencial e puxaria a projeção inteira,
+    então o ajuste usa só os meses fechados e a projeção parte do último deles, prevendo também o mês
+    corrente. Sem nenhum mês fechado com lançamentos, o parcial é tudo o que há e entra no ajuste.
+    """
+    from utils.forecast import Forecast, forecast_monthly, cumulative
+
+    skipped = 1 if current_month_open and history[:-1].any() else 0
+    fitted = history[:len(history) - skipped]
+    nonzero = fitted.nonzero()[0]
+    # meses antes do primeiro lançamento não são histórico (o perfil ainda não usava o bot)
+    observed = fitted[nonzero[0]:] if len(nonzero) else fitted[-1:]
+    projection = cumulative(forecast_monthly(observed, horizon + skipped), fitted[-1])
+    return Forecast(projection.mean[skipped:], projection.lower[skipped:], projection.upper[skipped:],
+                    projection.sigma[skipped:], projection.method)
+
+
+def monthly_series(rows, start: datetime.date, end: datetime.date):
+    """Linhas (ano, mês, soma) de monthly_net_stmt -> vetor NumPy com um valor por mês de [start, end), zeros onde não há lançamentos."""
+    import numpy as np
+
+    first = start.year * 12 + start.month - 1
+    series = np.zeros((end.year * 12 + end.month - 1) - first)
+    for y, m, total in rows:
+        series[int(y) * 12 + int(m) - 1 - first] = total or 0
+    return series
+
+
+class ChartRenderer(ABC):
+    """
+    Desenha as duas imagens do /resumo e devolve os bytes prontos para envio (ver encode_image).
+    Escolhido por deploy em Env.CHART_RENDERER; bench/charts.py compara as implementações.
+    """
+
+    name = None
+
+    @abstractmethod
+    def breakdown(self, category_names, category_values, fixed_total, variable_total) -> bytes:
+        """Pizza das despesas por categoria + barras fixos vs variáveis."""
+
+    @abstractmethod
+    def balance(self, month_labels, month_values, proj_labels, proj_values,
+                proj_lower=None, proj_upper=None) -> bytes:
+        """Saldo mensal realizado + projeção dos meses restantes, com a faixa de confiança se houver."""
+
+    @abstractmethod
+    def trend(self, title: str, labels, series) -> bytes:
+        """Um gráfico de linhas ocupando a imagem toda; `series` = [(nome, valores)], com legenda."""
+
+
+@cache
+def pyplot():
+    """
+    matplotlib.pyplot só na primeira renderização: o import (numpy, font manager) custa ~0,4 s e
+    dezenas de MB, e não deve atrasar a subida do bot. utils/warmup.py pode antecipá-lo em segundo plano.
+    """
+    import matplotlib
+    matplotlib.use("Agg")   # servidor sem display; evita a sondagem de backends interativos
+    import matplotlib.pyplot as plt
+    return plt
+
+
+class MatplotlibRenderer(ChartRenderer):
+    name = "matplotlib"
+
+    def breakdown(self, category_names, category_values, fixed_total, variable_total) -> bytes:
+        fig, (ax1, ax2) = pyplot().subplots(1, 2, figsize=(12, 6))
         # Pizza
         ax1.pie(category_values, labels=category_names, autopct='%1.1f%%', startangle=90)
         ax1.set_title("Proporção de Despesas por Categoria")
@@ -116,44 +493,125 @@ async def summary_month(update: Update, context: ContextTypes.DEFAULT_TYPE):
         ax2.bar(["Fixos", "Variáveis"], [fixed_total, variable_total])
         ax2.set_ylabel("Total (R$)")
         ax2.set_title("Despesas Fixas vs Variáveis")
-        plt.tight_layout()
-        img1_buf = io.BytesIO()
-        plt.savefig(img1_buf, format='png')
-        img1_buf.seek(0)
-        plt.close(fig1)
-
-        # --------------------
-        # Criar imagem 2: saldo mensal + projeção (lado a lado)
-        # --------------------
-        fig2, (ax3, ax4) = plt.subplots(1, 2, figsize=(12, 6))
+        return self._encode(fig)
+
+    def balance(self, month_labels, month_values, proj_labels, proj_values,
+                proj_lower=None, proj_upper=None) -> bytes:
+        fig, (ax3, ax4) = pyplot().subplots(1, 2, figsize=(12, 6))
         # Saldo Mensal
-        ax3.plot(month_labels, month_saldo_real[:len(month_labels)], marker='o', linestyle='-')
+        ax3.plot(month_labels, month_values, marker='o', linestyle='-')
         ax3.set_title("Saldo Mensal")
         ax3.set_ylabel("R$")
         ax3.set_xlabel("Mês")
         ax3.grid(True)
         # Projeção
-        ax4.plot(month_labels_proj, month_saldo_proj, marker='o', linestyle='--')
+        line, = ax4.plot(proj_labels, proj_values, marker='o', linestyle='--')
+        if proj_lower is not None:
+            ax4.fill_between(proj_labels, proj_lower, proj_upper, color=line.get_color(), alpha=0.2)
         ax4.set_title("Projeção de Saldo Futuro")
         ax4.set_ylabel("R$")
         ax4.set_xlabel("Mês")
         ax4.grid(True)
-        plt.tight_layout()
-        img2_buf = io.BytesIO()
-        plt.savefig(img2_buf, format='png')
-        img2_buf.seek(0)
-        plt.close(fig2)
+        return self._encode(fig)
 
-    resumo_text = (
-        f"📊 Resumo {month:02d}/{year}\n\n"
-        f"💰 Receita total: R$ {total_entrada:.2f}\n"
-        f"💸 Despesa total: R$ {abs(total_saida):.2f}\n"
-        f"⚖️ Saldo do período: R$ {saldo:.2f}\n\n"
-        f"🏷️ Fixos: R$ {fixed_total:.2f}\n"
-        f"🏷️ Variáveis: R$ {variable_total:.2f}\n"
-    )
+    def trend(self, title: str, labels, series) -> bytes:
+        fig, ax = pyplot().subplots(figsize=(12, 6))
+        for name, values in series:
+            ax.plot(labels[:len(values)], values, marker='o', linestyle='-', label=name)
+        ax.set_title(title)
+        ax.set_ylabel("R$")
+        ax.set_xlabel("Mês")
+        ax.grid(True)
+        ax.legend(loc="upper left")
+        return self._encode(fig)
 
-    await update.message.reply_text(resumo_text)
-    # enviar apenas duas imagens (cada uma com 2 plots)
-    await update.message.reply_photo(photo=img1_buf)
-    await update.message.reply_photo(photo=img2_buf)
+    @staticmethod
+    def _encode(fig) -> bytes:
+        fig.tight_layout()
+        try:
+            buf = io.BytesIO()
+            if not Env.CHART_COMPACT and Env.CHART_FORMAT.lower() == "png":
+                fig.savefig(buf, format="png")
+                return buf.getvalue()
+            fig.savefig(buf, format="png", dpi=COMPACT_DPI if Env.CHART_COMPACT else None)
+            return encode_image(Image.open(buf))
+        finally:
+            pyplot().close(fig)
+
+
+class PillowRenderer(ChartRenderer):
+    """Mesmos gráficos desenhados direto com Pillow (utils/pilcharts.py): sem matplotlib, bem mais leve."""
+
+    name = "pillow"
+
+    def breakdown(self, category_names, category_values, fixed_total, variable_total) -> bytes:
+        image, scale, (left, right) = self._canvas()
+        pilcharts.pie_chart(image, left, category_values, category_names,
+                            "Proporção de Despesas por Categoria", scale=scale)
+        pilcharts.bar_chart(image, right, ["Fixos", "Variáveis"], [fixed_total, variable_total],
+                            "Despesas Fixas vs Variáveis", ylabel="Total (R$)", scale=scale)
+        return encode_image(image, flat=True)
+
+    def balance(self, month_labels, month_values, proj_labels, proj_values,
+                proj_lower=None, proj_upper=None) -> bytes:
+        image, scale, (left, right) = self._canvas()
+        pilcharts.line_chart(image, left, month_labels, month_values, "Saldo Mensal",
+                             xlabel="Mês", ylabel="R$", scale=scale)
+        pilcharts.line_chart(image, right, proj_labels, proj_values, "Projeção de Saldo Futuro",
+                             xlabel="Mês", ylabel="R$", scale=scale, dashed=True,
+                             band=(proj_lower, proj_upper) if proj_lower is not None else None)
+        return encode_image(image, flat=True)
+
+    def trend(self, title: str, labels, series) -> bytes:
+        image, scale, (left, right) = self._canvas()
+        pilcharts.lines_chart(image, (left[0], left[1], right[2], right[3]), labels, series, title,
+                              xlabel="Mês", ylabel="R$", scale=scale)
+        return encode_image(image, flat=True)
+
+    @staticmethod
+    def _canvas():
+        """Tela 12x6 pol. (como figsize=(12, 6)) com dois painéis lado a lado."""
+        scale = (COMPACT_DPI if Env.CHART_COMPACT else 100) / 100
+        width, height = round(1200 * scale), round(600 * scale)
+        pad = round(16 * scale)
+        half = width // 2
+        panels = ((pad, pad, half - pad, height - pad), (half + pad, pad, width - pad, height - pad))
+        return pilcharts.new_canvas(width, height), scale, panels
+
+
+RENDERERS = {renderer.name: renderer for renderer in (MatplotlibRenderer, PillowRenderer)}
+_renderers = {}
+
+
+def get_renderer(name: str = None) -> ChartRenderer:
+    name = (Env.CHART_RENDERER if name is None else name).lower()
+    if name not in RENDERERS:
+        raise ValueError(f"CHART_RENDERER inválido: {name!r} (opções: {', '.join(RENDERERS)})")
+    if name not in _renderers:
+        _renderers[name] = RENDERERS[name]()
+    return _renderers[name]
+
+
+def encode_image(image, flat: bool = False) -> bytes:
+    """
+    Serializa a imagem conforme Env.CHART_FORMAT/CHART_COMPACT. Compacto: paleta reduzida (PNG)
+    ou WebP com perdas, várias vezes menor em bytes — ver bench/charts.py.
+    `flat`: imagem só de cores chapadas (desenhada pelo Pillow, sem gradientes); cabe numa paleta de
+    256 cores sem perda visível, e o PNG com paleta sai com metade dos bytes e do tempo de compressão.
+    """
+    compact = Env.CHART_COMPACT
+    image = image.convert("RGB")
+    out = io.BytesIO()
+    if Env.CHART_FORMAT.lower() == "webp":
+        if compact:
+            image.save(out, format="WEBP", quality=COMPACT_WEBP_QUALITY, method=6)
+        else:
+            image.save(out, format="WEBP", lossless=True)
+    elif flat:
+        colors = COMPACT_COLORS if compact else 256
+        image.quantize(colors=colors, method=Image.Quantize.FASTOCTREE).save(out, format="PNG")
+    elif compact:
+        image.quantize(colors=COMPACT_COLORS, method=Image.Quantize.MEDIANCUT).save(out, format="PNG", optimize=True)
+    else:
+        image.save(out, format="PNG")
+    return out.getvalue()
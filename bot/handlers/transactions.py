@@ -1,4 +1,4 @@
-from telegram import Update, ReplyKeyboardMarkup, ReplyKeyboardRemove
+from telegram import Update, ReplyKeyboardMarkup, ReplyKeyboardRemove, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from sqlalchemy import select
 import datetime
@@ -10,6 +10,88 @@ Transaction, Category, TransactionType, CategoryType,
 Account, Profile, Debt, DebtStatus, DebtType, CurrencyEnum
 )
 from db.auth import auth
+from db.reportcache import bump_data_version
+from db.usage import record_category_use, top_categories
+from db.autocat import learn_category, suggest_category
+from db.refcache import get_ref_data, bump_ref_version
+from utils.parsers import parse_amount, split_args, parse_entry, normalize_name
+from utils.keyboards import choice_keyboard, split_callback, resolve_choice
+from utils.replies import LoadingReply
+
+ADD_USAGE = (
+    "Use: /add entrada <valor> <conta> [descrição]\n"
+    "ou: /add saída <valor> <categoria> <conta|cartão> [3x] [dd/mm] [\"descrição\"]\n"
+    "Categoria que não existe é criada com todas as palavras que sobrarem (ex: casa nova)."
+)
+
+
+async def save_from_args(update: Update, context: ContextTypes.DEFAULT_TYPE, profile, t_type: str, tokens: list,
+                         usage: str, category_type: CategoryType = None):
+    # lançamento completo em uma única mensagem: entidades do cache de referência + 1 transação no save
+    ref = await get_ref_data(profile.id, profile.ref_version)
+    accounts = ref.accounts + ref.cards
+
+    entities = {}
+    if t_type == "saida":
+        entities["category"] = {
+            normalize_name(c.name): c for c in ref.categories if category_type is None or c.type == category_type
+        }
+        entities["card"] = {normalize_name(a.name): a for a in ref.cards}
+    entities["account"] = {normalize_name(a.name): a for a in ref.accounts}
+
+    parsed = parse_entry(tokens, entities)
+    if parsed.amount is None or parsed.amount <= 0:
+        await update.message.reply_text(f"Valor inválido.\n{usage}")
+        return
+
+    account = parsed.matches.get("card") or parsed.matches.get("account")
+    if account is None:
+        names = ", ".join(a.name for a in accounts) or "nenhuma"
+        await update.message.reply_text(f"Conta ou cartão não encontrado. Disponíveis: {names}\n{usage}")
+        return
+
+    leftovers = list(parsed.leftovers)
+    category = parsed.matches.get("category")
+    new_category_name = None
+    if t_type == "saida" and category is None and not leftovers and parsed.description:
+        # nenhuma palavra de categoria: tenta pela descrição ("ifood" -> Restaurante); palavras que
+        # sobraram são a categoria que o usuário digitou e viram uma categoria nova logo abaixo
+        async with get_session() as session:
+            suggested_id = await suggest_category(session, profile.id, parsed.description)
+        category = ref.category(suggested_id) if suggested_id else None
+        if category is not None and category_type is not None and category.type != category_type:
+            category = None
+    if t_type == "saida" and category is None:
+        if not leftovers:
+            await update.message.reply_text(f"Informe a categoria.\n{usage}")
+            return
+        # todas as palavras que sobraram, não só a primeira: "casa nova" é uma categoria, não
+        # categoria "casa" com descrição "nova"; a descrição fica só entre aspas
+        new_category_name = " ".join(leftovers)
+        leftovers = []
+
+    context.user_data.clear()
+    context.user_data.update({
+        "profile_id": profile.id,
+        "type": t_type,
+        "value": parsed.amount,
+        "account_id": account.id,
+        "description": parsed.description or " ".join(leftovers) or None,
+        "card_installments": parsed.installments or 1,
+    })
+    if parsed.date:
+        context.user_data["date"] = parsed.date
+    if category is not None:
+        context.user_data["category"] = category.name
+        context.user_data["category_id"] = category.id
+    elif new_category_name:
+        context.user_data["category"] = new_category_name
+        context.user_data["create_category"] = True
+        context.user_data["category_type"] = category_type or CategoryType.VARIAVEL
+
+    await save_transaction(update, context)
+    context.user_data.clear()
+
 
 async def add_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
     profile = await auth(update)
@@ -20,6 +102,17 @@ async def add_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
     raw = update.message.text.strip()
     text = raw.lower()
 
+    if "step" not in context.user_data and context.args:
+        # forma de uma mensagem: /add entrada 3500 principal salário
+        parts = raw.split(maxsplit=2)
+        kind = parts[1].lower() if len(parts) > 1 else ""
+        if kind not in ("entrada", "saída", "saida"):
+            await update.message.reply_text(ADD_USAGE)
+            return
+        t_type = "entrada" if kind == "entrada" else "saida"
+        await save_from_args(update, context, profile, t_type, split_args(parts[2] if len(parts) > 2 else ""), ADD_USAGE)
+        return
+
     if "step" not in context.user_data:
         context.user_data["step"] = "type"
         await update.message.reply_text(
@@ -81,12 +174,8 @@ async def add_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         if text == "cartão":
             # fluxo do cartão
+            cards = (await get_ref_data(profile.id, profile.ref_version)).cards
             async with get_session() as session:
-                result = await session.execute(
-                    select(Account).where(Account.profile_id == profile.id, Account.type == "credit_card").order_by(Account.name)
-                )
-                cards = result.scalars().all()
-
                 if not cards:
                     await update.message.reply_text("Nenhum cartão encontrado. Por favor, cadastre um cartão antes.")
                     context.user_data.clear()
@@ -118,7 +207,7 @@ async def add_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         if "parcelado" in desc:
                             debt_result = await session.execute(
                                 select(Debt)
-                                .where(Debt.profile_id == c.profile_id)
+                                .where(Debt.profile_id == profile.id)
                                 .where(Debt.creditor.ilike(f"%#{tx.id}"))
                                 .where(Debt.type == DebtType.PARCELADO)
                                 .where(Debt.months > 0)
@@ -264,7 +353,7 @@ async def add_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # 6) debt advance total (usado para dívidas e pagamentos de cartão)
     if context.user_data["step"] == "debt_advance_total":
         try:
-            total_value = float(text.replace(",", "."))
+            total_value = parse_amount(text)
             if total_value <= 0:
                 raise ValueError()
         except ValueError:
@@ -309,7 +398,7 @@ async def add_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # 7) value manual (entrada ou saída normal)
     if context.user_data["step"] == "value":
         try:
-            value = float(text.replace(",", "."))
+            value = parse_amount(text)
         except ValueError:
             await update.message.reply_text("Por favor, insira um número válido.")
             return
@@ -339,44 +428,22 @@ async def add_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         if text in ("sim",):
             # listar cartões existentes
-            async with get_session() as session:
-                result = await session.execute(
-                    select(Account).where(Account.profile_id == profile.id).where(Account.type == "credit_card").order_by(Account.name)
-                )
-                cards = result.scalars().all()
+            cards = (await get_ref_data(profile.id, profile.ref_version)).cards
 
             if not cards:
                 context.user_data["step"] = "create_card_name"
                 await update.message.reply_text("Nenhum cartão cadastrado. Digite o NOME do novo cartão para criar:", reply_markup=ReplyKeyboardRemove())
                 return
 
-            keyboard = [[c.name] for c in cards] + [["Criar novo cartão"]]
             context.user_data["step"] = "choose_card"
             await update.message.reply_text(
-                "Escolha um cartão existente ou crie um novo:\n" + "\n".join(f"- {c.name}" for c in cards),
-                reply_markup=ReplyKeyboardMarkup(keyboard, one_time_keyboard=True, resize_keyboard=True)
+                "Escolha um cartão existente ou crie um novo:",
+                reply_markup=choice_keyboard(context, "add_card", [(c.id, c.name) for c in cards], extra=[("new", "Criar novo cartão")])
             )
             return
 
         # não foi no cartão -> seguir para seleção/criação de categoria
-        context.user_data["step"] = "category"
-        # re-use category listing logic by fetching categories now
-        async with get_session() as session:
-            result = await session.execute(select(Category).where(Category.profile_id == profile.id).order_by(Category.name))
-            categories = result.scalars().all()
-
-        if not categories:
-            await update.message.reply_text("Nenhuma categoria cadastrada ainda. Digite o nome da nova categoria para a saída:")
-            context.user_data["step"] = "new_category"
-            return
-
-        list_txt = "Escolha uma categoria existente ou digite uma nova:\n" + "\n".join(f"- {c.name}" for c in categories)
-        keyboard = [[c.name] for c in categories]
-        context.user_data["step"] = "category"
-        await update.message.reply_text(
-            list_txt,
-            reply_markup=ReplyKeyboardMarkup(keyboard, one_time_keyboard=True, resize_keyboard=True)
-        )
+        await _ask_category(context, profile, update.message.reply_text)
         return
 
     # 8b) criar novo cartão: receber nome
@@ -390,6 +457,7 @@ async def add_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
             card = Account(profile_id=profile.id, name=name, type="credit_card", balance=0.0, currency=CurrencyEnum.BRL)
             session.add(card)
             await session.flush()
+            await bump_ref_version(session, profile.id)
             await session.commit()
             await session.refresh(card)
 
@@ -399,25 +467,9 @@ async def add_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Essa compra será *parcelada*? (sim/não)", parse_mode="Markdown", reply_markup=ReplyKeyboardMarkup([["sim", "não"]], one_time_keyboard=True, resize_keyboard=True))
         return
 
-    # 8c) choose existing card
+    # 8c) choose existing card (a escolha chega por add_transaction_callback)
     if context.user_data["step"] == "choose_card":
-        if raw.strip().lower() == "criar novo cartão":
-            context.user_data["step"] = "create_card_name"
-            await update.message.reply_text("Digite o NOME do novo cartão:", reply_markup=ReplyKeyboardRemove())
-            return
-
-        chosen = raw.strip()
-        async with get_session() as session:
-            result = await session.execute(select(Account).where(Account.profile_id == profile.id).where(Account.type == "credit_card").where(Account.name.ilike(chosen)))
-            card = result.scalar_one_or_none()
-        if not card:
-            await update.message.reply_text("Cartão não encontrado. Digite o nome exatamente como mostrado ou escolha 'Criar novo cartão'.")
-            return
-
-        context.user_data["card_account_id"] = card.id
-        # Depois de escolher o cartão, perguntar se a compra será parcelada
-        context.user_data["step"] = "card_installments_query"
-        await update.message.reply_text("Essa compra será *parcelada*? (sim/não)", parse_mode="Markdown", reply_markup=ReplyKeyboardMarkup([["sim", "não"]], one_time_keyboard=True, resize_keyboard=True))
+        await update.message.reply_text("Escolha um cartão nos botões acima ou 'Criar novo cartão'.")
         return
 
     # 8d) flow para parcelamento do cartão
@@ -432,23 +484,8 @@ async def add_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
         else:
             # não parcelado
             context.user_data["card_installments"] = 1
-            context.user_data["step"] = "category"
             # pedir categoria em seguida
-            async with get_session() as session:
-                result = await session.execute(select(Category).where(Category.profile_id == profile.id).order_by(Category.name))
-                categories = result.scalars().all()
-
-            if not categories:
-                await update.message.reply_text("Nenhuma categoria cadastrada ainda. Digite o nome da nova categoria para a saída:")
-                context.user_data["step"] = "new_category"
-                return
-
-            list_txt = "Escolha uma categoria existente ou digite uma nova:\n" + "\n".join(f"- {c.name}" for c in categories)
-            keyboard = [[c.name] for c in categories]
-            await update.message.reply_text(
-                list_txt,
-                reply_markup=ReplyKeyboardMarkup(keyboard, one_time_keyboard=True, resize_keyboard=True)
-            )
+            await _ask_category(context, profile, update.message.reply_text)
             return
 
     if context.user_data["step"] == "card_installments_number":
@@ -460,23 +497,8 @@ async def add_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("Por favor, insira um número inteiro maior que zero.")
             return
         context.user_data["card_installments"] = n
-        context.user_data["step"] = "category"
         # pedir categoria em seguida
-        async with get_session() as session:
-            result = await session.execute(select(Category).where(Category.profile_id == profile.id).order_by(Category.name))
-            categories = result.scalars().all()
-
-        if not categories:
-            await update.message.reply_text("Nenhuma categoria cadastrada ainda. Digite o nome da nova categoria para a saída:")
-            context.user_data["step"] = "new_category"
-            return
-
-        list_txt = "Escolha uma categoria existente ou digite uma nova:\n" + "\n".join(f"- {c.name}" for c in categories)
-        keyboard = [[c.name] for c in categories]
-        await update.message.reply_text(
-            list_txt,
-            reply_markup=ReplyKeyboardMarkup(keyboard, one_time_keyboard=True, resize_keyboard=True)
-        )
+        await _ask_category(context, profile, update.message.reply_text)
         return
 
     # 8e) category flow: seleção/criação de categorias para SAÍDA (mantido como antes)
@@ -487,24 +509,10 @@ async def add_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
             context.user_data.clear()
             return
 
-        # 8a) Usuário escolheu uma categoria existente ou digitou uma nova (etapa "category")
+        # 8a) Categorias existentes chegam pelo teclado inline; texto digitado é o nome de uma nova
+        #     (category_type reaproveita uma categoria homônima em vez de duplicar)
         if context.user_data["step"] == "category":
             chosen = raw.strip()
-            async with get_session() as session:
-                result = await session.execute(
-                    select(Category).where(Category.profile_id == profile.id).where(Category.name.ilike(chosen))
-                )
-                category = result.scalar_one_or_none()
-
-            if category:
-                # categoria existente selecionada
-                context.user_data["category"] = category.name
-                context.user_data["category_id"] = category.id
-                context.user_data["step"] = "description"
-                await update.message.reply_text("Categoria selecionada. Por favor, descreva a saída (opcional):", reply_markup=ReplyKeyboardRemove())
-                return
-
-            # não encontrou: tratar como criação de nova categoria
             context.user_data["new_category_name"] = chosen
             context.user_data["step"] = "category_type"
             await update.message.reply_text(
@@ -546,19 +554,15 @@ async def add_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
             chosen_type = CategoryType.FIXA if text == "fixa" else CategoryType.VARIAVEL
 
             # Cria a categoria se não existir (case-insensitive)
-            async with get_session() as session:
-                result = await session.execute(
-                    select(Category).where(Category.profile_id == profile.id).where(Category.name.ilike(new_name))
-                )
-                existing = result.scalar_one_or_none()
-                if existing:
-                    category = existing
-                else:
+            category = (await get_ref_data(profile.id, profile.ref_version)).find_category(new_name)
+            if category is None:
+                async with get_session() as session:
                     category = Category(profile_id=profile.id, name=new_name, type=chosen_type)
                     session.add(category)
                     await session.flush()
-                # garante persistência antes de abrir nova sessão no save
-                await session.commit()
+                    await bump_ref_version(session, profile.id)
+                    # garante persistência antes de abrir nova sessão no save
+                    await session.commit()
 
             context.user_data["category"] = category.name
             context.user_data["category_id"] = category.id
@@ -579,35 +583,167 @@ async def add_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         # Senão, pedir conta normalmente
         context.user_data["step"] = "choose_account"
+        # consulta direta (não o cache de referência): o teclado mostra os saldos atuais
         async with get_session() as session:
             result = await session.execute(select(Account).where(Account.profile_id == profile.id).where(Account.type == 'bank').order_by(Account.name))
             accounts = result.scalars().all()
         if not accounts:
             await update.message.reply_text("Nenhuma conta cadastrada ainda. Por favor, crie uma conta antes.")
             return
-        keyboard = [[a.name] for a in accounts]
-        list_txt = "Em qual conta foi feita a movimentação?\n" + "\n".join(f"- {a.name}: {a.currency.value} {a.balance:.2f}" for a in accounts)
-        await update.message.reply_text(list_txt, reply_markup=ReplyKeyboardMarkup(keyboard, one_time_keyboard=True, resize_keyboard=True))
+        items = [(a.id, f"{a.name} ({a.currency.value} {a.balance:.2f})") for a in accounts]
+        await update.message.reply_text(
+            "Em qual conta foi feita a movimentação?",
+            reply_markup=choice_keyboard(context, "add_acc", items)
+        )
         return
 
-    # 10) choose account -> save
+    # 10) choose account -> save (a escolha chega por add_transaction_callback)
     if context.user_data["step"] == "choose_account":
-        account_name = text
-        async with get_session() as session:
-            result = await session.execute(select(Account).where(Account.name.ilike(account_name)).where(Account.profile_id == profile.id))
-            account = result.scalar_one_or_none()
-        if not account:
-            await update.message.reply_text("Conta não encontrada. Por favor, escolha uma conta válida.")
-            return
-        context.user_data["account_id"] = account.id
-        await save_transaction(update, context)
+        await update.message.reply_text("Escolha a conta nos botões acima.")
+        return
+
+
+async def _ask_category(context: ContextTypes.DEFAULT_TYPE, profile, send):
+    """Lista as categorias em teclado inline; `send` é reply_text ou edit_message_text."""
+    categories = await top_categories(profile)
+
+    if not categories:
+        context.user_data["step"] = "new_category"
+        await send("Nenhuma categoria cadastrada ainda. Digite o nome da nova categoria para a saída:")
+        return
+
+    context.user_data["step"] = "category"
+    await send(
+        "Escolha uma categoria existente ou digite uma nova:",
+        reply_markup=choice_keyboard(context, "add_cat", categories, columns=2)
+    )
+
+
+async def add_transaction_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Escolhas do teclado inline do /add: resolve pelo id e edita a própria mensagem."""
+    query = update.callback_query
+    await query.answer()
+    prefix, value = split_callback(query.data)
+    expected = {"add_card": "choose_card", "add_cat": "category", "add_acc": "choose_account"}
+    if context.user_data.get("step") != expected.get(prefix):
+        await query.edit_message_text("Essa opção expirou. Use /add para começar de novo.")
+        return
+
+    if prefix == "add_card" and value == "new":
+        context.user_data["step"] = "create_card_name"
+        await query.edit_message_text("Digite o NOME do novo cartão:")
+        return
+
+    choice = resolve_choice(context, prefix, value)
+    if choice is None:
+        await query.edit_message_text("Opção inválida. Use /add para começar de novo.")
         context.user_data.clear()
         return
+    item_id, name = choice
+
+    if prefix == "add_card":
+        context.user_data["card_account_id"] = item_id
+        context.user_data["step"] = "card_installments_query"
+        await query.edit_message_text(f"Cartão: {name}")
+        # a pergunta seguinte usa teclado de resposta, que não pode ser anexado a uma edição
+        await query.message.reply_text(
+            "Essa compra será *parcelada*? (sim/não)", parse_mode="Markdown",
+            reply_markup=ReplyKeyboardMarkup([["sim", "não"]], one_time_keyboard=True, resize_keyboard=True)
+        )
+        return
+
+    if prefix == "add_cat":
+        context.user_data["category"] = name
+        context.user_data["category_id"] = item_id
+        context.user_data["step"] = "description"
+        await query.edit_message_text(f"Categoria: {name}\nPor favor, descreva a saída (opcional):")
+        return
+
+    context.user_data["account_id"] = item_id
+    await query.edit_message_text(f"Conta: {name}")
+    await save_transaction(update, context)
+    context.user_data.clear()
+
+
+
+DUPLICATE_WINDOW_DAYS = 1  # compara com lançamentos de hoje e de ontem (reenvio perto da meia-noite)
+INSTALLMENTS_NOTE = "📦 Parcelado em"  # início da linha que save_transaction acrescenta à descrição parcelada
+
+DUPLICATE_KEYBOARD = InlineKeyboardMarkup([[
+    InlineKeyboardButton("Salvar mesmo assim", callback_data="dup:yes"),
+    InlineKeyboardButton("Cancelar", callback_data="dup:no"),
+]])
+
+
+def transaction_fingerprint(account_id: int, value: float, description: str):
+    """
+    Conta, valor em centavos e descrição normalizada; a data entra como janela na busca. A nota de
+    parcelamento acrescentada ao salvar não conta: a compra parcelada reenviada tem que casar com a salva.
+    """
+    typed = (description or "").split(INSTALLMENTS_NOTE, 1)[0]
+    return account_id, round((value or 0) * 100), normalize_name(typed)
+
+
+async def find_duplicate(session, profile_id: int, account_id: int, t_type: str, date: datetime.date,
+                         value: float, description: str):
+    """
+    Lançamento recente com a mesma impressão digital, ou None. Uma única query, servida pelo
+    índice (account_id, type, date); a descrição é comparada já normalizada nas poucas linhas do dia.
+    """
+    if account_id is None or t_type not in ("entrada", "saida"):
+        return None
+    fingerprint = transaction_fingerprint(account_id, value, description)
+    result = await session.execute(
+        select(Transaction.id, Transaction.date, Transaction.value, Transaction.description)
+        .where(Transaction.account_id == account_id)
+        .where(Transaction.type == TransactionType(t_type))
+        .where(Transaction.date >= date - datetime.timedelta(days=DUPLICATE_WINDOW_DAYS))
+        .where(Transaction.date <= date)
+        .where(Transaction.value.between(value - 0.005, value + 0.005))
+        .where(Transaction.profile_id == profile_id)
+    )
+    for row in result.all():
+        if transaction_fingerprint(account_id, row.value, row.description) == fingerprint:
+            return row
+    return None
+
+
+async def _ask_duplicate(reply, context: ContextTypes.DEFAULT_TYPE, duplicate):
+    # os chamadores limpam user_data ao fim do fluxo; o lançamento pendente fica em chat_data até a resposta
+    context.chat_data["duplicate_pending"] = dict(context.user_data)
+    await reply(
+        f"⚠️ Parece repetido: já existe um lançamento de R$ {abs(duplicate.value):.2f} nessa conta "
+        f"em {duplicate.date.strftime('%d/%m/%Y')}"
+        + (f" ({duplicate.description})" if duplicate.description else "")
+        + ".\nSalvar mesmo assim?",
+        reply_markup=DUPLICATE_KEYBOARD
+    )
+
+
+async def duplicate_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+    _, value = split_callback(query.data)
+    pending = context.chat_data.pop("duplicate_pending", None)
+    if pending is None:
+        await query.edit_message_text("Essa confirmação expirou.")
+        return
+    if value != "yes":
+        await query.edit_message_text("Lançamento descartado.")
+        return
 
+    await query.edit_message_text("Salvando o lançamento repetido.")
+    context.user_data.clear()
+    context.user_data.update(pending)
+    context.user_data["skip_duplicate_check"] = True
+    await save_transaction(update, context)
+    context.user_data.clear()
 
 
 async def save_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Grava o lançamento descrito em user_data; retorna False se não gravou (erro ou aguardando confirmação de repetido)."""
 
+    reply = update.effective_message.reply_text
     try:
         t_type = context.user_data.get("type")
         value = context.user_data.get("value")
@@ -616,20 +752,17 @@ async def save_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
         description = context.user_data.get("description", "")
         account_id = context.user_data.get("account_id")
         profile_id = context.user_data.get("profile_id")
-        today = datetime.date.today()
+        # data do lançamento: hoje, a não ser que tenha sido informada no comando
+        today = context.user_data.get("date") or datetime.date.today()
 
-        # Mensagem inicial
-        try:
-            await update.message.reply_text("⌛ Salvando...")
-        except Exception:
-            # se falhar ao responder, não interrompe o fluxo
-            pass
+        # Aviso "salvando" (só se demorar), editado na mensagem final
+        reply = LoadingReply(update.effective_message, "⌛ Salvando...").reply_text
 
         async with get_session() as session:
             profile = await session.get(Profile, profile_id)
             if not profile:
-                await update.message.reply_text("⚠️ Perfil não encontrado. Operação cancelada.")
-                return
+                await reply("⚠️ Perfil não encontrado. Operação cancelada.")
+                return False
 
             # Inicializa variáveis
             debt_info_line = ""
@@ -640,6 +773,14 @@ async def save_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
             except Exception:
                 value_to_use = 0.0
 
+            # Lançamento repetido (reenvio, falha de rede)? pede confirmação antes de gravar
+            if not context.user_data.get("is_debt_payment") and not context.user_data.get("skip_duplicate_check"):
+                duplicate = await find_duplicate(session, profile.id, account_id, t_type, today,
+                                                 value_to_use if t_type == "entrada" else -value_to_use, description)
+                if duplicate is not None:
+                    await _ask_duplicate(reply, context, duplicate)
+                    return False
+
             # Tratamento de dívida (inclui pagamentos de fatura de cartão)
             if context.user_data.get("is_debt_payment"):
                 # Se pagamento de cartão
@@ -664,8 +805,8 @@ async def save_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
                     debt = await session.get(Debt, debt_id)
                     if not debt or debt.profile_id != profile.id:
-                        await update.message.reply_text("⚠️ Dívida inválida. Operação cancelada.")
-                        return
+                        await reply("⚠️ Dívida inválida. Operação cancelada.")
+                        return False
 
                     remaining_before = debt.months
                     debt.months = max(0, debt.months - int(months_to_pay))
@@ -694,6 +835,7 @@ async def save_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         category = Category(profile_id=profile.id, name=chosen_category_name, type=chosen_category_type)
                         session.add(category)
                         await session.flush()
+                        await bump_ref_version(session, profile.id)
 
                     value_to_use = paid_total
 
@@ -715,22 +857,22 @@ async def save_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
             # Para SAÍDAS normais com categoria definida
             elif t_type == "saida":
-                # Preferir category_id salvo durante o fluxo de seleção/criação
+                # Preferir category_id salvo durante o fluxo de seleção/criação (resolvido pelo cache de referência)
+                ref = await get_ref_data(profile.id, profile.ref_version)
                 if account_category_id:
-                    result = await session.execute(
-                        select(Category).where(Category.id == account_category_id).where(Category.profile_id == profile.id)
-                    )
-                    category = result.scalar_one_or_none()
+                    category = ref.category(account_category_id)
                 if not category and category_name:
-                    result = await session.execute(
-                        select(Category)
-                        .where(Category.name.ilike(category_name))
-                        .where(Category.profile_id == profile.id)
-                    )
-                    category = result.scalar_one_or_none()
+                    category = ref.find_category(category_name)
+                if not category and category_name and context.user_data.get("create_category"):
+                    # criada na mesma transação do lançamento
+                    category = Category(profile_id=profile.id, name=category_name,
+                                        type=context.user_data.get("category_type") or CategoryType.VARIAVEL)
+                    session.add(category)
+                    await session.flush()
+                    await bump_ref_version(session, profile.id)
                 if not category:
-                    await update.message.reply_text("⚠️ Categoria não encontrada. Por favor, crie a categoria antes.")
-                    return
+                    await reply("⚠️ Categoria não encontrada. Por favor, crie a categoria antes.")
+                    return False
 
             # Busca conta (conta onde será registrada a transação fornecida pelo usuário)
             result = await session.execute(
@@ -740,8 +882,8 @@ async def save_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             account = result.scalar_one_or_none()
             if not account:
-                await update.message.reply_text("⚠️ Conta não encontrada. Operação cancelada.")
-                return
+                await reply("⚠️ Conta não encontrada. Operação cancelada.")
+                return False
 
             # tx_value: entradas positivas, saídas negativas
             tx_value = value_to_use if t_type == "entrada" else -value_to_use
@@ -768,8 +910,8 @@ async def save_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 card_account_id = context.user_data.get("debt_card_account_id")
                 card_account = await session.get(Account, card_account_id)
                 if not card_account:
-                    await update.message.reply_text("⚠️ Conta do cartão não encontrada. Operação cancelada.")
-                    return
+                    await reply("⚠️ Conta do cartão não encontrada. Operação cancelada.")
+                    return False
 
                 try:
                     paid_total = float(value_to_use)
@@ -899,6 +1041,7 @@ async def save_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     session.add(tx)
 
                 # Commit das alterações (transações + debts)
+                await bump_data_version(session, profile.id)
                 await session.commit()
 
                 # Refresh objetos (se existirem)
@@ -931,8 +1074,8 @@ async def save_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         creditor, reduced_months, before_m, after_m, amt = du
                         msg += f"- {reduced_months}x de '{creditor}': R$ {amt:.2f} (de {before_m} -> {after_m})\n"
 
-                await update.message.reply_text(msg, reply_markup=ReplyKeyboardRemove())
-                return
+                await reply(msg, reply_markup=ReplyKeyboardRemove())
+                return True
 
             # Fluxo normal (não fatura de cartão)
             account.balance = (account.balance or 0) + tx_value
@@ -987,9 +1130,14 @@ async def save_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 await session.flush()
 
                 # Acrescenta uma linha informativa à descrição
-                tx.description = (tx.description or "") + f"📦 Parcelado em {installments}x de R$ {installment_value:.2f} (total R$ {value_to_use:.2f})"
+                tx.description = (tx.description or "") + f"{INSTALLMENTS_NOTE} {installments}x de R$ {installment_value:.2f} (total R$ {value_to_use:.2f})"
+
+            if category is not None:
+                await record_category_use(session, category.id, today)
+                await learn_category(session, profile.id, category.id, description)
 
             # Commit único (inclui dívida se aplicável)
+            await bump_data_version(session, profile.id)
             await session.commit()
 
             # Refresh seguro (só quando variáveis existem)
@@ -1004,7 +1152,7 @@ async def save_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
             # Mensagem final para transação normal
             category_line = f"Categoria: {category.name}" if category else ""
-            await update.message.reply_text(
+            await reply(
                 f"✅ Transação registrada:\n"
                 f"Tipo: {t_type}\n"
                 f"Valor: {currency} {tx_value:.2f}\n"
@@ -1015,12 +1163,13 @@ async def save_transaction(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"Data: {today.strftime('%d/%m/%Y')}\n",
                 reply_markup=ReplyKeyboardRemove()
             )
+            return True
 
     except Exception:
         # Log completo para debugging
         logger.exception("Erro ao salvar transação em save_transaction")
         try:
-            await update.message.reply_text("⚠️ Ocorreu um erro interno ao salvar a transação. Tente novamente mais tarde.")
+            await reply("⚠️ Ocorreu um erro interno ao salvar a transação. Tente novamente mais tarde.")
         except Exception:
             pass
-        return
\ No newline at end of file
+        return False
\ No newline at end of file
@@ -1,16 +1,26 @@
 # handlers/wallet.py  (acumulativo com "carregando" e resumo focado)
 import datetime
 import calendar
+import logging
+import time
 import traceback
 from decimal import Decimal, ROUND_DOWN, InvalidOperation, getcontext
 from telegram import Update
 from telegram.ext import ContextTypes
-from sqlalchemy import select, func
+from sqlalchemy import select, func, case, update as update_stmt
 from dateutil.relativedelta import relativedelta
 
+from config import Env
 from db.session import get_session
-from db.models import Transaction, TransactionType, Account
+from db.models import Transaction, TransactionType, Account, Profile
 from db.auth import auth
+from db.refcache import get_ref_data
+from db.reportcache import get_report, put_report
+from utils.broadcast import broadcast
+from utils.parsers import normalize_name
+from utils.replies import LoadingReply
+
+logger = logging.getLogger(__name__)
 
 # precisão decimal suficiente
 getcontext().prec = 18
@@ -35,79 +45,211 @@ def format_brl(value: Decimal) -> str:
     return f"{sign}R$ {s}"
 
 
+def last_entry_date_stmt(profile_id: int, account_id: int):
+    return select(func.max(Transaction.date)).where(
+        Transaction.account_id == account_id,
+        Transaction.profile_id == profile_id,
+        Transaction.type == TransactionType.ENTRADA
+    )
+
+
+def budget_numbers(today: datetime.date, entry_date, entry_amount: Decimal, balance: Decimal,
+                   spent_until_yesterday: Decimal, spent_today: Decimal):
+    """
+    (disponível hoje, disponível amanhã) da conta.
+    Com entrada registrada: o valor da última entrada vira uma cota diária até a próxima entrada
+    (um mês depois), e a sobra dos dias anteriores acumula. Sem entrada: saldo atual dividido pelos
+    dias restantes do mês. Gastos em valor positivo.
+    """
+    if entry_date is not None:
+        next_entry_date = entry_date + relativedelta(months=1)
+        period_days = max(1, (next_entry_date - entry_date).days)
+        cota_daily = entry_amount / Decimal(period_days)
+
+        # dias desde entry (inclusivo)
+        days_since_entry_inclusive = min(max((today - entry_date).days + 1, 0), period_days)
+        days_until_yesterday = max(0, days_since_entry_inclusive - 1)
+        carryover_before_today = cota_daily * Decimal(days_until_yesterday) - spent_until_yesterday
+
+        # cota de hoje (se ainda dentro do período) e de amanhã
+        todays_cota = cota_daily if days_since_entry_inclusive > 0 else Decimal("0")
+        tomorrow_cota = cota_daily if days_since_entry_inclusive + 1 <= period_days else Decimal("0")
+        available_today = carryover_before_today + todays_cota
+    else:
+        last_day_of_month = datetime.date(today.year, today.month, calendar.monthrange(today.year, today.month)[1])
+        days_remaining_incl = max(1, (last_day_of_month - today).days + 1)
+        cota_daily = balance / Decimal(days_remaining_incl)
+        available_today = cota_daily
+        tomorrow_cota = cota_daily
+
+    accumulated_today = available_today - spent_today
+    return available_today, accumulated_today + tomorrow_cota
+
+
+def daily_push_stmt(today: datetime.date):
+    """
+    Números da /carteira (conta "Disponível") de todos os perfis com o aviso diário ligado, numa query:
+    última entrada por conta (row_number), gastos desde ela até ontem e de hoje (somas condicionais).
+    Linhas: profile_id, telegram_id, balance, entry_date, entry_amount, spent_before (<= 0), spent_today (<= 0).
+    """
+    accounts = (
+        select(Account.id.label("account_id"), Account.profile_id, Account.balance, Profile.telegram_id)
+        .join(Profile, Profile.id == Account.profile_id)
+        .where(Profile.daily_push.is_(True), Account.name == "Disponível")
+        .cte("push_accounts")
+    )
+    ranked = (
+        select(
+            Transaction.account_id,
+            Transaction.date,
+            (func.coalesce(Transaction.balance_before, 0) + Transaction.value).label("amount"),
+            func.row_number().over(
+                partition_by=Transaction.account_id, order_by=(Transaction.date.desc(), Transaction.id.desc())
+            ).label("rn"),
+        )
+        .join(accounts, accounts.c.account_id == Transaction.account_id)
+        .where(Transaction.type == TransactionType.ENTRADA)
+        .subquery("ranked_entries")
+    )
+    entries = select(ranked.c.account_id, ranked.c.date, ranked.c.amount).where(ranked.c.rn == 1).cte("push_entries")
+    spent = (
+        select(
+            Transaction.account_id,
+            func.sum(case((Transaction.date < today, Transaction.value), else_=0)).label("before"),
+            func.sum(case((Transaction.date == today, Transaction.value), else_=0)).label("today"),
+        )
+        .join(accounts, accounts.c.account_id == Transaction.account_id)
+        .outerjoin(entries, entries.c.account_id == Transaction.account_id)
+        .where(Transaction.type == TransactionType.SAIDA)
+        .where(Transaction.date >= func.coalesce(entries.c.date, today), Transaction.date <= today)
+        .group_by(Transaction.account_id)
+        .cte("push_spent")
+    )
+    return (
+        select(accounts.c.profile_id, accounts.c.telegram_id, accounts.c.balance,
+               entries.c.date, entries.c.amount, spent.c.before, spent.c.today)
+        .outerjoin(entries, entries.c.account_id == accounts.c.account_id)
+        .outerjoin(spent, spent.c.account_id == accounts.c.account_id)
+        .order_by(accounts.c.profile_id, accounts.c.account_id)
+    )
+
+
+async def daily_push_messages(today: datetime.date = None) -> list:
+    """[(telegram_id, texto)] do aviso diário, um por perfil, calculados em lote."""
+    today = today or datetime.date.today()
+    async with get_session() as session:
+        result = await session.execute(daily_push_stmt(today))
+        rows = result.all()
+
+    messages = []
+    seen = set()
+    for profile_id, telegram_id, balance, entry_date, entry_amount, spent_before, spent_today in rows:
+        if profile_id in seen:  # mais de uma conta "Disponível": vale a primeira
+            continue
+        seen.add(profile_id)
+        spent_today = -to_decimal(spent_today)
+        available_today, available_tomorrow = budget_numbers(
+            today, entry_date, to_decimal(entry_amount), to_decimal(balance), -to_decimal(spent_before), spent_today
+        )
+        lines = [
+            f"☀️ Bom dia! Carteira de {today.strftime('%d/%m/%Y')}",
+            "",
+            f"🟢 Disponível hoje: *{format_brl(available_today)}*",
+        ]
+        if spent_today:
+            lines.append(f"🔴 Já gasto hoje: {format_brl(spent_today)}")
+        lines.append(f"➡️ Disponível amanhã (sobra + cota): {format_brl(available_tomorrow)}")
+        lines.append("")
+        lines.append("Detalhes em /carteira · parar os avisos: /carteira diario off")
+        messages.append((telegram_id, "\n".join(lines)))
+    return messages
+
+
+def daily_push_time() -> datetime.time:
+    """Env.DAILY_PUSH_TIME ("HH:MM") no fuso local do servidor (o JobQueue usa UTC por padrão)."""
+    hour, _, minute = Env.DAILY_PUSH_TIME.partition(":")
+    return datetime.time(int(hour), int(minute or 0), tzinfo=datetime.datetime.now().astimezone().tzinfo)
+
+
+async def daily_push_job(context: ContextTypes.DEFAULT_TYPE):
+    started = time.perf_counter()
+    messages = await daily_push_messages()
+    computed = time.perf_counter()
+    report = await broadcast(context.bot, ((chat_id, text, {"parse_mode": "Markdown"}) for chat_id, text in messages))
+    logger.info(
+        "Aviso diário: %d perfis calculados em %.2fs; %d enviados, %d falhas em %.1fs",
+        len(messages), computed - started, report.sent, report.failed, report.elapsed,
+    )
+
+
+async def _set_daily_push(update: Update, profile, args: list):
+    """/carteira diario [on|off] — liga/desliga o aviso diário (sem argumento, alterna)."""
+    choice = normalize_name(args[1]) if len(args) > 1 else None
+    enabled = {"on": True, "sim": True, "ligar": True, "off": False, "nao": False, "desligar": False}.get(
+        choice, not profile.daily_push
+    )
+    async with get_session() as session:
+        await session.execute(update_stmt(Profile).where(Profile.id == profile.id).values(daily_push=enabled))
+        await session.commit()
+    if enabled:
+        await update.message.reply_text(
+            f"☀️ Aviso diário ligado: todo dia às {Env.DAILY_PUSH_TIME} você recebe o disponível da carteira.\n"
+            "Para desligar: /carteira diario off"
+        )
+    else:
+        await update.message.reply_text("🔕 Aviso diário desligado.")
+
+
 async def daily_budget(update: Update, context: ContextTypes.DEFAULT_TYPE):
   
     profile = await auth(update)
     if profile is None:
         return
-    # envia mensagem de "carregando" imediatamente
-    try:
-        loading_msg = await update.message.reply_text("⌛ Gerando resumo — aguarde...")
-    except Exception:
-        loading_msg = None
-
 
     args = context.args or []
+    if args and normalize_name(args[0]) in ("diario", "aviso"):
+        await _set_daily_push(update, profile, args)
+        return
+
+    # aviso de "carregando" (só se demorar), editado no resumo final
+    reply = LoadingReply(update.message, "⌛ Gerando resumo — aguarde...").reply_text
     account_id = int(args[0]) if args and args[0].isdigit() else None
 
     today = datetime.date.today()
 
+    # mesmo perfil, mesma conta, mesmo dia e nenhuma escrita desde o último cálculo: reaproveita o texto
+    cache_key = (account_id, today)  # account_id como pedido (None = "Disponível")
+    final_text = get_report(profile, "daily_budget", cache_key)
+    if final_text is not None:
+        await reply(final_text, parse_mode="Markdown")
+        return
+
     # Vars de saída
-    cota_daily = Decimal("0")
-    generated_until_yesterday = Decimal("0")
-    carryover_before_today = Decimal("0")
     available_today = Decimal("0")
     spent_today = Decimal("0")
-    accumulated_today = Decimal("0")
     entry_amount = Decimal("0")
     entry_date = None
-    next_entry_date = None
-    period_days = None
     txs_list = []
 
     try:
+        ref = await get_ref_data(profile.id, profile.ref_version)
         async with get_session() as session:
             # pega account "Disponível" se não foi passado account_id
             if account_id is None:
-                acc_stmt = select(Account).where(
-                    Account.profile_id == profile.id,
-                    Account.name == "Disponível"
-                ).limit(1)
-                acc_res = await session.execute(acc_stmt)
-                acc_obj = acc_res.scalars().first()
+                acc_obj = next((a for a in ref.accounts + ref.cards if a.name == "Disponível"), None)
                 if not acc_obj:
-                    # edita mensagem de loading com aviso e retorna
-                    if loading_msg:
-                        try:
-                            await loading_msg.edit_text("⚠️ Não encontrei conta 'Disponível'. Crie-a ou informe account_id.")
-                        except Exception:
-                            pass
-                    else:
-                        await update.message.reply_text("⚠️ Não encontrei conta 'Disponível'. Crie-a ou informe account_id.")
+                    await reply("⚠️ Não encontrei conta 'Disponível'. Crie-a ou informe account_id.")
                     return
                 account_id = acc_obj.id
             else:
                 # valida conta pertence ao profile
-                acc_stmt = select(Account).where(Account.id == account_id, Account.profile_id == profile.id).limit(1)
-                acc_res = await session.execute(acc_stmt)
-                acc_obj = acc_res.scalars().first()
+                acc_obj = ref.account(account_id)
                 if not acc_obj:
-                    if loading_msg:
-                        try:
-                            await loading_msg.edit_text("⚠️ Conta não encontrada ou não pertence ao seu perfil.")
-                        except Exception:
-                            pass
-                    else:
-                        await update.message.reply_text("⚠️ Conta não encontrada ou não pertence ao seu perfil.")
+                    await reply("⚠️ Conta não encontrada ou não pertence ao seu perfil.")
                     return
 
             # --- 1) encontra a ÚLTIMA data de ENTRADA na conta ---
-            stmt_last_date = select(func.max(Transaction.date)).where(
-                Transaction.account_id == account_id,
-                Transaction.profile_id == profile.id,
-                Transaction.type == TransactionType.ENTRADA
-            )
-            res_last_date = await session.execute(stmt_last_date)
+            res_last_date = await session.execute(last_entry_date_stmt(profile.id, account_id))
             last_entry_date = res_last_date.scalar()  # None se não houver
 
             if last_entry_date is not None:
@@ -139,22 +281,6 @@ async def daily_budget(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     entry_amount = to_decimal(res_amt.scalar() or 0)
 
                 entry_date = last_entry_date
-                next_entry_date = entry_date + relativedelta(months=1)
-                period_days = (next_entry_date - entry_date).days
-                if period_days <= 0:
-                    period_days = 1
-
-                cota_daily = (entry_amount / Decimal(period_days))
-
-                # dias desde entry (inclusivo)
-                days_since_entry_inclusive = (today - entry_date).days + 1
-                if days_since_entry_inclusive < 1:
-                    days_since_entry_inclusive = 0
-                if days_since_entry_inclusive > period_days:
-                    days_since_entry_inclusive = period_days
-
-                days_until_yesterday = max(0, days_since_entry_inclusive - 1)
-                generated_until_yesterday = cota_daily * Decimal(days_until_yesterday)
 
                 # SAIDAS desde entry_date até < today
                 stmt_spent_until_yesterday = select(func.coalesce(func.sum(Transaction.value), 0)).where(
@@ -165,41 +291,8 @@ async def daily_budget(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     Transaction.date < today
                 )
                 res_spent_prior = await session.execute(stmt_spent_until_yesterday)
-                spent_until_yesterday_raw = res_spent_prior.scalar() or 0
-                spent_until_yesterday = -to_decimal(spent_until_yesterday_raw)
-
-                carryover_before_today = generated_until_yesterday - spent_until_yesterday
-
-                # cota de hoje (se ainda dentro do período)
-                if days_since_entry_inclusive <= 0:
-                    todays_cota = Decimal("0")
-                else:
-                    todays_cota = cota_daily if days_since_entry_inclusive <= period_days else Decimal("0")
-
-                available_today = carryover_before_today + todays_cota
-
-                # gasto hoje
-                stmt_spent_today = select(func.coalesce(func.sum(Transaction.value), 0)).where(
-                    Transaction.account_id == account_id,
-                    Transaction.profile_id == profile.id,
-                    Transaction.type == TransactionType.SAIDA,
-                    Transaction.date >= today,
-                    Transaction.date < (today + relativedelta(days=1))
-                )
-                res_spent_today = await session.execute(stmt_spent_today)
-                spent_today = -to_decimal(res_spent_today.scalar() or 0)
-
-                accumulated_today = available_today - spent_today
-
-                # calcular disponível amanhã:
-                # se amanhã ainda dentro do período, tomorrow_cota = cota_daily else 0
-                days_since_entry_tomorrow = days_since_entry_inclusive + 1
-                if days_since_entry_tomorrow <= 0:
-                    tomorrow_cota = Decimal("0")
-                else:
-                    tomorrow_cota = cota_daily if days_since_entry_tomorrow <= period_days else Decimal("0")
-
-                available_tomorrow = accumulated_today + tomorrow_cota
+                spent_until_yesterday = -to_decimal(res_spent_prior.scalar() or 0)
+                balance = Decimal("0")
 
             else:
                 # fallback: sem entrada registrada -> usar balance atual e dividir dias restantes mês
@@ -207,35 +300,22 @@ async def daily_budget(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 acc_res = await session.execute(acc_stmt)
                 acc = acc_res.scalars().first()
                 balance = to_decimal(acc.balance) if acc else Decimal("0")
+                spent_until_yesterday = Decimal("0")
 
-                # dias restantes mês (incluindo hoje)
-                year = today.year
-                month = today.month
-                last_day = calendar.monthrange(year, month)[1]
-                last_day_of_month = datetime.date(year, month, last_day)
-                days_remaining_incl = (last_day_of_month - today).days + 1
-                if days_remaining_incl <= 0:
-                    days_remaining_incl = 1
-
-                cota_daily = balance / Decimal(days_remaining_incl)
-                carryover_before_today = Decimal("0")
-                available_today = cota_daily
-
-                # gasto hoje
-                stmt_spent_today = select(func.coalesce(func.sum(Transaction.value), 0)).where(
-                    Transaction.account_id == account_id,
-                    Transaction.profile_id == profile.id,
-                    Transaction.type == TransactionType.SAIDA,
-                    Transaction.date >= today,
-                    Transaction.date < (today + relativedelta(days=1))
-                )
-                res_spent_today = await session.execute(stmt_spent_today)
-                spent_today = -to_decimal(res_spent_today.scalar() or 0)
-
-                accumulated_today = available_today - spent_today
+            # gasto hoje
+            stmt_spent_today = select(func.coalesce(func.sum(Transaction.value), 0)).where(
+                Transaction.account_id == account_id,
+                Transaction.profile_id == profile.id,
+                Transaction.type == TransactionType.SAIDA,
+                Transaction.date >= today,
+                Transaction.date < (today + relativedelta(days=1))
+            )
+            res_spent_today = await session.execute(stmt_spent_today)
+            spent_today = -to_decimal(res_spent_today.scalar() or 0)
 
-                # amanhã (simples): accumulated + cota
-                available_tomorrow = accumulated_today + cota_daily
+            available_today, available_tomorrow = budget_numbers(
+                today, entry_date, entry_amount, balance, spent_until_yesterday, spent_today
+            )
 
             # extrato do dia (para exibir)
             stmt_txs = select(Transaction).where(
@@ -275,32 +355,15 @@ async def daily_budget(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 lines.append(f" - [{typ}] {tx['description'] or 'sem descrição'} | {format_brl(tx['value'])}")
 
         final_text = "\n".join(lines)
+        put_report(profile, "daily_budget", cache_key, final_text)
 
-        # edita a mensagem de carregando (se possível); se não, envia nova
-        if loading_msg:
-            try:
-                await loading_msg.edit_text(final_text, parse_mode="Markdown")
-            except Exception:
-                await update.message.reply_text(final_text, parse_mode="Markdown")
-        else:
-            await update.message.reply_text(final_text, parse_mode="Markdown")
+        await reply(final_text, parse_mode="Markdown")
 
     except Exception as e:
         tb = traceback.format_exc()
         print("Erro no handler daily_budget (resumo focado):", str(e))
         print(tb)
-        # tenta editar mensagem de loading com erro
-        err_text = "❌ Ocorreu um erro ao gerar o resumo. Verifique os logs do  "
-        if loading_msg:
-            try:
-                await loading_msg.edit_text(err_text)
-            except Exception:
-                try:
-                    await update.message.reply_text(err_text)
-                except Exception:
-                    pass
-        else:
-            try:
-                await update.message.reply_text(err_text)
-            except Exception:
-                pass
+        try:
+            await reply("❌ Ocorreu um erro ao gerar o resumo. Verifique os logs do  ")
+        except Exception:
+            pass
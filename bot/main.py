@@ -4,6 +4,9 @@ from telegram.ext import ApplicationBuilder, ContextTypes
 from telegram import BotCommand
 from config import Env
 from handlers.base import register_handlers
+from utils.ratelimit import BotRateLimiter
+from utils.warmup import warm_up
+from db.appstate import get_state, set_state, digest, COMMANDS_KEY
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -12,31 +15,63 @@ logger = logging.getLogger(__name__)
 async def error_handler(update, context: ContextTypes.DEFAULT_TYPE):
     logger.exception("Exception while handling update: %s", update)
 
-async def main():
-    app = ApplicationBuilder().token(Env.TELEGRAM_TOKEN).build()
+COMMANDS = [
+    BotCommand("comprarapida", "Compra rápida"),
+    BotCommand("add", "Adicionar uma nova transação"),
+    BotCommand("carteira", "Visualize a carteira do dia"),
+    BotCommand("listatransacoes", "Ultimos lançamentos"),
+    BotCommand("cancelartransacoes", "Cancelar lançamento"),
+    BotCommand("buscar", "Buscar transações pela descrição"),
+    BotCommand("recorrentes", "Despesas fixas mensais"),
+    BotCommand("meusdados", "Meu Dados"),
+    BotCommand("resumo", "Resumo do Mês"),
+    BotCommand("projecao", "Quanto tempo o dinheiro dura"),
+    BotCommand("listacategorias", "Listar categorias"),
+    BotCommand("exportar", "Exportar transações (CSV/Parquet)"),
+    BotCommand("importar", "Importar extrato (CSV/OFX)"),
+    BotCommand("start", "Mostrar mensagem de boas-vindas"),
+    BotCommand("exit", "Reiniciar"),
+]
+
+
+async def register_commands(bot):
+    # set_my_commands é uma ida à Bot API a cada boot; só vale a pena quando a lista (ou o bot) mudou
+    fingerprint = digest([bot.id, [(c.command, c.description) for c in COMMANDS]])
+    if await get_state(COMMANDS_KEY) == fingerprint:
+        logger.info("Comandos inalterados desde o último registro; set_my_commands pulado.")
+        return
+    await bot.set_my_commands(COMMANDS)
+    await set_state(COMMANDS_KEY, fingerprint)
+    logger.info("Comandos registrados com sucesso no bot.")
+
+
+def build_application(token=None, base_url=None, concurrent_updates=False):
+    # base_url permite apontar para outro servidor da Bot API (ex: bench/fake_api.py)
+    # todo envio passa pelo limitador (global, por chat e RetryAfter), ver utils/ratelimit.py
+    builder = (
+        ApplicationBuilder()
+        .token(token or Env.TELEGRAM_TOKEN)
+        .concurrent_updates(concurrent_updates)
+        .rate_limiter(BotRateLimiter())
+    )
+    if base_url:
+        builder = builder.base_url(base_url)
+    app = builder.build()
     register_handlers(app)
 
     app.add_error_handler(error_handler)
+    return app
+
+
+async def main(app=None):
+    # app pronto (ex: apontando para a Bot API falsa) é usado por bench/startup.py
+    app = app or build_application()
 
     await app.initialize()
     await app.start()
 
-    commands = [
-        BotCommand("comprarapida", "Compra rápida"),
-        BotCommand("add", "Adicionar uma nova transação"),
-        BotCommand("carteira", "Visualize a carteira do dia"),
-        BotCommand("listatransacoes", "Ultimos lançamentos"),
-        BotCommand("cancelartransacoes", "Cancelar lançamento"),
-        BotCommand("meusdados", "Meu Dados"),
-        BotCommand("resumo", "Resumo do Mês"),
-        BotCommand("listacategorias", "Listar categorias"),
-        BotCommand("start", "Mostrar mensagem de boas-vindas"),
-        BotCommand("exit", "Reiniciar"),
-    ]
-
     try:
-        await app.bot.set_my_commands(commands)
-        logger.info("Comandos registrados com sucesso no bot.")
+        await register_commands(app.bot)
     except AttributeError:
         logger.warning("app.bot não tem set_my_commands — sua versão da lib pode ser diferente.")
     except Exception as e:
@@ -50,11 +85,15 @@ async def main():
         return
 
     logger.info("Bot rodando. Ctrl+C para parar.")
+    # com o polling já no ar, o aquecimento não atrasa o primeiro update; só o adianta
+    warmup = asyncio.create_task(warm_up()) if Env.WARMUP_ON_START else None
     try:
         await asyncio.Event().wait()
     except (KeyboardInterrupt, SystemExit):
         logger.info("Parando o bot ...")
     finally:
+        if warmup is not None:
+            warmup.cancel()
         try:
             await app.updater.stop_polling()
         except Exception:
@@ -0,0 +1,4 @@
+import os
+
+# os handlers importam db.session, que monta o engine (sem conectar) a partir do DATABASE_URL
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
@@ -0,0 +1,117 @@
+import datetime
+
+import pytest
+
+from utils.parsers import parse_amount, parse_date, split_args, parse_entry, normalize_name
+
+TODAY = datetime.date(2026, 10, 19)
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("1.234,56", 1234.56),
+    ("1234.56", 1234.56),
+    ("1,234.56", 1234.56),
+    ("12,34", 12.34),
+    ("1.234", 1234.0),        # ponto com 3 casas é milhar no padrão brasileiro
+    ("1.5", 1.5),
+    ("R$ 10", 10.0),
+    ("2,5k", 2500.0),
+    ("1,000", 1.0),           # vírgula única é sempre decimal, mesmo com 3 casas
+    ("1,000,000", 1000000.0),
+])
+def test_parse_amount(raw, expected):
+    assert parse_amount(raw) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("raw", [None, "", "abc", "1,2,x", "k"])
+def test_parse_amount_invalid(raw):
+    with pytest.raises(ValueError):
+        parse_amount(raw)
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("hoje", TODAY),
+    ("ontem", datetime.date(2026, 10, 18)),
+    ("anteontem", datetime.date(2026, 10, 17)),
+    ("05/10", datetime.date(2026, 10, 5)),
+    ("05/10/2025", datetime.date(2025, 10, 5)),
+    ("05/10/25", datetime.date(2025, 10, 5)),
+    ("28/12", datetime.date(2025, 12, 28)),   # ainda não chegou neste ano: ano anterior
+])
+def test_parse_date(raw, expected):
+    assert parse_date(raw, TODAY) == expected
+
+
+def test_parse_date_leap_day():
+    assert parse_date("29/02", datetime.date(2028, 3, 1)) == datetime.date(2028, 2, 29)
+    assert parse_date("29/02", datetime.date(2029, 1, 5)) == datetime.date(2028, 2, 29)
+    with pytest.raises(ValueError):
+        parse_date("29/02", datetime.date(2027, 3, 1))
+
+
+def test_parse_date_year_rollover():
+    assert parse_date("28/12", datetime.date(2027, 1, 2)) == datetime.date(2026, 12, 28)
+    assert parse_date("02/01", datetime.date(2027, 1, 2)) == datetime.date(2027, 1, 2)
+
+
+@pytest.mark.parametrize("raw", ["32/01", "amanhã", "1/13", ""])
+def test_parse_date_invalid(raw):
+    with pytest.raises(ValueError):
+        parse_date(raw, TODAY)
+
+
+def test_split_args_quotes():
+    assert split_args('25,90 mercado "padaria da esquina"  \'pão doce\' x') == [
+        ("25,90", False), ("mercado", False), ("padaria da esquina", True), ("pão doce", True), ("x", False),
+    ]
+    assert split_args("") == []
+    assert split_args(None) == []
+
+
+def test_normalize_name():
+    assert normalize_name("  Alimentação ") == "alimentacao"
+
+
+ENTITIES = {
+    "category": {"mercado": "cat-mercado", "casa e construcao": "cat-casa"},
+    "card": {"nubank": "card-nubank"},
+    "account": {"principal": "acc-principal", "conta poupanca": "acc-poupanca"},
+}
+
+
+def test_parse_entry_full_purchase():
+    parsed = parse_entry(split_args('25,90 mercado nubank 3x 05/10 "padaria"'), ENTITIES, TODAY)
+    assert parsed.amount == pytest.approx(25.90)
+    assert parsed.matches == {"category": "cat-mercado", "card": "card-nubank"}
+    assert parsed.installments == 3
+    assert parsed.date == datetime.date(2026, 10, 5)
+    assert parsed.description == "padaria"
+    assert parsed.leftovers == []
+
+
+def test_parse_entry_multiword_names_and_accents():
+    parsed = parse_entry(split_args("100 Casa e Construção Conta Poupança ontem"), ENTITIES, TODAY)
+    assert parsed.matches == {"category": "cat-casa", "account": "acc-poupanca"}
+    assert parsed.date == datetime.date(2026, 10, 18)
+
+
+def test_parse_entry_unknown_words_are_leftovers():
+    parsed = parse_entry(split_args('30 feira principal "verduras" "extra"'), ENTITIES, TODAY)
+    assert parsed.amount == pytest.approx(30)
+    assert parsed.matches == {"account": "acc-principal"}
+    assert parsed.description == "verduras"
+    assert parsed.leftovers == ["feira", "extra"]
+
+
+def test_parse_entry_quoted_entity_is_description():
+    parsed = parse_entry(split_args('10 "mercado" principal'), ENTITIES, TODAY)
+    assert "category" not in parsed.matches
+    assert parsed.description == "mercado"
+
+
+def test_parse_entry_new_category_words_stay_in_order():
+    # /add usa todas as palavras que sobram como nome da categoria nova: "casa nova", não "casa" + "nova"
+    parsed = parse_entry(split_args('50 casa nubank nova "sofá"'), ENTITIES, TODAY)
+    assert parsed.matches == {"card": "card-nubank"}
+    assert parsed.leftovers == ["casa", "nova"]
+    assert parsed.description == "sofá"
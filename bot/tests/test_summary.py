@@ -0,0 +1,54 @@
+import datetime
+
+import pytest
+
+from handlers.summary import parse_periods, period_label
+
+TODAY = datetime.date(2025, 10, 19)
+
+
+def labels(periods):
+    return [period_label(p) for p in periods]
+
+
+def test_parse_periods_single_range_stops_at_current_month():
+    assert labels(parse_periods(["2025"], TODAY)) == ["01/2025-10/2025"]
+    assert labels(parse_periods(["03/2024-05/2024"], TODAY)) == ["03/2024-05/2024"]
+
+
+def test_parse_periods_comparison_with_current_year_uses_same_months():
+    # 2025 só vai até outubro: 2024 é comparado de janeiro a outubro, não o ano inteiro
+    assert labels(parse_periods(["2024", "vs", "2025"], TODAY)) == ["01/2024-10/2024", "01/2025-10/2025"]
+    assert labels(parse_periods(["2025", "x", "2024"], TODAY)) == ["01/2025-10/2025", "01/2024-10/2024"]
+
+
+def test_parse_periods_comparison_of_past_periods_is_unchanged():
+    assert labels(parse_periods(["2023", "vs", "2024"], TODAY)) == ["2023", "2024"]
+    assert labels(parse_periods(["01/2024-06/2024", "vs", "2024"], TODAY)) == ["01/2024-06/2024", "2024"]
+
+
+@pytest.mark.parametrize("args", [["2026"], ["2024", "vs", "2025", "vs", "2023"], ["2024", "2025"]])
+def test_parse_periods_invalid(args):
+    with pytest.raises(ValueError):
+        parse_periods(args, TODAY)
+
+
+@pytest.mark.parametrize("month_to_date", [3000.0, -800.0])
+def test_project_balance_ignores_the_open_month(month_to_date):
+    import numpy as np
+    from handlers.summary import project_balance
+
+    # doze meses fechados de 500 e o mês corrente pela metade (salário já caiu, ou só despesas)
+    history = np.array([0.0] * 24 + [500.0] * 12 + [month_to_date])
+    projection = project_balance(history, 3, current_month_open=True)
+    # parte do último mês fechado (500), prevê o mês corrente (+500) e segue 500/mês
+    assert projection.mean == pytest.approx([1500, 2000, 2500])
+
+
+def test_project_balance_uses_the_open_month_when_it_is_all_there_is():
+    import numpy as np
+    from handlers.summary import project_balance
+
+    history = np.array([0.0] * 36 + [400.0])
+    projection = project_balance(history, 2, current_month_open=True)
+    assert projection.mean == pytest.approx([800, 1200])
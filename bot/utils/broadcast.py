@@ -0,0 +1,70 @@
+# utils/broadcast.py
+# Envio em massa (avisos agendados) dentro dos limites da Bot API: ~30 mensagens/s no total por bot.
+# Um balde de fichas dita o ritmo, abaixo do limite global do utils.ratelimit para sobrar espaço às
+# respostas interativas; alguns envios ficam em voo ao mesmo tempo para a latência de cada requisição
+# não limitar a vazão. Um RetryAfter que chegue até aqui pausa o balde pelo tempo pedido e a mensagem
+# é reenviada; chats que bloquearam o bot só contam como falha.
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from telegram.error import RetryAfter, Forbidden, TelegramError
+
+from config import Env
+from utils.ratelimit import TokenBucket, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_CONCURRENCY = 8   # envios em voo ao mesmo tempo
+MAX_RETRIES = 3             # reenvios após RetryAfter
+
+
+@dataclass
+class BroadcastReport:
+    sent: int = 0
+    failed: int = 0
+    retried: int = 0
+    elapsed: float = 0.0
+
+
+async def broadcast(bot, messages, rate: float = None, concurrency: int = BROADCAST_CONCURRENCY) -> BroadcastReport:
+    """
+    Envia [(chat_id, texto, kwargs de send_message)] respeitando `rate` mensagens/s
+    (Env.BROADCAST_RATE_PER_SECOND por padrão; 0 = sem limite). Nunca levanta por falha de um chat.
+    """
+    bucket = TokenBucket(Env.BROADCAST_RATE_PER_SECOND if rate is None else rate)
+    report = BroadcastReport()
+    queue = asyncio.Queue()
+    for item in messages:
+        queue.put_nowait(item)
+
+    async def worker():
+        while True:
+            try:
+                chat_id, text, kwargs = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            for attempt in range(MAX_RETRIES + 1):
+                await bucket.acquire()
+                try:
+                    await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+                    report.sent += 1
+                    break
+                except RetryAfter as e:
+                    bucket.pause(retry_after_seconds(e))
+                    report.retried += 1
+                    if attempt == MAX_RETRIES:
+                        report.failed += 1
+                except Forbidden:
+                    report.failed += 1   # bot bloqueado ou conta removida
+                    break
+                except TelegramError as e:
+                    logger.warning("Falha ao enviar para %s: %s", chat_id, e)
+                    report.failed += 1
+                    break
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, queue.qsize())))))
+    report.elapsed = time.perf_counter() - started
+    return report
@@ -0,0 +1,100 @@
+# utils/forecast.py
+# Previsão do fluxo mensal (receitas - despesas) a partir da série já agregada por mês, em NumPy puro:
+#   - tendência linear e sazonalidade aditiva por mês do ciclo (esta só a partir de dois ciclos de
+#     histórico), ajustadas juntas por mínimos quadrados;
+#   - nível pela média com peso exponencial dos resíduos (meia-vida em meses): mudanças recentes
+#     de patamar pesam mais que o começo do histórico;
+#   - bandas de confiança pelo desvio dos resíduos, alargando com o horizonte; sem resíduo livre
+#     (um único mês de histórico) o desvio é NaN e não há banda, em vez de uma banda de largura zero.
+# Tudo é vetorizado também entre perfis: `history` pode ser (meses,) ou (perfis, meses), e o custo
+# de um lote é praticamente o de um perfil — ver bench/forecast.py.
+from dataclasses import dataclass
+from functools import lru_cache
+from statistics import NormalDist
+
+import numpy as np
+
+SEASON = 12
+MIN_TREND_MONTHS = 6     # com menos que isso a inclinação é ruído: só nível
+# 13 parâmetros (intercepto, tendência, 11 meses); com 13 meses o ajuste seria exato e o desvio zero
+MIN_SEASONAL_MONTHS = 2 * SEASON
+EWMA_HALF_LIFE = 3.0     # meses
+DEFAULT_LEVEL = 0.8      # cobertura das bandas
+
+
+@dataclass(frozen=True)
+class Forecast:
+    mean: np.ndarray      # previsão pontual para cada mês à frente (1..horizon)
+    lower: np.ndarray
+    upper: np.ndarray
+    sigma: np.ndarray     # desvio padrão da previsão de cada mês
+    method: str
+
+
+@lru_cache(maxsize=8)
+def _z(level: float) -> float:
+    return NormalDist().inv_cdf((1 + level) / 2)
+
+
+@lru_cache(maxsize=64)
+def _model(n: int, horizon: int, half_life: float):
+    """
+    Regressão (intercepto, tendência, mês do ciclo) para `n` meses de histórico, compartilhada por todos
+    os perfis com esse tamanho de série — o ajuste de cada perfil vira uma multiplicação de matrizes.
+    Devolve (projeção para os valores ajustados, projeção para o futuro, pesos da média exponencial,
+    graus de liberdade, nome do método).
+    """
+    t = np.arange(n + horizon, dtype=float)
+    columns = [np.ones_like(t)]
+    method = "média"
+    if n >= MIN_TREND_MONTHS:
+        columns.append(t - (n - 1) / 2)
+        method = "tendência"
+    if n >= MIN_SEASONAL_MONTHS:
+        slots = np.arange(n + horizon) % SEASON
+        columns += [(slots == k).astype(float) for k in range(1, SEASON)]   # mês 0 do ciclo é a base
+        method = "tendência + sazonalidade"
+    design = np.column_stack(columns)
+    pinv = np.linalg.pinv(design[:n])
+    weights = 0.5 ** ((n - 1 - t[:n]) / half_life)   # o último mês pesa 1
+    dof = n - design.shape[1]
+    return design[:n] @ pinv, design[n:] @ pinv, weights / weights.sum(), dof, method
+
+
+def forecast_monthly(history, horizon: int, level: float = DEFAULT_LEVEL,
+                     half_life: float = EWMA_HALF_LIFE) -> Forecast:
+    """
+    `history`: fluxo líquido por mês, do mais antigo ao mais recente (todas as linhas com o mesmo
+    número de meses). Devolve previsões com o mesmo formato de lote: (horizon,) ou (perfis, horizon).
+    """
+    y = np.asarray(history, dtype=float)
+    single = y.ndim == 1
+    y = np.atleast_2d(y)
+    profiles, n = y.shape
+    if n == 0:
+        zeros, unknown = np.zeros((profiles, horizon)), np.full((profiles, horizon), np.nan)
+        return _shape(Forecast(zeros, unknown, unknown, unknown, "sem histórico"), single)
+
+    fit, extrapolate, weights, dof, method = _model(n, horizon, half_life)
+    residuals = y - y @ fit.T
+    # o nível recente corrige a regressão: meses acima/abaixo do ajuste no fim da série puxam a previsão
+    mean = y @ extrapolate.T + (residuals @ weights)[:, None]
+
+    resid_sigma = np.sqrt((residuals ** 2).sum(axis=1) / dof) if dof > 0 else np.full(profiles, np.nan)
+    sigma = resid_sigma[:, None] * np.sqrt(1 + np.arange(1, horizon + 1) / n)
+    z = _z(level)
+    return _shape(Forecast(mean, mean - z * sigma, mean + z * sigma, sigma, method), single)
+
+
+def cumulative(forecast: Forecast, start, level: float = DEFAULT_LEVEL) -> Forecast:
+    """Saldo acumulado a partir de `start` somando os meses previstos; variâncias somam mês a mês."""
+    mean = np.asarray(start, dtype=float)[..., None] + np.cumsum(forecast.mean, axis=-1)
+    sigma = np.sqrt(np.cumsum(forecast.sigma ** 2, axis=-1))
+    z = _z(level)
+    return Forecast(mean, mean - z * sigma, mean + z * sigma, sigma, forecast.method)
+
+
+def _shape(forecast: Forecast, single: bool) -> Forecast:
+    if not single:
+        return forecast
+    return Forecast(forecast.mean[0], forecast.lower[0], forecast.upper[0], forecast.sigma[0], forecast.method)
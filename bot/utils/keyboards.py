@@ -0,0 +1,32 @@
+# utils/keyboards.py
+# Teclados inline com o id do item no callback_data ("prefixo:id").
+# As opções mostradas ficam em user_data, então a escolha é resolvida (e validada) sem reconsultar o banco.
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+
+def choice_keyboard(context, prefix: str, items, extra=(), columns: int = 1) -> InlineKeyboardMarkup:
+    """
+    items: [(id, rótulo)] guardados em user_data para validar a escolha depois.
+    extra: [(valor, rótulo)] de ações fixas no fim do teclado (ex.: ("new", "Criar nova categoria")).
+    """
+    items = list(items)
+    context.user_data[f"choices_{prefix}"] = {str(item_id): label for item_id, label in items}
+    buttons = [
+        InlineKeyboardButton(label, callback_data=f"{prefix}:{value}")
+        for value, label in items + list(extra)
+    ]
+    return InlineKeyboardMarkup([buttons[i:i + columns] for i in range(0, len(buttons), columns)])
+
+
+def split_callback(data: str):
+    """'qp_cat:12' -> ('qp_cat', '12')."""
+    prefix, _, value = (data or "").partition(":")
+    return prefix, value
+
+
+def resolve_choice(context, prefix: str, value: str):
+    """Retorna (id, rótulo) se o valor foi oferecido no último teclado desse prefixo; senão None."""
+    label = (context.user_data.get(f"choices_{prefix}") or {}).get(value)
+    if label is None:
+        return None
+    return int(value), label
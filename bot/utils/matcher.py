@@ -0,0 +1,77 @@
+# utils/matcher.py
+# Autômato de Aho-Corasick sobre texto normalizado: acha todos os nomes cadastrados numa mensagem
+# com uma única passada, em tempo proporcional ao tamanho do texto (e não ao número de nomes).
+from collections import deque
+
+from utils.parsers import normalize_name
+
+
+class KeywordMatcher:
+    """
+    Construído a partir de {frase: [payload, ...]}; as frases são normalizadas (minúsculas, sem acento).
+    find() devolve os casamentos em palavras inteiras, sem sobreposição, preferindo o mais à esquerda
+    e, entre eles, o mais longo.
+    """
+
+    def __init__(self, phrases: dict):
+        self._goto = [{}]        # estado -> {caractere: próximo estado}
+        self._fail = [0]
+        self._out = [[]]         # estado -> [(frase, payloads)] que terminam nele
+        for phrase, payloads in phrases.items():
+            key = normalize_name(phrase)
+            if key:
+                self._add(key, list(payloads))
+        self._build()
+
+    def _add(self, key: str, payloads: list):
+        state = 0
+        for ch in key:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        for existing_key, existing in self._out[state]:
+            if existing_key == key:
+                existing.extend(payloads)
+                return
+        self._out[state].append((key, payloads))
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                candidate = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = candidate if candidate != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str):
+        """[(início, fim, frase, payloads)] sobre normalize_name(text)."""
+        text = normalize_name(text)
+        hits = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for key, payloads in self._out[state]:
+                start, end = i - len(key) + 1, i + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    hits.append((start, end, key, payloads))
+
+        hits.sort(key=lambda h: (h[0], -(h[1] - h[0])))
+        chosen = []
+        last_end = -1
+        for hit in hits:
+            if hit[0] >= last_end:
+                chosen.append(hit)
+                last_end = hit[1]
+        return chosen
@@ -1,13 +1,173 @@
+import re
+import datetime
+import unicodedata
 from decimal import Decimal, InvalidOperation
 
 
+AMOUNT_RE = re.compile(r"^[+-]?(\d+([.,]\d+)*|[.,]\d+)$")
+INSTALLMENTS_RE = re.compile(r"^(\d{1,3})x$", re.I)
+RELATIVE_DATES = {"hoje": 0, "ontem": 1, "anteontem": 2}
+
+
 def parse_amount(raw: str) -> float:
-   """Aceita '12.34' ou '12,34' e retorna float; levanta ValueError se inválido."""
+   """Aceita '12.34', '12,34', '1.234,56', '1,234.56', 'R$ 10' e '2,5k' e retorna float; levanta ValueError se inválido."""
    if raw is None:
       raise ValueError("Valor vazio")
-      normalized = raw.replace(".", ".").replace(",", ".")
+
+   s = raw.strip().lower().replace("r$", "").replace(" ", "")
+   multiplier = 1
+   if s.endswith("k"):
+      multiplier = 1000
+      s = s[:-1]
+   if not s or not AMOUNT_RE.match(s):
+      raise ValueError("Valor inválido")
+
+   if "," in s and "." in s:
+      # o separador que aparece por último é o decimal
+      if s.rfind(",") > s.rfind("."):
+         s = s.replace(".", "").replace(",", ".")
+      else:
+         s = s.replace(",", "")
+   elif "," in s:
+      if s.count(",") > 1:
+         s = s.replace(",", "")
+      else:
+         s = s.replace(",", ".")
+   elif s.count(".") > 1:
+      s = s.replace(".", "")
+   elif "." in s and multiplier == 1:
+      # '1.234' no padrão brasileiro é milhar; '1234.56' e '1.5' são decimais
+      integer, _, frac = s.lstrip("+-").partition(".")
+      if len(frac) == 3 and 1 <= len(integer) <= 3 and integer != "0":
+         s = s.replace(".", "")
+
+   try:
+      d = Decimal(s) * multiplier
+   except InvalidOperation:
+      raise ValueError("Valor inválido")
+   return float(d)
+
+
+def parse_date(raw: str, today: datetime.date = None) -> datetime.date:
+   """
+   Aceita 'hoje', 'ontem', 'anteontem', 'dd/mm' e 'dd/mm/aaaa'; levanta ValueError se inválido.
+   'dd/mm' é a última ocorrência até hoje: '28/12' digitado em janeiro é do ano anterior.
+   """
+   today = today or datetime.date.today()
+   s = (raw or "").strip().lower()
+   if s in RELATIVE_DATES:
+      return today - datetime.timedelta(days=RELATIVE_DATES[s])
+   for fmt in ("%d/%m/%Y", "%d/%m/%y"):
       try:
-         d = Decimal(normalized)
-      except InvalidOperation:
-         raise ValueError("Valor inválido")
-      return float(d)
\ No newline at end of file
+         return datetime.datetime.strptime(s, fmt).date()
+      except ValueError:
+         continue
+   # com o ano no texto, para 29/02 valer nos anos bissextos (sem ano o strptime usa 1900)
+   candidates = []
+   for year in (today.year, today.year - 1):
+      try:
+         candidates.append(datetime.datetime.strptime(f"{s}/{year}", "%d/%m/%Y").date())
+      except ValueError:
+         continue
+   if not candidates:
+      raise ValueError("Data inválida")
+   return next((d for d in candidates if d <= today), candidates[0])
+
+
+def normalize_name(name: str) -> str:
+   """Minúsculas e sem acentos, para comparar nomes digitados com os cadastrados."""
+   decomposed = unicodedata.normalize("NFKD", (name or "").strip().casefold())
+   return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+TOKEN_RE = re.compile(r'"([^"]*)"|\'([^\']*)\'|(\S+)')
+
+
+def split_args(text: str) -> list:
+   """Divide em tokens respeitando aspas; retorna [(texto, entre_aspas)]."""
+   tokens = []
+   for m in TOKEN_RE.finditer(text or ""):
+      if m.group(3) is not None:
+         tokens.append((m.group(3), False))
+      else:
+         tokens.append(((m.group(1) if m.group(1) is not None else m.group(2)).strip(), True))
+   return tokens
+
+
+class ParsedEntry:
+   def __init__(self):
+      self.amount = None
+      self.date = None
+      self.installments = None
+      self.description = None
+      self.matches = {}
+      self.leftovers = []
+
+
+def parse_entry(tokens: list, entities: dict, today: datetime.date = None) -> ParsedEntry:
+   """
+   Interpreta os argumentos de um comando de lançamento em uma única mensagem.
+
+   `tokens` vem de split_args. `entities` mapeia um tipo ("category", "card", "account"...) para
+   {nome normalizado: valor}; a ordem do dict define a prioridade quando um nome existe em mais de
+   um tipo. Nomes com várias palavras são reconhecidos (casa o trecho mais longo primeiro).
+   Um token entre aspas vira a descrição.
+   """
+   parsed = ParsedEntry()
+   longest = max((len(name.split()) for names in entities.values() for name in names), default=1)
+   i = 0
+   while i < len(tokens):
+      token, quoted = tokens[i]
+
+      if quoted:
+         if parsed.description is None:
+            parsed.description = token
+         else:
+            parsed.leftovers.append(token)
+         i += 1
+         continue
+
+      matched = False
+      for size in range(min(longest, len(tokens) - i), 0, -1):
+         window = tokens[i:i + size]
+         if any(q for _, q in window):
+            continue
+         if _match(" ".join(t for t, _ in window), entities, parsed):
+            i += size
+            matched = True
+            break
+      if matched:
+         continue
+
+      if parsed.amount is None:
+         try:
+            parsed.amount = parse_amount(token)
+            i += 1
+            continue
+         except ValueError:
+            pass
+      m = INSTALLMENTS_RE.match(token)
+      if m and parsed.installments is None:
+         parsed.installments = int(m.group(1))
+         i += 1
+         continue
+      if parsed.date is None and ("/" in token or normalize_name(token) in RELATIVE_DATES):
+         try:
+            parsed.date = parse_date(token, today)
+            i += 1
+            continue
+         except ValueError:
+            pass
+
+      parsed.leftovers.append(token)
+      i += 1
+   return parsed
+
+
+def _match(text: str, entities: dict, parsed: ParsedEntry) -> bool:
+   key = normalize_name(text)
+   for kind, names in entities.items():
+      if kind not in parsed.matches and key in names:
+         parsed.matches[kind] = names[key]
+         return True
+   return False
@@ -0,0 +1,275 @@
+# utils/pilcharts.py
+# Gráficos simples (pizza, barras, linhas) desenhados direto com Pillow, sem matplotlib: usados pelo
+# renderizador "pillow" do /resumo (handlers/summary.py). Cada função desenha dentro de uma caixa
+# (x0, y0, x1, y1) de uma imagem já criada; `scale` multiplica fontes, traços e marcadores
+# (1.0 = 100 dpi, o tamanho padrão das figuras do matplotlib).
+import importlib.util
+import math
+import os
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+BACKGROUND = (255, 255, 255)
+FOREGROUND = (0, 0, 0)
+GRID = (176, 176, 176)
+# ciclo de cores padrão do matplotlib (tab10), para os dois renderizadores parecerem iguais
+PALETTE = [
+    (31, 119, 180), (255, 127, 14), (44, 160, 44), (214, 39, 40), (148, 103, 189),
+    (140, 86, 75), (227, 119, 194), (127, 127, 127), (188, 189, 34), (23, 190, 207),
+]
+
+BAND_ALPHA = 0.2   # faixa de confiança, como fill_between(alpha=0.2) do matplotlib
+
+TEXT_PX = 14     # 10 pt a 100 dpi
+TITLE_PX = 17    # 12 pt a 100 dpi
+
+
+def _font_path():
+    """DejaVu Sans que vem com o matplotlib (mesma fonte dos gráficos dele), achada sem importá-lo."""
+    spec = importlib.util.find_spec("matplotlib")
+    for location in (spec.submodule_search_locations or []) if spec else []:
+        path = os.path.join(location, "mpl-data", "fonts", "ttf", "DejaVuSans.ttf")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+FONT_PATH = _font_path()
+
+
+@lru_cache(maxsize=16)
+def font(size: int):
+    size = max(6, size)
+    if FONT_PATH:
+        return ImageFont.truetype(FONT_PATH, size)
+    # a fonte embutida do Pillow não tem acentos, mas não deixa o gráfico sem texto
+    return ImageFont.load_default(size=size)
+
+
+def new_canvas(width: int, height: int) -> Image.Image:
+    return Image.new("RGB", (width, height), BACKGROUND)
+
+
+def nice_ticks(lo: float, hi: float, count: int = 8) -> list:
+    """Marcas "redondas" (1, 2, 2.5, 5 x 10^k) cobrindo [lo, hi], no máximo ~`count` delas."""
+    if hi <= lo:
+        hi = lo + 1
+    raw = (hi - lo) / max(1, count)
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    first = math.ceil(lo / step - 1e-9) * step
+    ticks = []
+    value = first
+    while value <= hi + step * 1e-9:
+        ticks.append(round(value, 10))
+        value += step
+    return ticks
+
+
+def format_tick(value: float) -> str:
+    if value == int(value):
+        return f"{int(value)}"
+    return f"{value:g}"
+
+
+def _text_size(text: str, fnt) -> tuple:
+    left, top, right, bottom = fnt.getbbox(text)
+    return right - left, bottom - top
+
+
+def _title(draw, box, title: str, scale: float) -> int:
+    """Escreve o título centrado no topo da caixa; devolve o y onde o conteúdo começa."""
+    x0, y0, x1, _ = box
+    fnt = font(round(TITLE_PX * scale))
+    draw.text(((x0 + x1) / 2, y0), title, fill=FOREGROUND, font=fnt, anchor="mt")
+    return y0 + _text_size(title, fnt)[1] + round(12 * scale)
+
+
+def _vertical_text(image, xy, text: str, fnt):
+    """Rótulo do eixo y (girado 90°), centrado verticalmente em xy."""
+    width, height = _text_size(text, fnt)
+    label = Image.new("RGB", (width + 4, height + 6), BACKGROUND)
+    ImageDraw.Draw(label).text((2, 0), text, fill=FOREGROUND, font=fnt)
+    label = label.rotate(90, expand=True)
+    image.paste(label, (round(xy[0]), round(xy[1] - label.height / 2)))
+
+
+def _dashed_line(draw, points, fill, width: int, dash: float):
+    for (xa, ya), (xb, yb) in zip(points, points[1:]):
+        length = math.hypot(xb - xa, yb - ya)
+        if length == 0:
+            continue
+        steps = int(length // dash)
+        for i in range(0, steps + 1, 2):
+            t0 = i * dash / length
+            t1 = min(1.0, (i + 1) * dash / length)
+            draw.line([(xa + (xb - xa) * t0, ya + (yb - ya) * t0), (xa + (xb - xa) * t1, ya + (yb - ya) * t1)],
+                      fill=fill, width=width)
+
+
+def pie_chart(image, box, values, labels, title: str, scale: float = 1.0):
+    """Pizza começando às 12h, sentido anti-horário, com percentual em cada fatia (como autopct='%1.1f%%')."""
+    draw = ImageDraw.Draw(image)
+    top = _title(draw, box, title, scale)
+    x0, _, x1, y1 = box
+    fnt = font(round(TEXT_PX * scale))
+    total = float(sum(values))
+    if total <= 0:
+        return
+
+    label_room = max(_text_size(str(label), fnt)[0] for label in labels) + round(10 * scale)
+    radius = max(10, min((x1 - x0) / 2 - label_room, (y1 - top) / 2 - round(20 * scale)))
+    cx, cy = (x0 + x1) / 2, (top + y1) / 2
+
+    angle = 90.0
+    for i, (value, label) in enumerate(zip(values, labels)):
+        sweep = 360.0 * value / total
+        color = PALETTE[i % len(PALETTE)]
+        # Pillow mede ângulos no sentido horário a partir das 3h
+        draw.pieslice([cx - radius, cy - radius, cx + radius, cy + radius], -(angle + sweep), -angle, fill=color)
+        middle = math.radians(angle + sweep / 2)
+        cos, sin = math.cos(middle), math.sin(middle)
+        draw.text((cx + radius * 0.6 * cos, cy - radius * 0.6 * sin), f"{100 * value / total:.1f}%",
+                  fill=FOREGROUND, font=fnt, anchor="mm")
+        draw.text((cx + radius * 1.1 * cos, cy - radius * 1.1 * sin), str(label),
+                  fill=FOREGROUND, font=fnt, anchor="lm" if cos >= 0 else "rm")
+        angle += sweep
+
+
+def _axes(image, box, title: str, ylabel: str, xlabel: str, lo: float, hi: float, scale: float, grid: bool):
+    """Moldura, marcas e rótulos de um gráfico cartesiano; devolve (área interna, função valor -> y)."""
+    draw = ImageDraw.Draw(image)
+    top = _title(draw, box, title, scale)
+    x0, _, x1, y1 = box
+    fnt = font(round(TEXT_PX * scale))
+    ticks = nice_ticks(lo, hi)
+    lo, hi = min(lo, ticks[0]), max(hi, ticks[-1])
+    tick_labels = [format_tick(t) for t in ticks]
+
+    text_h = _text_size("0", fnt)[1]
+    tick_w = max(_text_size(t, fnt)[0] for t in tick_labels)
+    left = x0 + (text_h + round(10 * scale) if ylabel else 0) + tick_w + round(10 * scale)
+    bottom = y1 - text_h - round(10 * scale) - (text_h + round(8 * scale) if xlabel else 0)
+    right = x1 - round(6 * scale)
+    plot = (left, top, right, bottom)
+
+    def to_y(value):
+        return bottom - (value - lo) / (hi - lo) * (bottom - top)
+
+    line_w = max(1, round(scale))
+    for tick, text in zip(ticks, tick_labels):
+        y = to_y(tick)
+        if grid:
+            draw.line([(left, y), (right, y)], fill=GRID, width=line_w)
+        draw.line([(left - round(4 * scale), y), (left, y)], fill=FOREGROUND, width=line_w)
+        draw.text((left - round(6 * scale), y), text, fill=FOREGROUND, font=fnt, anchor="rm")
+    draw.rectangle(plot, outline=FOREGROUND, width=line_w)
+    if ylabel:
+        _vertical_text(image, (x0, (top + bottom) / 2), ylabel, fnt)
+    if xlabel:
+        draw.text(((left + right) / 2, y1), xlabel, fill=FOREGROUND, font=fnt, anchor="mb")
+    return plot, to_y
+
+
+def _x_labels(draw, positions, labels, bottom: float, scale: float):
+    """Rótulos do eixo x, pulando alguns quando não cabem lado a lado."""
+    if not labels:
+        return
+    fnt = font(round(TEXT_PX * scale))
+    widest = max(_text_size(str(label), fnt)[0] for label in labels) + round(6 * scale)
+    spacing = (positions[-1] - positions[0]) / (len(positions) - 1) if len(positions) > 1 else widest
+    every = max(1, math.ceil(widest / max(spacing, 1)))
+    line_w = max(1, round(scale))
+    for i, (x, label) in enumerate(zip(positions, labels)):
+        draw.line([(x, bottom), (x, bottom + round(4 * scale))], fill=FOREGROUND, width=line_w)
+        if i % every == 0:
+            draw.text((x, bottom + round(6 * scale)), str(label), fill=FOREGROUND, font=fnt, anchor="mt")
+
+
+def bar_chart(image, box, labels, values, title: str, ylabel: str = "", scale: float = 1.0):
+    hi = max([0.0, *values]) * 1.05 or 1.0
+    lo = min([0.0, *values]) * 1.05
+    (left, top, right, bottom), to_y = _axes(image, box, title, ylabel, "", lo, hi, scale, grid=False)
+    draw = ImageDraw.Draw(image)
+    slot = (right - left) / max(1, len(values))
+    positions = [left + slot * (i + 0.5) for i in range(len(values))]
+    for x, value in zip(positions, values):
+        y0, y1 = sorted((to_y(0), to_y(value)))
+        draw.rectangle([x - slot * 0.4, y0, x + slot * 0.4, y1], fill=PALETTE[0])
+    _x_labels(draw, positions, labels, bottom, scale)
+
+
+def line_chart(image, box, labels, values, title: str, xlabel: str = "", ylabel: str = "",
+               scale: float = 1.0, dashed: bool = False, grid: bool = True, band=None):
+    lines_chart(image, box, labels, [(None, values)], title, xlabel=xlabel, ylabel=ylabel,
+                scale=scale, dashed=dashed, grid=grid, band=band)
+
+
+def lines_chart(image, box, labels, series, title: str, xlabel: str = "", ylabel: str = "",
+                scale: float = 1.0, dashed: bool = False, grid: bool = True, band=None):
+    """
+    Uma linha por (nome, valores) de `series`, nas cores do PALETTE; legenda se houver nomes.
+    `band`: (inferiores, superiores) — faixa sombreada atrás da primeira série.
+    """
+    flat = [v for _, values in series for v in values] + [v for values in band or () for v in values]
+    if flat:
+        lo, hi = min(flat), max(flat)
+        pad = (hi - lo) * 0.05 or abs(hi) * 0.05 or 1.0
+        lo, hi = lo - pad, hi + pad
+    else:
+        lo, hi = 0.0, 1.0
+    (left, top, right, bottom), to_y = _axes(image, box, title, ylabel, xlabel, lo, hi, scale, grid=grid)
+    draw = ImageDraw.Draw(image)
+    n = len(labels)
+    if n == 0:
+        return
+    margin = (right - left) * 0.05
+    step = (right - left - 2 * margin) / (n - 1) if n > 1 else 0
+    positions = [left + margin + step * i for i in range(n)] if n > 1 else [(left + right) / 2]
+    if grid:
+        for x in positions:
+            draw.line([(x, top), (x, bottom)], fill=GRID, width=max(1, round(scale)))
+    if band:
+        lower, upper = band
+        outline = [(x, to_y(v)) for x, v in zip(positions, upper)]
+        outline += [(x, to_y(v)) for x, v in reversed(list(zip(positions, lower)))]
+        if len(outline) > 2:
+            draw.polygon(outline, fill=_tint(PALETTE[0], BAND_ALPHA))
+    width = max(1, round(1.5 * scale))
+    radius = 3 * scale
+    for index, (_, values) in enumerate(series):
+        color = PALETTE[index % len(PALETTE)]
+        points = [(x, to_y(v)) for x, v in zip(positions, values)]
+        if dashed:
+            _dashed_line(draw, points, color, width, dash=6 * scale)
+        elif len(points) > 1:
+            draw.line(points, fill=color, width=width, joint="curve")
+        for x, y in points:
+            draw.ellipse([x - radius, y - radius, x + radius, y + radius], fill=color)
+    _x_labels(draw, positions, labels, bottom, scale)
+    _legend(draw, (left, top, right, bottom), [name for name, _ in series], scale)
+
+
+def _tint(color, alpha: float):
+    """Cor sobre o fundo branco com opacidade `alpha` (a imagem é RGB, sem canal alfa)."""
+    return tuple(round(c * alpha + b * (1 - alpha)) for c, b in zip(color, BACKGROUND))
+
+
+def _legend(draw, plot, names, scale: float):
+    """Legenda no canto superior esquerdo da área do gráfico (como loc="upper left")."""
+    if not any(names):
+        return
+    fnt = font(round(TEXT_PX * scale))
+    left, top, _, _ = plot
+    line_h = _text_size("Ag", fnt)[1] + round(6 * scale)
+    swatch = round(18 * scale)
+    pad = round(6 * scale)
+    width = max(_text_size(str(name), fnt)[0] for name in names) + swatch + 3 * pad
+    box = [left + pad, top + pad, left + pad + width, top + pad + line_h * len(names) + pad]
+    draw.rectangle(box, fill=BACKGROUND, outline=GRID)
+    for index, name in enumerate(names):
+        y = box[1] + pad + line_h * index + line_h / 2
+        color = PALETTE[index % len(PALETTE)]
+        draw.line([(box[0] + pad, y), (box[0] + pad + swatch, y)], fill=color, width=max(1, round(2 * scale)))
+        draw.text((box[0] + 2 * pad + swatch, y), str(name), fill=FOREGROUND, font=fnt, anchor="lm")
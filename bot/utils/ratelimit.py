@@ -0,0 +1,131 @@
+# utils/ratelimit.py
+# Limitador de saída da Bot API (no lugar do AIORateLimiter, que depende do aiolimiter):
+#   - balde global: todas as requisições com chat_id, ~30/s por bot;
+#   - balde por chat: conversa privada ~1 mensagem/s com rajadas curtas, grupos 20/min;
+#   - RetryAfter (flood control): segura TODAS as requisições pelo tempo pedido e reenvia.
+# Instalado em main.build_application; vale para todo envio do bot, inclusive utils.broadcast.
+import asyncio
+import datetime
+import logging
+import time
+from collections import OrderedDict
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from config import Env
+
+logger = logging.getLogger(__name__)
+
+GROUP_RATE_PER_SECOND = 20 / 60   # mensagens por segundo num grupo
+MAX_CHAT_BUCKETS = 4096           # baldes por chat mantidos (LRU); os cheios podem ser descartados
+
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    """RetryAfter.retry_after é int ou timedelta conforme a versão/configuração da biblioteca."""
+    delay = error.retry_after
+    return delay.total_seconds() if isinstance(delay, datetime.timedelta) else float(delay)
+
+
+class TokenBucket:
+    """`rate` fichas por segundo, até `capacity` acumuladas; acquire() espera a próxima ficha livre."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def is_full(self) -> bool:
+        """Sem uso recente: descartar o balde não muda nada."""
+        if self._lock.locked():
+            return False
+        return self._tokens + (time.monotonic() - self._updated) * self.rate >= self.capacity
+
+    async def acquire(self):
+        if self.rate <= 0:   # sem limite
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BotRateLimiter(BaseRateLimiter[int]):
+    """`rate_limit_args` (opcional, por chamada) = número máximo de reenvios após RetryAfter."""
+
+    def __init__(self, global_rate: float = None, chat_rate: float = None, chat_burst: float = None,
+                 max_retries: int = None):
+        self._global = TokenBucket(
+            Env.RATE_LIMIT_GLOBAL_PER_SECOND if global_rate is None else global_rate,
+            capacity=Env.RATE_LIMIT_GLOBAL_PER_SECOND if global_rate is None else global_rate,
+        )
+        self._chat_rate = Env.RATE_LIMIT_CHAT_PER_SECOND if chat_rate is None else chat_rate
+        self._chat_burst = Env.RATE_LIMIT_CHAT_BURST if chat_burst is None else chat_burst
+        self._max_retries = Env.RATE_LIMIT_MAX_RETRIES if max_retries is None else max_retries
+        self._chats = OrderedDict()   # chat_id -> TokenBucket
+        self._retry_after = asyncio.Event()
+        self._retry_after.set()
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        self._chats.clear()
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= MAX_CHAT_BUCKETS:
+                for key in [k for k, b in self._chats.items() if b.is_full()]:
+                    del self._chats[key]
+            # ids negativos (e @username) são grupos/canais
+            is_group = not isinstance(chat_id, int) or chat_id < 0
+            bucket = TokenBucket(GROUP_RATE_PER_SECOND, capacity=20) if is_group else TokenBucket(
+                self._chat_rate, capacity=self._chat_burst
+            )
+            self._chats[chat_id] = bucket
+        self._chats.move_to_end(chat_id)
+        return bucket
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        max_retries = self._max_retries if rate_limit_args is None else rate_limit_args
+        chat_id = data.get("chat_id")
+        if chat_id is not None:
+            try:
+                chat_id = int(chat_id)
+            except (TypeError, ValueError):
+                pass
+
+        for attempt in range(max_retries + 1):
+            if chat_id is not None:
+                await self._chat_bucket(chat_id).acquire()
+                await self._global.acquire()
+            await self._retry_after.wait()
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                if attempt == max_retries:
+                    logger.warning("Flood control em %s após %d reenvios; desistindo", endpoint, max_retries)
+                    raise
+                delay = retry_after_seconds(e) + 0.1
+                logger.info("Flood control em %s: aguardando %.1fs", endpoint, delay)
+                # nenhuma outra requisição sai enquanto isso
+                self._retry_after.clear()
+                try:
+                    await asyncio.sleep(delay)
+                finally:
+                    self._retry_after.set()
@@ -0,0 +1,78 @@
+# utils/replies.py
+# Aviso de carregamento ("⌛ ...") que vira a resposta final, em vez de uma mensagem a mais:
+#   - o aviso só é enviado se a resposta demorar mais que Env.LOADING_DELAY_SECONDS — respostas
+#     rápidas (cache) saem numa única chamada à Bot API;
+#   - se o aviso já saiu, a primeira resposta o edita no lugar; as seguintes são mensagens novas.
+# Teclados de resposta (ReplyKeyboardMarkup/Remove) não podem ir num edit; com eles a resposta sai
+# como mensagem nova e o aviso é apagado.
+import asyncio
+import logging
+
+from telegram import InlineKeyboardMarkup
+
+from config import Env
+
+logger = logging.getLogger(__name__)
+
+
+class LoadingReply:
+    """
+    Substitui `message.reply_text` num handler demorado:
+        reply = LoadingReply(update.message, "⌛ Buscando...").reply_text
+        ...
+        await reply(texto_final, parse_mode="Markdown")
+    """
+
+    def __init__(self, origin, text: str = "⌛ Processando...", delay: float = None):
+        self.origin = origin          # mensagem a que as respostas novas respondem
+        self.message = None           # aviso enviado e ainda não reaproveitado
+        self._text = text
+        self._sending = False
+        delay = Env.LOADING_DELAY_SECONDS if delay is None else delay
+        self._task = asyncio.create_task(self._send_later(delay))
+
+    async def _send_later(self, delay: float):
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._sending = True
+        try:
+            self.message = await self.origin.reply_text(self._text)
+        except Exception:
+            logger.debug("Falha ao enviar aviso de carregamento", exc_info=True)
+
+    async def _take(self):
+        """Para o aviso pendente (ou espera o envio em curso) e devolve a mensagem dele, se saiu."""
+        if self._task is not None:
+            if self._sending:
+                await asyncio.shield(self._task)
+            else:
+                self._task.cancel()
+            self._task = None
+        message, self.message = self.message, None
+        return message
+
+    async def reply_text(self, text: str, reply_markup=None, **kwargs):
+        message = await self._take()
+        if message is not None:
+            if reply_markup is None or isinstance(reply_markup, InlineKeyboardMarkup):
+                try:
+                    return await message.edit_text(text, reply_markup=reply_markup, **kwargs)
+                except Exception:
+                    logger.debug("Aviso não editável, respondendo em mensagem nova", exc_info=True)
+        sent = await self.origin.reply_text(text, reply_markup=reply_markup, **kwargs)
+        if message is not None:
+            await self._delete(message)
+        return sent
+
+    async def discard(self):
+        """Resposta que não é texto (arquivo, fotos): cancela o aviso ou apaga o que já saiu."""
+        message = await self._take()
+        if message is not None:
+            await self._delete(message)
+
+    @staticmethod
+    async def _delete(message):
+        try:
+            await message.delete()
+        except Exception:
+            logger.debug("Falha ao apagar aviso de carregamento", exc_info=True)
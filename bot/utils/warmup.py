@@ -0,0 +1,74 @@
+# utils/warmup.py
+# Aquecimento em segundo plano, disparado por main.py logo depois que o polling começou
+# (Env.WARMUP_ON_START): o primeiro usuário não paga a primeira conexão com o banco (handshake +
+# inicialização do dialeto), o import do matplotlib/carga das fontes nem os dados de referência dos
+# perfis mais ativos. Cada etapa é independente; falhas só vão para o log.
+import asyncio
+import logging
+import time
+
+from sqlalchemy import select, func, text
+
+from config import Env
+from db.session import engine, get_session
+from db.models import Profile, Transaction
+from db.refcache import get_ref_data
+
+logger = logging.getLogger(__name__)
+
+
+async def _warm_db():
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+def _load_chart_renderer():
+    # roda numa thread: o import do matplotlib segura o GIL em rajadas, mas não trava o event loop
+    # por ~0,4 s seguidos. Só importa e carrega fontes — desenhar fora da thread do loop não é seguro.
+    from handlers.summary import get_renderer, pyplot
+    from utils import pilcharts
+
+    if get_renderer().name == "matplotlib":
+        pyplot()
+        from matplotlib import font_manager
+        font_manager.findfont("DejaVu Sans")
+    else:
+        pilcharts.font(pilcharts.TEXT_PX)
+        pilcharts.font(pilcharts.TITLE_PX)
+
+
+async def _warm_charts():
+    await asyncio.to_thread(_load_chart_renderer)
+
+
+async def _warm_caches():
+    # perfis com lançamentos mais recentes: os que provavelmente falam com o bot primeiro
+    async with get_session() as session:
+        recent = (
+            select(Transaction.profile_id, func.max(Transaction.id).label("last_id"))
+            .group_by(Transaction.profile_id)
+            .order_by(func.max(Transaction.id).desc())
+            .limit(Env.WARMUP_PROFILES)
+            .subquery()
+        )
+        rows = (await session.execute(
+            select(Profile.id, Profile.ref_version).join(recent, recent.c.profile_id == Profile.id)
+        )).all()
+    for profile_id, ref_version in rows:
+        await get_ref_data(profile_id, ref_version)
+
+
+WARMUP_STEPS = (("banco", _warm_db), ("gráficos", _warm_charts), ("caches", _warm_caches))
+
+
+async def warm_up():
+    started = time.perf_counter()
+    for name, step in WARMUP_STEPS:
+        step_started = time.perf_counter()
+        try:
+            await step()
+        except Exception:
+            logger.warning("Aquecimento (%s) falhou", name, exc_info=True)
+            continue
+        logger.info("Aquecimento (%s) em %.2fs", name, time.perf_counter() - step_started)
+    logger.info("Aquecimento concluído em %.2fs", time.perf_counter() - started)